@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available.
+    brotli = None
+
+re_accepts_brotli = _lazy_re_compile(r"\bbr\b")
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Compress responses with brotli when the client accepts it and the
+    `brotli` package is installed, and with gzip otherwise.
+
+    Responses shorter than COMPRESSION_MIN_SIZE bytes are sent as-is.
+    Streaming responses are compressed chunk by chunk as they are sent.
+    """
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+        ae = request.META.get("HTTP_ACCEPT_ENCODING", "")
+        if (
+            brotli is None
+            or not re_accepts_brotli.search(ae)
+            or response.has_header("Content-Encoding")
+        ):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if response.streaming:
+            response.streaming_content = self.compress_sequence(
+                response.streaming_content
+            )
+            del response.headers["Content-Length"]
+        else:
+            compressed_content = brotli.compress(response.content)
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response.headers["Content-Length"] = str(len(response.content))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+        return response
+
+    @staticmethod
+    def compress_sequence(sequence):
+        compressor = brotli.Compressor()
+        for chunk in sequence:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
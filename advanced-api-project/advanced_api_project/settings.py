@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -38,11 +39,19 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "rest_framework",
+    "django_filters",
     "api",
 ]
 
+# Workers that never serve /admin/ can boot without the admin, which
+# imports every app's admin module on startup: DJANGO_ADMIN_ENABLED=0.
+ADMIN_ENABLED = os.environ.get("DJANGO_ADMIN_ENABLED", "1") != "0"
+if not ADMIN_ENABLED:
+    INSTALLED_APPS.remove("django.contrib.admin")
+
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "advanced_api_project.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -57,13 +66,23 @@ TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [],
-        "APP_DIRS": True,
         "OPTIONS": {
             "context_processors": [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
             ],
+            # Production template mode: every template is read and parsed
+            # once per process, then served from memory by the cached loader.
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
         },
     },
 ]
@@ -118,7 +137,27 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# Responses smaller than this many bytes are not compressed.
+COMPRESSION_MIN_SIZE = 1024
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+REST_FRAMEWORK = {
+    "DEFAULT_THROTTLE_CLASSES": [
+        "advanced_api_project.throttling.UserTokenBucketThrottle",
+        "advanced_api_project.throttling.IPTokenBucketThrottle",
+        "advanced_api_project.throttling.EndpointTokenBucketThrottle",
+    ],
+    "DEFAULT_THROTTLE_RATES": {
+        "user": "600/min",
+        "ip": "300/min",
+        "books": "120/min",
+    },
+}
+
+# Django cache alias shared by all workers for throttle buckets. When unset,
+# each process keeps its own buckets in memory.
+TOKEN_BUCKET_CACHE = None
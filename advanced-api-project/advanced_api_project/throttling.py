@@ -0,0 +1,184 @@
+"""
+Token-bucket request throttling for the REST API.
+
+Each client key owns a bucket holding up to `num_requests` tokens that
+refills continuously at `num_requests / duration` tokens per second, so
+short bursts are allowed while the long-run rate stays bounded. Buckets live
+in process memory unless TOKEN_BUCKET_CACHE names a Django cache alias, in
+which case every worker shares them through that cache.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class LocalBuckets:
+    """In-process buckets, evicting the least recently used past `max_entries`."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def take(self, key, capacity, refill_rate, now):
+        with self.lock:
+            bucket = self.buckets.pop(key, None)
+            if bucket is None:
+                tokens = capacity
+            else:
+                tokens = min(capacity, bucket[0] + (now - bucket[1]) * refill_rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self.buckets[key] = (tokens, now)
+            if len(self.buckets) > self.max_entries:
+                self.buckets.popitem(last=False)
+        return allowed, tokens
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+class CacheBuckets:
+    """
+    Buckets shared between processes through a Django cache.
+
+    Reading a bucket and writing it back is not atomic, so each take holds
+    a short lock on the key, taken with cache.add() (atomic on every
+    backend). A client whose requests keep colliding on the lock is
+    throttled rather than let through unmetered.
+    """
+
+    # Longer than a get() and set() take; frees the lock of a dead worker.
+    lock_timeout = 1
+    lock_attempts = 50
+    lock_wait = 0.001
+
+    def __init__(self, alias):
+        self.cache = caches[alias]
+
+    def take(self, key, capacity, refill_rate, now):
+        lock = f"{key}:lock"
+        for _ in range(self.lock_attempts):
+            if self.cache.add(lock, 1, self.lock_timeout):
+                break
+            time.sleep(self.lock_wait)
+        else:
+            return False, 0
+        try:
+            bucket = self.cache.get(key)
+            if bucket is None:
+                tokens = capacity
+            else:
+                tokens = min(capacity, bucket[0] + (now - bucket[1]) * refill_rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            # A bucket left alone this long is full again and can be forgotten.
+            timeout = math.ceil((capacity - tokens) / refill_rate) + 1
+            self.cache.set(key, (tokens, now), timeout)
+        finally:
+            self.cache.delete(lock)
+        return allowed, tokens
+
+
+_buckets = None
+
+
+def get_buckets():
+    global _buckets
+    if _buckets is None:
+        alias = getattr(settings, "TOKEN_BUCKET_CACHE", None)
+        _buckets = CacheBuckets(alias) if alias else LocalBuckets()
+    return _buckets
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    SimpleRateThrottle that spends tokens from a bucket instead of keeping
+    a request history. Sets RateLimit-Limit, RateLimit-Remaining and
+    RateLimit-Reset on the response; throttled responses also carry
+    Retry-After.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.refill_rate = self.num_requests / self.duration
+        allowed, self.tokens = get_buckets().take(
+            self.key, self.num_requests, self.refill_rate, self.timer()
+        )
+
+        remaining = int(self.tokens)
+        headers = view.headers
+        if int(headers.get("RateLimit-Remaining", remaining + 1)) > remaining:
+            headers["RateLimit-Limit"] = str(self.num_requests)
+            headers["RateLimit-Remaining"] = str(remaining)
+            headers["RateLimit-Reset"] = str(
+                math.ceil((self.num_requests - self.tokens) / self.refill_rate)
+            )
+        return allowed
+
+    def wait(self):
+        return (1 - self.tokens) / self.refill_rate
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Limit each authenticated user, whichever address they come from."""
+
+    scope = "user"
+
+    def get_cache_key(self, request, view):
+        if not request.user or not request.user.is_authenticated:
+            return None
+        return self.cache_format % {"scope": self.scope, "ident": request.user.pk}
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """Limit each client address, authenticated or not."""
+
+    scope = "ip"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {"scope": self.scope, "ident": self.get_ident(request)}
+
+
+class EndpointTokenBucketThrottle(TokenBucketThrottle):
+    """
+    Limit each client on views that set `throttle_scope`, using the rate
+    configured for that scope. The client is the user, or the address for
+    anonymous requests.
+    """
+
+    scope_attr = "throttle_scope"
+
+    def __init__(self):
+        # The rate depends on the view, so it is resolved in allow_request().
+        pass
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {"scope": self.scope, "ident": ident}
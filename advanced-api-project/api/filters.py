@@ -0,0 +1,71 @@
+"""
+Filter backends that keep the book list on index-backed query plans.
+"""
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+
+# Full-text lookups, keyed by database vendor. The matching index or FTS5
+# table is created by migration 0002_book_indexes.
+FTS_LOOKUPS = {
+    "sqlite": "SELECT rowid FROM api_book_fts WHERE api_book_fts MATCH %s",
+    "postgresql": (
+        "SELECT id FROM api_book "
+        "WHERE to_tsvector('simple', title) @@ to_tsquery('simple', %s)"
+    ),
+}
+
+
+class IndexedQueryGuard(filters.BaseFilterBackend):
+    """
+    Reject filter and ordering combinations that no index can serve.
+
+    `view.indexed_queries` maps the set of filtered field names to the
+    orderings an index supports for it. The first ordering is applied when
+    the request does not ask for one.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        filterset_fields = view.filterset_fields
+        filtered = frozenset(
+            name.split("__")[0]
+            for name, value in request.query_params.items()
+            if value and name.split("__")[0] in filterset_fields
+        )
+        orderings = view.indexed_queries.get(filtered)
+        if orderings is None:
+            raise ValidationError(
+                {"detail": f"Filtering on {', '.join(sorted(filtered))} is not indexed."}
+            )
+
+        ordering = request.query_params.get(filters.OrderingFilter.ordering_param)
+        if not ordering:
+            return queryset.order_by(*orderings[0].split(","))
+        if ordering.replace(" ", "") not in orderings:
+            raise ValidationError(
+                {"ordering": [f"Choose one of: {'; '.join(orderings)}."]}
+            )
+        return queryset
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter backed by the book title full-text index instead of
+    `icontains`, which cannot use an index. Each search term matches as a
+    word prefix. Databases without an FTS lookup use the stock behaviour.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        lookup = FTS_LOOKUPS.get(connection.vendor)
+        if not terms or lookup is None:
+            return super().filter_queryset(request, queryset, view)
+        return queryset.filter(id__in=RawSQL(lookup, [self.build_query(terms)]))
+
+    def build_query(self, terms):
+        if connection.vendor == "sqlite":
+            return " ".join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+        words = ("".join(c for c in term if c.isalnum()) for term in terms)
+        return " & ".join(f"{word}:*" for word in words if word)
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from api.models import Author, Book
+from api.serializers import BookSerializer, BookValuesSerializer
+
+
+class Command(BaseCommand):
+    help = "Compare rows/sec of BookSerializer against BookValuesSerializer."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+        # Seed inside a transaction that is rolled back, so the benchmark
+        # never leaves data behind in the project database.
+        with transaction.atomic():
+            authors = Author.objects.bulk_create(
+                Author(name=f"Author {i}") for i in range(50)
+            )
+            Book.objects.bulk_create(
+                Book(title=f"Book {i}", publication_year=2000, author=authors[i % 50])
+                for i in range(rows)
+            )
+            queryset = Book.objects.order_by("id")[:rows]
+            renderer = JSONRenderer()
+
+            def model_serializer():
+                return renderer.render(BookSerializer(queryset.all(), many=True).data)
+
+            def values_serializer():
+                return BookValuesSerializer(BookValuesSerializer.values(queryset)).json
+
+            for name, func in (
+                ("ModelSerializer", model_serializer),
+                ("ValuesSerializer", values_serializer),
+            ):
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    func()
+                elapsed = time.perf_counter() - start
+                self.stdout.write(
+                    f"{name:<18} {rows * repeat / elapsed:>12,.0f} rows/sec"
+                )
+            transaction.set_rollback(True)
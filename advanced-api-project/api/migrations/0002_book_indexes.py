@@ -0,0 +1,61 @@
+# Generated by Django 5.2.5 on 2026-10-19 09:26
+
+from django.db import migrations, models
+
+SQLITE_FTS = [
+    "CREATE VIRTUAL TABLE api_book_fts USING fts5(title, content='api_book', content_rowid='id')",
+    "CREATE TRIGGER api_book_fts_ai AFTER INSERT ON api_book BEGIN "
+    "INSERT INTO api_book_fts(rowid, title) VALUES (new.id, new.title); END",
+    "CREATE TRIGGER api_book_fts_ad AFTER DELETE ON api_book BEGIN "
+    "INSERT INTO api_book_fts(api_book_fts, rowid, title) VALUES ('delete', old.id, old.title); END",
+    "CREATE TRIGGER api_book_fts_au AFTER UPDATE OF title ON api_book BEGIN "
+    "INSERT INTO api_book_fts(api_book_fts, rowid, title) VALUES ('delete', old.id, old.title); "
+    "INSERT INTO api_book_fts(rowid, title) VALUES (new.id, new.title); END",
+    "INSERT INTO api_book_fts(api_book_fts) VALUES ('rebuild')",
+]
+
+SQLITE_FTS_REVERSE = [
+    "DROP TRIGGER IF EXISTS api_book_fts_ai",
+    "DROP TRIGGER IF EXISTS api_book_fts_ad",
+    "DROP TRIGGER IF EXISTS api_book_fts_au",
+    "DROP TABLE IF EXISTS api_book_fts",
+]
+
+POSTGRESQL_FTS = [
+    "CREATE INDEX api_book_title_fts_idx ON api_book "
+    "USING GIN (to_tsvector('simple', title))",
+]
+
+POSTGRESQL_FTS_REVERSE = ["DROP INDEX IF EXISTS api_book_title_fts_idx"]
+
+
+def run_statements(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['author', 'publication_year'], name='book_author_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['publication_year', 'id'], name='book_year_id_idx'),
+        ),
+        migrations.RunPython(
+            run_statements({"sqlite": SQLITE_FTS, "postgresql": POSTGRESQL_FTS}),
+            run_statements(
+                {"sqlite": SQLITE_FTS_REVERSE, "postgresql": POSTGRESQL_FTS_REVERSE}
+            ),
+        ),
+    ]
@@ -1,4 +1,32 @@
 from django.db import models
 
+
+# Author is the "one" side of the one-to-many relationship: an author can
+# write many books, reachable through the `books` related name.
+class Author(models.Model):
+    name = models.CharField(max_length=100)
+
+    def __str__(self):
+        return self.name
+
+
+# Book stores a single title with the year it was published and a foreign
+# key to the Author who wrote it.
+class Book(models.Model):
+    title = models.CharField(max_length=200)
+    publication_year = models.IntegerField()
+    author = models.ForeignKey(Author, related_name="books", on_delete=models.CASCADE)
+
+    class Meta:
+        # Serve the filter/ordering combinations BookListView allows.
+        indexes = [
+            models.Index(fields=["author", "publication_year"], name="book_author_year_idx"),
+            models.Index(fields=["publication_year", "id"], name="book_year_id_idx"),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
 # "class Author(models.Model)", "class Book(models.Model)"
 # "title", "name", "publication_year", "author"
@@ -0,0 +1,38 @@
+from rest_framework.pagination import LimitOffsetPagination
+
+from .serializers import JSON_ENCODER
+
+
+class StreamingLimitOffsetPagination(LimitOffsetPagination):
+    """
+    LimitOffsetPagination whose page stays a lazy queryset slice, so that
+    ValuesSerializer.stream() can read it with iterator() instead of loading
+    all `limit` rows into a list first.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.count = self.get_count(queryset)
+        self.offset = self.get_offset(request)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+        return queryset[self.offset : self.offset + self.limit]
+
+    def stream_paginated_response(self, results):
+        """Wrap the streamed `results` array in the usual page envelope."""
+        envelope = JSON_ENCODER.encode(
+            {
+                "count": self.count,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": [],
+            }
+        )
+        # The envelope ends with `[]}`: stream the array in place of `[]`.
+        yield envelope[:-3].encode("utf-8")
+        yield from results
+        yield b"}"
@@ -1,3 +1,162 @@
-# "self", "class", "APITestCase"
-# "from rest_framework import status", "response.data"
-# "self.client.login"
+import json
+
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .models import Author, Book
+from .serializers import BookSerializer
+
+
+def streamed_json(response):
+    return json.loads(b"".join(response.streaming_content))
+
+
+class BookViewTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="reader", password="pass12345")
+        cls.author = Author.objects.create(name="Chinua Achebe")
+        cls.book = Book.objects.create(
+            title="Things Fall Apart", publication_year=1958, author=cls.author
+        )
+
+    def test_list_matches_book_serializer(self):
+        response = self.client.get(reverse("book-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            streamed_json(response),
+            BookSerializer(Book.objects.all(), many=True).data,
+        )
+
+    def test_list_uses_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("book-list"))
+            streamed_json(response)
+
+    def test_list_paginated_by_limit(self):
+        Book.objects.bulk_create(
+            Book(title=f"Book {i}", publication_year=2000, author=self.author)
+            for i in range(10)
+        )
+        response = self.client.get(reverse("book-list"), {"limit": 5})
+        data = streamed_json(response)
+        self.assertEqual(data["count"], 11)
+        self.assertIsNone(data["previous"])
+        self.assertEqual(len(data["results"]), 5)
+
+    def test_create_requires_authentication(self):
+        data = {"title": "Arrow of God", "publication_year": 1964, "author": self.author.pk}
+        response = self.client.post(reverse("book-create"), data)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.login(username="reader", password="pass12345")
+        response = self.client.post(reverse("book-create"), data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["title"], "Arrow of God")
+
+    def test_create_rejects_future_year(self):
+        self.client.login(username="reader", password="pass12345")
+        data = {"title": "Later", "publication_year": 3000, "author": self.author.pk}
+        response = self.client.post(reverse("book-create"), data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AuthorViewTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(30):
+            author = Author.objects.create(name=f"Author {i}")
+            Book.objects.bulk_create(
+                Book(title=f"Book {i}-{j}", publication_year=2000, author=author)
+                for j in range(3)
+            )
+
+    def test_list_nests_books(self):
+        response = self.client.get(reverse("author-list"), {"limit": 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        author = response.data["results"][0]
+        self.assertEqual(len(author["books"]), 3)
+        self.assertEqual(author["books"][0]["author"], author["id"])
+
+    def test_list_query_count_is_constant(self):
+        # count + authors + one prefetch for all their books
+        for limit in (1, 10, 30):
+            with self.subTest(limit=limit), self.assertNumQueries(3):
+                response = self.client.get(reverse("author-list"), {"limit": limit})
+                self.assertEqual(len(response.data["results"]), limit)
+
+    def test_detail_query_count(self):
+        author = Author.objects.first()
+        with self.assertNumQueries(2):
+            self.client.get(reverse("author-detail", args=[author.pk]))
+
+    @override_settings(DEBUG=True)
+    def test_debug_reports_query_plan(self):
+        response = self.client.get(reverse("author-list"))
+        self.assertEqual(
+            response["X-Query-Plan"], "select_related=[]; prefetch_related=[books]"
+        )
+
+    def test_query_plan_header_hidden_without_debug(self):
+        response = self.client.get(reverse("author-list"))
+        self.assertNotIn("X-Query-Plan", response)
+
+
+class BookFilterTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.achebe = Author.objects.create(name="Chinua Achebe")
+        cls.adichie = Author.objects.create(name="Chimamanda Adichie")
+        Book.objects.create(title="Things Fall Apart", publication_year=1958, author=cls.achebe)
+        Book.objects.create(title="Arrow of God", publication_year=1964, author=cls.achebe)
+        Book.objects.create(title="Purple Hibiscus", publication_year=2003, author=cls.adichie)
+        Book.objects.create(title="Half of a Yellow Sun", publication_year=2006, author=cls.adichie)
+
+    def titles(self, params):
+        response = self.client.get(reverse("book-list"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [book["title"] for book in streamed_json(response)]
+
+    def test_filter_by_author_defaults_to_year_ordering(self):
+        self.assertEqual(
+            self.titles({"author": self.adichie.pk}),
+            ["Purple Hibiscus", "Half of a Yellow Sun"],
+        )
+
+    def test_filter_by_year_range_and_ordering(self):
+        self.assertEqual(
+            self.titles(
+                {
+                    "publication_year__gte": 1960,
+                    "publication_year__lte": 2004,
+                    "ordering": "-publication_year,-id",
+                }
+            ),
+            ["Purple Hibiscus", "Arrow of God"],
+        )
+
+    def test_search_uses_full_text_prefix_match(self):
+        self.assertEqual(self.titles({"search": "yell"}), ["Half of a Yellow Sun"])
+        self.assertEqual(self.titles({"search": "of", "author": self.achebe.pk}), ["Arrow of God"])
+
+    def test_search_index_follows_updates(self):
+        book = Book.objects.get(title="Arrow of God")
+        book.title = "Anthills of the Savannah"
+        book.save()
+        self.assertEqual(self.titles({"search": "arrow"}), [])
+        self.assertEqual(self.titles({"search": "savannah"}), ["Anthills of the Savannah"])
+
+    def test_unindexed_ordering_is_rejected(self):
+        for params in ({"ordering": "title"}, {"author": self.achebe.pk, "ordering": "id"}):
+            with self.subTest(params=params):
+                response = self.client.get(reverse("book-list"), params)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn("ordering", response.data)
+
+    @override_settings(DEBUG=True)
+    def test_debug_reports_explain(self):
+        response = self.client.get(reverse("book-list"), {"author": self.achebe.pk})
+        self.assertIn("book_author_year_idx", response["X-Explain"])
@@ -1,3 +1,48 @@
 from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
 
-# Create your tests here.
+from .models import Author, Book
+from .serializers import BookSerializer, BookValuesSerializer
+
+
+class BookValuesSerializerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        achebe = Author.objects.create(name="Chinua Achebe")
+        soyinka = Author.objects.create(name="Wọlé Ṣóyínká")
+        Book.objects.bulk_create(
+            [
+                Book(title="Things Fall Apart", publication_year=1958, author=achebe),
+                Book(title="Arrow of God", publication_year=1964, author=achebe),
+                Book(title="Aké: “The Years”", publication_year=1981, author=soyinka),
+            ]
+        )
+
+    def test_data_matches_model_serializer(self):
+        queryset = Book.objects.order_by("id")
+        expected = BookSerializer(queryset, many=True).data
+        rows = BookValuesSerializer.values(queryset)
+        self.assertEqual(BookValuesSerializer(rows).data, expected)
+
+    def test_json_matches_json_renderer(self):
+        queryset = Book.objects.order_by("id")
+        expected = JSONRenderer().render(BookSerializer(queryset, many=True).data)
+        rows = BookValuesSerializer.values(queryset)
+        self.assertEqual(BookValuesSerializer(rows).json, expected)
+
+    def test_json_escapes_line_separators_like_json_renderer(self):
+        Book.objects.create(
+            title="Line\u2028and\u2029paragraph",
+            publication_year=2000,
+            author=Author.objects.get(name="Chinua Achebe"),
+        )
+        queryset = Book.objects.order_by("id")
+        expected = JSONRenderer().render(BookSerializer(queryset, many=True).data)
+        rows = BookValuesSerializer.values(queryset)
+        self.assertIn(b"\\u2028", expected)
+        self.assertEqual(BookValuesSerializer(rows).json, expected)
+        self.assertEqual(b"".join(BookValuesSerializer(rows).stream(2)), expected)
+
+    def test_plan_reads_author_column(self):
+        keys, columns, _ = BookValuesSerializer.get_plan()
+        self.assertEqual(dict(zip(keys, columns))["author"], "author_id")
@@ -1,4 +1,151 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import filters, generics
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.response import Response
+
+from .filters import FullTextSearchFilter, IndexedQueryGuard
+from .models import Author, Book
+from .pagination import StreamingLimitOffsetPagination
+from .query_plan import get_query_plan
+from .serializers import AuthorSerializer, BookSerializer, BookValuesSerializer
+
+
+# QueryPlanMixin derives select_related()/prefetch_related() from the view's
+# serializer so nested fields never trigger a query per row. With DEBUG on,
+# the chosen plan is reported in the X-Query-Plan response header.
+class QueryPlanMixin:
+    def get_query_plan(self):
+        return get_query_plan(self.get_serializer_class())
+
+    def get_queryset(self):
+        return self.get_query_plan().apply(super().get_queryset())
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if settings.DEBUG:
+            response["X-Query-Plan"] = self.get_query_plan().describe()
+        return response
+
+
+# BookListView lists every book to any visitor. It serializes values_list()
+# rows through BookValuesSerializer, which produces the same output as
+# BookSerializer without instantiating a model per row, and JSON responses
+# are streamed so memory stays flat however many rows are requested.
+#
+# Filtering, search and ordering are limited to what Book's indexes serve:
+# `indexed_queries` maps each allowed set of filters to its index-backed
+# orderings, search uses the title full-text index, and with DEBUG on the
+# database's EXPLAIN output is returned in the X-Explain header.
+class BookListView(generics.ListAPIView):
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+    values_serializer_class = BookValuesSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = StreamingLimitOffsetPagination
+    throttle_scope = "books"
+    filter_backends = [
+        IndexedQueryGuard,
+        DjangoFilterBackend,
+        FullTextSearchFilter,
+        filters.OrderingFilter,
+    ]
+    filterset_fields = {
+        "author": ["exact"],
+        "publication_year": ["exact", "gte", "lte"],
+    }
+    search_fields = ["title"]
+    ordering_fields = ["publication_year", "id"]
+    indexed_queries = {
+        frozenset(): (
+            "id",
+            "-id",
+            "publication_year,id",
+            "-publication_year,-id",
+            "publication_year",
+            "-publication_year",
+        ),
+        frozenset({"publication_year"}): (
+            "publication_year,id",
+            "-publication_year,-id",
+            "publication_year",
+            "-publication_year",
+        ),
+        frozenset({"author"}): ("publication_year", "-publication_year"),
+        frozenset({"author", "publication_year"}): (
+            "publication_year",
+            "-publication_year",
+        ),
+    }
+
+    def list(self, request, *args, **kwargs):
+        values_serializer = self.values_serializer_class
+        rows = values_serializer.values(self.filter_queryset(self.get_queryset()))
+        if settings.DEBUG:
+            self.headers["X-Explain"] = " | ".join(rows.explain().splitlines())
+        stream = request.accepted_renderer.format == "json"
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            serializer = values_serializer(page)
+            if stream:
+                return StreamingHttpResponse(
+                    self.paginator.stream_paginated_response(serializer.stream()),
+                    content_type="application/json",
+                )
+            return self.get_paginated_response(serializer.data)
+
+        serializer = values_serializer(rows)
+        if stream:
+            return StreamingHttpResponse(
+                serializer.stream(), content_type="application/json"
+            )
+        return Response(serializer.data)
+
+
+# BookDetailView retrieves a single book by primary key.
+class BookDetailView(generics.RetrieveAPIView):
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+
+# BookCreateView, BookUpdateView and BookDeleteView are restricted to
+# authenticated users; BookSerializer validates the publication year.
+class BookCreateView(generics.CreateAPIView):
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+    permission_classes = [IsAuthenticated]
+
+
+class BookUpdateView(generics.UpdateAPIView):
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+    permission_classes = [IsAuthenticated]
+
+
+class BookDeleteView(generics.DestroyAPIView):
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+    permission_classes = [IsAuthenticated]
+
+
+# AuthorListView and AuthorDetailView nest each author's books; the books
+# are loaded with a single prefetch query per page.
+class AuthorListView(QueryPlanMixin, generics.ListAPIView):
+    queryset = Author.objects.order_by("id")
+    serializer_class = AuthorSerializer
+    pagination_class = LimitOffsetPagination
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+
+class AuthorDetailView(QueryPlanMixin, generics.RetrieveAPIView):
+    queryset = Author.objects.all()
+    serializer_class = AuthorSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
 
 # "ListView", "DetailView", "CreateView", "UpdateView", "DeleteView"
 # "from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated", "IsAuthenticated"
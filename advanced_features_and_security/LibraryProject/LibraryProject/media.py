@@ -0,0 +1,134 @@
+"""
+Serving of user uploads from MEDIA_ROOT.
+
+Unlike django.views.static.serve, serve_media() never reads files into
+Python when the WSGI server provides `wsgi.file_wrapper`: the response wraps
+the open file, which gunicorn and uWSGI hand to os.sendfile() starting at
+the file's current offset for exactly Content-Length bytes. It also
+answers single byte ranges (resumed downloads, media seeking) and
+conditional requests, with ETags kept in memory per (path, mtime, size).
+"""
+import mimetypes
+import os
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+range_re = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# Bytes per read() when the server streams the file itself instead of using
+# sendfile(); FileResponse's 4 KiB default costs a Python call per page.
+BLOCK_SIZE = 256 * 1024
+
+
+@lru_cache(maxsize=4096)
+def file_metadata(path, mtime_ns, size):
+    """Return (etag, last_modified, content_type); cached until the file changes."""
+    content_type, encoding = mimetypes.guess_type(path)
+    if encoding is not None:
+        # Do not let clients transparently decompress e.g. archive.tar.gz.
+        content_type = "application/octet-stream"
+    return (
+        f'"{size:x}-{mtime_ns:x}"',
+        mtime_ns // 1_000_000_000,
+        content_type or "application/octet-stream",
+    )
+
+
+def parse_range(header, size):
+    """
+    Return (start, end) for a single satisfiable `bytes=` range, None when the
+    header should be ignored, or False when the range is unsatisfiable.
+    """
+    match = range_re.match(header.replace(" ", ""))
+    if match is None:
+        # Malformed or multiple ranges: serve the whole file.
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        # Suffix range: the last N bytes.
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+class RangeFile:
+    """
+    A window of `length` bytes of an open file, starting at its current
+    offset. It exposes fileno() so sendfile() can be used, but no seek(), so
+    FileResponse leaves Content-Length to the caller.
+    """
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+def serve_media(request, path):
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(fullpath)
+    except (OSError, ValueError):
+        raise Http404("File not found.")
+    if not os.path.isfile(fullpath):
+        raise Http404("File not found.")
+    size = stat.st_size
+    etag, last_modified, content_type = file_metadata(fullpath, stat.st_mtime_ns, size)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        byte_range = None
+        header = request.META.get("HTTP_RANGE")
+        if header and request.META.get("HTTP_IF_RANGE", etag) in (etag, http_date(last_modified)):
+            byte_range = parse_range(header, size)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+        else:
+            start, end = byte_range or (0, size - 1)
+            file = open(fullpath, "rb")
+            file.seek(start)
+            response = FileResponse(
+                RangeFile(file, end - start + 1),
+                content_type=content_type,
+                status=206 if byte_range else 200,
+            )
+            response.block_size = BLOCK_SIZE
+            response["Content-Length"] = end - start + 1
+            if byte_range:
+                response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    response["Accept-Ranges"] = "bytes"
+    return response
@@ -0,0 +1,192 @@
+"""
+Read-through cache of single model instances, by primary key or slug.
+
+ObjectCache.get(pk=...) or get(slug=...) looks in three places before the
+database:
+
+1. A per-request memo, so a view that fetches the same row twice (say, a
+   permission check followed by get_object()) pays for it once. It is
+   active between object_cache_middleware's entry and exit.
+2. A bounded in-process LRU of instances.
+3. The default cache, where instances are stored pickled so that every
+   process can fill its LRU from it. It must be shared by the processes
+   (the settings use Redis when DJANGO_REDIS_URL is set); with a
+   process-local backend such as LocMemCache a save in one process is
+   never seen by the others, and check_shared_cache() warns about it.
+
+Entries are keyed by a per-object version stamp kept in the shared cache,
+and invalidate() replaces that stamp with a new one, so a save in one
+process is seen by the next get() in every other process: each lookup
+outside the request memo costs one shared-cache read for the stamp, and
+LRU entries carrying an old stamp are ignored. Slug lookups go through a
+slug -> pk entry and are checked against the instance's slug, so a
+renamed object is never served under its old slug.
+
+invalidate() is connected to post_save and post_delete by the app; code
+that changes rows with update() or bulk_update() must call
+invalidate_pks() itself. Inside a transaction the stamp is bumped again on
+commit, so a row re-cached by another process before the commit does not
+outlive it. Callers get a copy of the cached instance, so modifying it
+does not leak into other requests.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core import checks
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.http import Http404
+from django.utils.decorators import sync_and_async_middleware
+
+DEFAULT_LRU_SIZE = 1024
+DEFAULT_TIMEOUT = 60 * 60
+
+# {(label, field, value): instance} for the current request, or None.
+request_memo = ContextVar("object_cache_request_memo", default=None)
+
+
+class ObjectCache:
+    def __init__(self, model, slug_field=None):
+        self.model = model
+        self.label = model._meta.label_lower
+        self.slug_field = slug_field
+        self.size = getattr(settings, "OBJECT_CACHE_LRU_SIZE", DEFAULT_LRU_SIZE)
+        self.timeout = getattr(settings, "OBJECT_CACHE_TIMEOUT", DEFAULT_TIMEOUT)
+        self.lru = OrderedDict()
+        self.lock = threading.Lock()
+
+    def version_key(self, pk):
+        return f"objcache-version:{self.label}:{pk}"
+
+    def get(self, **lookup):
+        """Return a copy of the instance matching pk=... or <slug_field>=...; raises DoesNotExist."""
+        (field, value), = lookup.items()
+        if field not in ("pk", self.slug_field):
+            raise TypeError(f"ObjectCache of {self.label} cannot look up by {field!r}.")
+        memo = request_memo.get()
+        memo_key = (self.label, field, str(value))
+        if memo is not None and memo_key in memo:
+            return copy.copy(memo[memo_key])
+
+        if field == "pk":
+            instance = self.get_by_pk(value)
+        else:
+            slug_key = f"objcache-slug:{self.label}:{value}"
+            pk = cache.get(slug_key)
+            instance = self.get_by_pk(pk) if pk is not None else None
+            if instance is None or getattr(instance, field) != value:
+                # Resolve the slug, then load the row through get_by_pk() so
+                # that it is stored under a stamp read before the fetch.
+                pk = self.model._default_manager.filter(**{field: value}).values_list(
+                    "pk", flat=True
+                ).get()
+                cache.set(slug_key, pk, self.timeout)
+                instance = self.get_by_pk(pk)
+
+        if memo is not None:
+            memo[memo_key] = instance
+        return copy.copy(instance)
+
+    def get_by_pk(self, pk):
+        pk = self.model._meta.pk.to_python(pk)
+        version = cache.get(self.version_key(pk))
+        if version is None:
+            version = self.stamp(pk)
+        with self.lock:
+            entry = self.lru.get(pk)
+            if entry is not None and entry[0] == version:
+                self.lru.move_to_end(pk)
+                return entry[1]
+        instance = cache.get(f"objcache:{self.label}:{pk}:{version}")
+        if instance is None:
+            instance = self.model._default_manager.get(pk=pk)
+            cache.set(f"objcache:{self.label}:{pk}:{version}", instance, self.timeout)
+        self.remember(pk, version, instance)
+        return instance
+
+    def stamp(self, pk):
+        # Never stamped (or evicted): start from a value no earlier key used.
+        cache.add(self.version_key(pk), time.time_ns(), None)
+        return cache.get(self.version_key(pk))
+
+    def bump(self, pks):
+        for pk in pks:
+            # A new value rather than incr(), which some backends do as a get
+            # and a set: two concurrent bumps could write the same stamp, and
+            # a row cached between them would outlive the second.
+            cache.set(self.version_key(pk), time.time_ns(), None)
+            with self.lock:
+                self.lru.pop(pk, None)
+
+    def remember(self, pk, version, instance):
+        with self.lock:
+            self.lru[pk] = (version, instance)
+            self.lru.move_to_end(pk)
+            while len(self.lru) > self.size:
+                self.lru.popitem(last=False)
+
+    def invalidate_pks(self, pks):
+        pks = list(pks)
+        self.bump(pks)
+        if not transaction.get_autocommit():
+            # Another process may have re-cached the old row under the new
+            # stamp before the change committed; bump again once it has.
+            transaction.on_commit(lambda: self.bump(pks))
+        memo = request_memo.get()
+        if memo:
+            for key in [key for key in memo if key[0] == self.label]:
+                del memo[key]
+
+    def invalidate(self, sender, instance, raw=False, **kwargs):
+        """post_save / post_delete receiver."""
+        if not raw:
+            self.invalidate_pks([instance.pk])
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Warn when the default cache is private to each process."""
+    if not isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache):
+        return []
+    return [
+        checks.Warning(
+            "The default cache is local to each process, so changes made in one process "
+            "are not seen by the object caches of the others.",
+            hint="Configure a shared backend in CACHES, such as Redis.",
+            id="objectcache.W001",
+        )
+    ]
+
+
+def get_cached_or_404(object_cache, **lookup):
+    try:
+        return object_cache.get(**lookup)
+    except (object_cache.model.DoesNotExist, ValidationError):
+        raise Http404(f"No {object_cache.model._meta.object_name} matches the given query.")
+
+
+@sync_and_async_middleware
+def object_cache_middleware(get_response):
+    """Give each request its own ObjectCache memo."""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            token = request_memo.set({})
+            try:
+                return await get_response(request)
+            finally:
+                request_memo.reset(token)
+    else:
+        def middleware(request):
+            token = request_memo.set({})
+            try:
+                return get_response(request)
+            finally:
+                request_memo.reset(token)
+    return middleware
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 
@@ -42,6 +43,12 @@ INSTALLED_APPS = [
     "LibraryProject.relationship_app",
 ]
 
+# Workers that never serve /admin/ can boot without the admin, which
+# imports every app's admin module on startup: DJANGO_ADMIN_ENABLED=0.
+ADMIN_ENABLED = os.environ.get("DJANGO_ADMIN_ENABLED", "1") != "0"
+if not ADMIN_ENABLED:
+    INSTALLED_APPS.remove("django.contrib.admin")
+
 AUTH_USER_MODEL = "bookshelf.CustomUser"
 
 
@@ -53,6 +60,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "LibraryProject.LibraryProject.objectcache.object_cache_middleware",
 ]
 # Authentication settings - consolidated and corrected
 
@@ -61,25 +69,39 @@ LOGIN_URL = "/accounts/login/"
 LOGOUT_REDIRECT_URL = "/accounts/login/"
 
 
-ROOT_URLCONF = "LibraryProject.urls"
+ROOT_URLCONF = "LibraryProject.LibraryProject.urls"
 
 
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
-        "APP_DIRS": True,
         "OPTIONS": {
             "context_processors": [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
             ],
+            # Production template mode: every template is read and parsed
+            # once per process, then served from memory by the cached loader.
+            # PRECOMPILE_TEMPLATES below warms it when the server boots.
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
         },
     },
 ]
 
-WSGI_APPLICATION = "LibraryProject.wsgi.application"
+# Compile every template in wsgi.py/asgi.py before serving requests.
+PRECOMPILE_TEMPLATES = not DEBUG
+
+WSGI_APPLICATION = "LibraryProject.LibraryProject.wsgi.application"
 
 
 # Database
@@ -93,6 +115,33 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/ref/settings/#caches
+#
+# The book and library caches, version stamps and the search journal live
+# in the default cache. Deployments that run more than one process must
+# point DJANGO_REDIS_URL at a Redis server, so that a save in one process
+# reaches the others. Without it the cache is local to each process, which
+# suits a single development server, and the system checks warn
+# (objectcache.W001).
+
+if os.environ.get("DJANGO_REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["DJANGO_REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            # The default of 300 would keep culling stamps and cached rows.
+            "OPTIONS": {"MAX_ENTRIES": 100_000},
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -129,6 +178,15 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# Uploads (book covers, profile photos), served by LibraryProject.media.
+MEDIA_URL = "/media/"
+MEDIA_ROOT = BASE_DIR.parent / "media"
+
+# Sitemaps, written by `manage.py generate_sitemaps` and served from disk.
+# SITE_URL is the absolute base of the URLs they list.
+SITEMAP_ROOT = BASE_DIR.parent / "sitemaps"
+SITE_URL = os.environ.get("DJANGO_SITE_URL", "http://localhost:8000")
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -20,13 +20,30 @@ Including another URLconf
 # Update your main project's urls.py file
 
 
-from django.contrib import admin
+from django.conf import settings
 from django.urls import path, include
 
+from .media import serve_media
+from .sitemaps import serve_sitemap
+
 urlpatterns = [
-    path('admin/', admin.site.urls),
-    path('books/', include('bookshelf.urls')),
     path('accounts/', include('django.contrib.auth.urls')),
     path('', include('LibraryProject.relationship_app.urls')),
     path('bookshelf/', include('LibraryProject.bookshelf.urls')),
 ]
+
+if settings.ADMIN_ENABLED:
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path('admin/', admin.site.urls))
+
+# Uploaded media, with byte ranges, conditional requests and sendfile().
+urlpatterns.append(
+    path(f"{settings.MEDIA_URL.strip('/')}/<path:path>", serve_media, name='media'),
+)
+
+# Pregenerated sitemap index and shards (manage.py generate_sitemaps).
+urlpatterns += [
+    path("sitemap.xml", serve_sitemap, name="sitemap"),
+    path("sitemaps/<str:name>", serve_sitemap, name="sitemap_shard"),
+]
@@ -9,9 +9,15 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'LibraryProject.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'LibraryProject.LibraryProject.settings')
 
 application = get_wsgi_application()
 
+# Parse every template before the first request instead of during it.
+if settings.PRECOMPILE_TEMPLATES:
+    from LibraryProject.LibraryProject.template_cache import precompile_templates
+
+    precompile_templates()
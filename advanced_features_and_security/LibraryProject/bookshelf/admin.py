@@ -1,14 +1,35 @@
 # Register your models here.
+from django import forms
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser
-#from .models import Book
-
-#@admin.register(Book)
-#class BookAdmin(admin.ModelAdmin):
-#    list_display = ('title', 'author', 'publication_year')
-#    search_fields = ('title', 'author')
-#    list_filter = ('publication_year',)
+from LibraryProject.relationship_app.admin import BulkActionsMixin
+from LibraryProject.relationship_app.bulk import bulk_update
+from .models import Book, CustomUser, book_cache
+
+
+class ReassignBooksForm(forms.Form):
+    author = forms.CharField(max_length=100)
+
+
+@admin.register(Book)
+class BookAdmin(BulkActionsMixin, admin.ModelAdmin):
+    list_display = ('title', 'author', 'language', 'publication_date')
+    search_fields = ('title', 'author', 'isbn')
+    list_filter = ('language',)
+    actions = ('reassign_author', 'bulk_delete_selected')
+    object_cache = book_cache
+
+    @admin.action(description='Reassign selected books to another author', permissions=['change'])
+    def reassign_author(self, request, queryset):
+        return self.run_bulk_action(
+            request,
+            queryset,
+            'Reassign books to another author',
+            lambda queryset, data, dry_run: bulk_update(
+                queryset, {'author': data['author']}, dry_run=dry_run, object_cache=self.object_cache
+            ),
+            ReassignBooksForm,
+        )
 
 
 class CustomUserAdmin(UserAdmin):
@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class BookshelfConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'LibraryProject.bookshelf'  
+
+    def ready(self):
+        from .models import Book, book_cache
+
+        # Object cache of books (LibraryProject.objectcache).
+        post_save.connect(book_cache.invalidate, sender=Book, dispatch_uid='bookshelf.book.cache.save')
+        post_delete.connect(
+            book_cache.invalidate, sender=Book, dispatch_uid='bookshelf.book.cache.delete'
+        )
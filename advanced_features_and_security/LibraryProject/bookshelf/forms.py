@@ -57,5 +57,96 @@ class BookForm(forms.ModelForm):
         return isbn
 
 
+class BulkBookForm(forms.Form):
+    """
+    Select books by filter and reassign or delete them all at once; see
+    relationship_app.bulk.
+    """
+
+    REASSIGN = "reassign"
+    DELETE = "delete"
+    ACTION_CHOICES = [
+        (REASSIGN, "Reassign to another author"),
+        (DELETE, "Delete"),
+    ]
+    # The permission each action needs, checked once for the whole batch.
+    PERMISSIONS = {
+        REASSIGN: "bookshelf.can_edit",
+        DELETE: "bookshelf.can_delete",
+    }
+
+    book_ids = forms.CharField(
+        required=False,
+        help_text="Comma-separated book IDs.",
+        widget=forms.TextInput(
+            attrs={"class": "form-control", "placeholder": "e.g. 3, 7, 12"}
+        ),
+    )
+    author = forms.CharField(
+        required=False,
+        max_length=100,
+        label="By author",
+        widget=forms.TextInput(attrs={"class": "form-control"}),
+    )
+    title_contains = forms.CharField(
+        required=False,
+        max_length=200,
+        widget=forms.TextInput(attrs={"class": "form-control"}),
+    )
+    language = forms.CharField(
+        required=False,
+        max_length=30,
+        widget=forms.TextInput(attrs={"class": "form-control"}),
+    )
+    action = forms.ChoiceField(
+        choices=ACTION_CHOICES, widget=forms.Select(attrs={"class": "form-select"})
+    )
+    target_author = forms.CharField(
+        required=False,
+        max_length=100,
+        widget=forms.TextInput(attrs={"class": "form-control"}),
+    )
+    dry_run = forms.BooleanField(
+        required=False,
+        initial=True,
+        widget=forms.CheckboxInput(attrs={"class": "form-check-input"}),
+    )
+
+    def clean_book_ids(self):
+        value = self.cleaned_data["book_ids"]
+        try:
+            return [int(pk) for pk in value.replace(",", " ").split()]
+        except ValueError:
+            raise forms.ValidationError(
+                "Enter book IDs as numbers separated by commas."
+            )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        filters = ("book_ids", "author", "title_contains", "language")
+        if not any(cleaned_data.get(name) for name in filters):
+            raise forms.ValidationError(
+                "Choose at least one filter, so a typo cannot select every book."
+            )
+        if cleaned_data.get("action") == self.REASSIGN and not cleaned_data.get(
+            "target_author"
+        ):
+            self.add_error("target_author", "Enter the author to reassign the books to.")
+        return cleaned_data
+
+    def get_queryset(self):
+        books = Book.objects.all()
+        data = self.cleaned_data
+        if data["book_ids"]:
+            books = books.filter(pk__in=data["book_ids"])
+        if data["author"]:
+            books = books.filter(author__iexact=data["author"])
+        if data["title_contains"]:
+            books = books.filter(title__icontains=data["title_contains"])
+        if data["language"]:
+            books = books.filter(language__iexact=data["language"])
+        return books
+
+
 # "ExampleForm"
 
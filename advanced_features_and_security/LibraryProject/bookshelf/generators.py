@@ -0,0 +1,41 @@
+# Synthetic users and catalogue books for the generate_fixtures command.
+from functools import partial
+
+from LibraryProject.LibraryProject.datagen import ZipfSampler, generate as write, next_pk, text
+
+from .models import Book, CustomUser
+
+
+def generate(options):
+    scale = options["scale"]
+    write_rows = partial(
+        write,
+        seed=options["seed"],
+        workers=options["workers"],
+        batch_size=options["batch_size"],
+    )
+
+    start = next_pk(CustomUser)
+    users = range(start, start + int(1000 * scale))
+
+    def build_user(pk, rng):
+        yield CustomUser(pk=pk, username=f"user{pk}", email=f"user{pk}@example.com", password="!")
+
+    yield CustomUser, write_rows(CustomUser, users, build_user)
+
+    start = next_pk(Book)
+    books = range(start, start + int(20000 * scale))
+    authors = ZipfSampler([f"Author {rank}" for rank in range(1, int(500 * scale) + 2)])
+    languages = ZipfSampler(["English", "Spanish", "French", "German", "Swahili", "Japanese"])
+
+    def build_book(pk, rng):
+        yield Book(
+            pk=pk,
+            title=text(rng, 4).title(),
+            author=authors.pick(rng),
+            isbn=f"{pk:013d}",
+            pages=rng.randint(40, 1200),
+            language=languages.pick(rng),
+        )
+
+    yield Book, write_rows(Book, books, build_book)
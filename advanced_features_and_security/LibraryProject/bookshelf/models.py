@@ -1,6 +1,8 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
 
+from LibraryProject.LibraryProject.objectcache import ObjectCache
+
 
 class CustomUserManager(BaseUserManager):
     def create_user(self, username, email=None, password=None, **extra_fields):
@@ -46,4 +48,9 @@ class Book(models.Model):
         ]
 
     def __str__(self):
-        return f"{self.title} by {self.author}"
\ No newline at end of file
+        return f"{self.title} by {self.author}"
+
+
+# Books by pk for the detail, edit and delete views; see
+# LibraryProject.objectcache.
+book_cache = ObjectCache(Book)
@@ -8,6 +8,7 @@ urlpatterns = [
     path('book/create/', views.book_create, name='book_create'),
     path('book/<int:book_id>/edit/', views.book_edit, name='book_edit'),
     path('book/<int:book_id>/delete/', views.book_delete, name='book_delete'),
+    path('book/bulk/', views.book_bulk, name='book_bulk'),
     
     # Permission testing view
     path('permissions/', views.user_permissions, name='user_permissions'),
@@ -3,8 +3,10 @@ from django.contrib.auth.decorators import permission_required, login_required
 from django.contrib import messages
 from django.core.exceptions import PermissionDenied
 from django.http import HttpResponseForbidden
-from .models import Book
-from .forms import BookForm
+from .models import Book, book_cache
+from .forms import BookForm, BulkBookForm
+from LibraryProject.relationship_app.bulk import bulk_delete, bulk_update
+from LibraryProject.LibraryProject.objectcache import get_cached_or_404
 
 
 # Book List View - Requires can_view permission
@@ -25,7 +27,7 @@ def book_detail(request, book_id):
     """
     Display details of a specific book. Requires 'can_view' permission.
     """
-    book = get_object_or_404(Book, id=book_id)
+    book = get_cached_or_404(book_cache, pk=book_id)
     return render(request, "bookshelf/book_detail.html", {"book": book})
 
 
@@ -58,7 +60,7 @@ def book_edit(request, book_id):
     """
     Edit an existing book. Requires 'can_edit' permission.
     """
-    book = get_object_or_404(Book, id=book_id)
+    book = get_cached_or_404(book_cache, pk=book_id)
     if request.method == "POST":
         form = BookForm(request.POST, request.FILES, instance=book)
         if form.is_valid():
@@ -81,7 +83,7 @@ def book_delete(request, book_id):
     """
     Delete a book. Requires 'can_delete' permission.
     """
-    book = get_object_or_404(Book, id=book_id)
+    book = get_cached_or_404(book_cache, pk=book_id)
     if request.method == "POST":
         book.delete()
         messages.success(request, "Book deleted successfully!")
@@ -89,6 +91,47 @@ def book_delete(request, book_id):
     return render(request, "bookshelf/book_confirm_delete.html", {"book": book})
 
 
+# Bulk Book View - Requires can_edit or can_delete, depending on the action
+@login_required
+def book_bulk(request):
+    """
+    Reassign or delete every book matching a filter in one statement. The
+    permission for the chosen action is checked once for the whole batch;
+    dry runs only report the counts.
+    """
+    result = None
+    if request.method == "POST":
+        form = BulkBookForm(request.POST)
+        if form.is_valid():
+            action = form.cleaned_data["action"]
+            if not request.user.has_perm(form.PERMISSIONS[action]):
+                raise PermissionDenied
+            dry_run = form.cleaned_data["dry_run"]
+            if action == BulkBookForm.DELETE:
+                result = bulk_delete(
+                    form.get_queryset(), dry_run=dry_run, object_cache=book_cache
+                )
+                if not dry_run:
+                    messages.success(request, f"{result.changed} books deleted.")
+            else:
+                result = bulk_update(
+                    form.get_queryset(),
+                    {"author": form.cleaned_data["target_author"]},
+                    dry_run=dry_run,
+                    object_cache=book_cache,
+                )
+                if not dry_run:
+                    messages.success(
+                        request,
+                        f"{result.changed} of {result.matched} matching books updated.",
+                    )
+    else:
+        form = BulkBookForm()
+    return render(
+        request, "bookshelf/book_bulk.html", {"form": form, "result": result}
+    )
+
+
 # Helper view to check user permissions (for testing)
 @login_required
 def user_permissions(request):
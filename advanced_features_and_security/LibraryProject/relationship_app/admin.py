@@ -1,6 +1,11 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
 from django.contrib.auth.admin import UserAdmin
-from .models import UserProfile
+from django.db.models import ProtectedError
+from django.template.response import TemplateResponse
+from .bulk import bulk_delete, bulk_update
+from .models import Author, Availability, Book, Copy, Hold, Library, Loan, UserProfile, book_cache
 
 
 class UserProfileInline(admin.StackedInline):
@@ -46,4 +51,163 @@ class UserProfileAdmin(admin.ModelAdmin):
     
     def user_date_joined(self, obj):
         return obj.user.date_joined
-    user_date_joined.short_description = 'Date Joined'
\ No newline at end of file
+    user_date_joined.short_description = 'Date Joined'
+
+
+class BulkActionsMixin:
+    """
+    Admin actions that change or delete the selected rows with one
+    set-based statement (see relationship_app.bulk) instead of saving or
+    deleting them one at a time. Each action shows a confirmation page
+    where "Preview" reports how many rows it would touch and "Apply" runs
+    it. Permissions are checked once, through the action's `permissions`.
+    """
+    bulk_confirmation_template = 'admin/bulk_confirmation.html'
+    object_cache = None
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        # Replaced by bulk_delete_selected, which does not load every row.
+        actions.pop('delete_selected', None)
+        return actions
+
+    def run_bulk_action(self, request, queryset, title, perform, form_class=forms.Form, verb='changed'):
+        """
+        Render the confirmation page, or run perform(queryset, cleaned_data,
+        dry_run) -> BulkResult once the user has applied it.
+        """
+        result = None
+        form = form_class(prefix='bulk')
+        if 'preview' in request.POST or 'apply' in request.POST:
+            form = form_class(request.POST, prefix='bulk')
+            if form.is_valid():
+                try:
+                    result = perform(queryset, form.cleaned_data, dry_run='apply' not in request.POST)
+                except ProtectedError as error:
+                    self.message_user(request, error.args[0], messages.ERROR)
+                    return None
+                if not result.dry_run:
+                    self.message_user(
+                        request,
+                        f'{result.changed} of {result.matched} selected '
+                        f'{self.model._meta.verbose_name_plural} {verb}.',
+                        messages.SUCCESS,
+                    )
+                    return None
+        context = {
+            **self.admin_site.each_context(request),
+            'title': title,
+            'opts': self.model._meta,
+            'form': form,
+            'result': result,
+            'selected_count': queryset.count() if result is None else result.matched,
+            'verb': verb,
+            'action': request.POST['action'],
+            'action_checkbox_name': ACTION_CHECKBOX_NAME,
+            'selected': request.POST.getlist(ACTION_CHECKBOX_NAME),
+            'select_across': request.POST.get('select_across', '0'),
+        }
+        return TemplateResponse(request, self.bulk_confirmation_template, context)
+
+    @admin.action(description='Delete selected %(verbose_name_plural)s', permissions=['delete'])
+    def bulk_delete_selected(self, request, queryset):
+        return self.run_bulk_action(
+            request,
+            queryset,
+            f'Delete {self.model._meta.verbose_name_plural}',
+            lambda queryset, data, dry_run: bulk_delete(
+                queryset, dry_run=dry_run, object_cache=self.object_cache
+            ),
+            verb='deleted',
+        )
+
+
+class MoveBooksForm(forms.Form):
+    library = forms.ModelChoiceField(Library.objects.all())
+
+
+class ReassignBooksForm(forms.Form):
+    author = forms.ModelChoiceField(Author.objects.all())
+
+
+@admin.register(Book)
+class BookAdmin(BulkActionsMixin, admin.ModelAdmin):
+    """
+    Admin interface for Book, with bulk move, reassign and delete actions.
+    """
+    list_display = ('title', 'author', 'library', 'publication_year')
+    list_filter = ('library', 'author')
+    list_select_related = ('author', 'library')
+    search_fields = ('title', 'author__name')
+    actions = ('move_to_library', 'reassign_author', 'bulk_delete_selected')
+    object_cache = book_cache
+
+    @admin.action(description='Move selected books to another library', permissions=['change'])
+    def move_to_library(self, request, queryset):
+        return self.run_bulk_action(
+            request,
+            queryset,
+            'Move books to another library',
+            lambda queryset, data, dry_run: bulk_update(
+                queryset, {'library': data['library']}, dry_run=dry_run, object_cache=self.object_cache
+            ),
+            MoveBooksForm,
+        )
+
+    @admin.action(description='Reassign selected books to another author', permissions=['change'])
+    def reassign_author(self, request, queryset):
+        return self.run_bulk_action(
+            request,
+            queryset,
+            'Reassign books to another author',
+            lambda queryset, data, dry_run: bulk_update(
+                queryset, {'author': data['author']}, dry_run=dry_run, object_cache=self.object_cache
+            ),
+            ReassignBooksForm,
+        )
+
+
+# Circulation records change through relationship_app.circulation, which
+# keeps Availability in step, so they are read-only here.
+class CirculationAdmin(admin.ModelAdmin):
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Copy)
+class CopyAdmin(CirculationAdmin):
+    list_display = ('barcode', 'book', 'library', 'status')
+    list_filter = ('status', 'library')
+    list_select_related = ('book', 'library')
+    search_fields = ('barcode', 'book__title')
+
+
+@admin.register(Loan)
+class LoanAdmin(CirculationAdmin):
+    list_display = ('copy', 'borrower', 'checked_out_at', 'due_at', 'returned_at')
+    list_select_related = ('copy__book', 'borrower')
+    search_fields = ('copy__barcode', 'borrower__username')
+    date_hierarchy = 'checked_out_at'
+
+
+@admin.register(Hold)
+class HoldAdmin(CirculationAdmin):
+    list_display = ('book', 'library', 'patron', 'status', 'placed_at', 'ready_at')
+    list_filter = ('status', 'library')
+    list_select_related = ('book', 'library', 'patron')
+    search_fields = ('book__title', 'patron__username')
+
+
+@admin.register(Availability)
+class AvailabilityAdmin(CirculationAdmin):
+    list_display = ('book', 'library', 'available_copies', 'total_copies')
+    list_filter = ('library',)
+    list_select_related = ('book', 'library')
+    search_fields = ('book__title',)
+
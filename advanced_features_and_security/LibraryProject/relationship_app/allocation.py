@@ -0,0 +1,133 @@
+"""
+Allocation of returned copies to waiting holds.
+
+return_copy() only closes the loan and marks the copy returned. This job
+then takes returned copies in batches and gives each to the oldest
+waiting hold on its title at its branch, first come first served, and
+puts the rest back on the shelf.
+
+A batch is claimed with select_for_update(skip_locked=True), so several
+allocators can run at once: each takes returned copies no other one
+holds and never waits for another's batch to commit. allocate_parallel()
+splits the work between worker processes by library, so the workers do
+not compete for the same hold queues either; on databases without SKIP
+LOCKED it runs a single allocator.
+"""
+import multiprocessing
+from collections import Counter, defaultdict
+
+from django.db import connection, connections, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .circulation import adjust_availability
+from .models import Copy, Hold
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def allocate_returns(library_ids=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Allocate returned copies (at `library_ids`, default everywhere) until
+    none are left unclaimed. Returns (copies allocated, holds filled).
+    """
+    allocated = filled = 0
+    while True:
+        with transaction.atomic():
+            returned = Copy.objects.filter(status=Copy.RETURNED)
+            if library_ids is not None:
+                returned = returned.filter(library__in=library_ids)
+            copies = list(
+                returned.select_for_update(skip_locked=True)
+                .only('book', 'library')
+                .order_by('pk')[:batch_size]
+            )
+            if not copies:
+                break
+            filled += allocate(copies, timezone.now())
+        allocated += len(copies)
+    return allocated, filled
+
+
+def allocate(copies, now):
+    """
+    Pass locked, returned `copies` to waiting holds or the shelf, with a
+    fixed number of statements per batch. Call in a transaction. Returns
+    the number of holds filled.
+    """
+    by_queue = defaultdict(list)
+    for copy in copies:
+        by_queue[(copy.book_id, copy.library_id)].append(copy)
+    queues = Q()
+    for book_id, library_id in by_queue:
+        queues |= Q(book_id=book_id, library_id=library_id)
+    # Locked in queue order, the same order in every worker.
+    waiting = defaultdict(list)
+    for pk, book_id, library_id in (
+        Hold.objects.select_for_update()
+        .filter(queues, status=Hold.WAITING)
+        .order_by('placed_at', 'pk')
+        .values_list('pk', 'book_id', 'library_id')
+    ):
+        waiting[(book_id, library_id)].append(pk)
+
+    ready, shelved = [], []
+    for key, group in by_queue.items():
+        holds = waiting[key]
+        ready.extend(
+            Hold(pk=hold_pk, status=Hold.READY, copy_id=copy.pk, ready_at=now)
+            for hold_pk, copy in zip(holds, group)
+        )
+        shelved.extend(group[len(holds):])
+
+    if ready:
+        Hold.objects.bulk_update(ready, ['status', 'copy', 'ready_at'], batch_size=DEFAULT_BATCH_SIZE)
+        Copy.objects.filter(pk__in=[hold.copy_id for hold in ready]).update(status=Copy.ON_HOLD)
+    if shelved:
+        Copy.objects.filter(pk__in=[copy.pk for copy in shelved]).update(status=Copy.AVAILABLE)
+        for (book_id, library_id), count in Counter(
+            (copy.book_id, copy.library_id) for copy in shelved
+        ).items():
+            adjust_availability(book_id, library_id, available=count)
+    return len(ready)
+
+
+def allocate_parallel(workers, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Run allocate_returns() in `workers` forked processes, each over its own
+    share of the libraries with returned copies. Returns the summed counts.
+    """
+    pending = (
+        Copy.objects.filter(status=Copy.RETURNED)
+        .order_by()
+        .values_list('library')
+        .annotate(count=Count('pk'))
+        .order_by('-count')
+    )
+    # Dealt out busiest first, so each worker gets a similar load.
+    library_ids = [library_id for library_id, count in pending]
+    if workers <= 1 or len(library_ids) <= 1 or not connection.features.has_select_for_update_skip_locked:
+        # Without SKIP LOCKED (SQLite) concurrent writers only fail on each
+        # other's locks.
+        return allocate_returns(batch_size=batch_size)
+
+    def work(part):
+        queue.put(allocate_returns(part, batch_size))
+        connections.close_all()
+
+    # Each child opens its own database connection.
+    connections.close_all()
+    context = multiprocessing.get_context('fork')
+    queue = context.SimpleQueue()
+    processes = [
+        context.Process(target=work, args=(library_ids[index::workers],))
+        for index in range(min(workers, len(library_ids)))
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        if process.exitcode:
+            raise RuntimeError('hold allocation worker failed')
+    results = [queue.get() for _ in processes]
+    return sum(allocated for allocated, filled in results), sum(filled for allocated, filled in results)
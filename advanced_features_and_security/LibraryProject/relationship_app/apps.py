@@ -1,6 +1,32 @@
 from django.apps import AppConfig
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
 
 class RelationshipAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'LibraryProject.relationship_app'
 
+    def ready(self):
+        from . import search, versioning
+        from .bulk import rows_changed
+        from .models import Author, Book, Library, book_cache, library_cache
+
+        # Version stamps for {% cachefragment %}, bumped for every model.
+        post_save.connect(versioning.model_changed, dispatch_uid='relationship_app.versioning.save')
+        post_delete.connect(versioning.model_changed, dispatch_uid='relationship_app.versioning.delete')
+        m2m_changed.connect(versioning.m2m_changed, dispatch_uid='relationship_app.versioning.m2m')
+
+        # Object caches (LibraryProject.objectcache).
+        for model, object_cache in ((Book, book_cache), (Library, library_cache)):
+            label = model._meta.label_lower
+            post_save.connect(object_cache.invalidate, sender=model, dispatch_uid=f'{label}.cache.save')
+            post_delete.connect(
+                object_cache.invalidate, sender=model, dispatch_uid=f'{label}.cache.delete'
+            )
+
+        # Search index journal (relationship_app.search).
+        for model in (Book, Author, Library):
+            label = model._meta.label_lower
+            post_save.connect(search.row_changed, sender=model, dispatch_uid=f'{label}.search.save')
+            post_delete.connect(search.row_changed, sender=model, dispatch_uid=f'{label}.search.delete')
+        rows_changed.connect(search.rows_changed, dispatch_uid='relationship_app.search.bulk')
@@ -0,0 +1,107 @@
+"""
+Set-based bulk operations on books.
+
+bulk_update() and bulk_delete() act on any queryset of books, from the
+relationship_app and bookshelf bulk views and admin actions, with one
+UPDATE or one DELETE however many rows match. With dry_run=True they
+only count, in a single aggregate query, the rows they would touch.
+
+Neither sends model signals, so both do what the signal receivers would:
+bump the model's version stamp for {% cachefragment %} and invalidate
+the affected rows in the object cache, and send rows_changed with the
+ids written for receivers that track rows (relationship_app.search).
+bulk_delete() applies on_delete to referencing rows itself, with one
+statement per referencing table.
+"""
+from django.db import models, transaction
+from django.db.models import Count, ProtectedError, Q
+from django.dispatch import Signal
+
+from .versioning import bump_version
+
+# Sent with sender=model and pks=[ids] after a bulk write.
+rows_changed = Signal()
+
+
+class BulkResult:
+    """
+    `matched` rows were selected and `changed` of them were (or would be)
+    written; an update skips rows that already have the new values.
+    """
+
+    def __init__(self, matched, changed, dry_run):
+        self.matched = matched
+        self.changed = changed
+        self.dry_run = dry_run
+
+    def __repr__(self):
+        return f'<BulkResult matched={self.matched} changed={self.changed} dry_run={self.dry_run}>'
+
+
+def bulk_update(queryset, changes, dry_run=False, object_cache=None):
+    """Set `changes` ({field: value}) on every row of `queryset`."""
+    queryset = queryset.order_by()
+    stale = ~Q(**changes)
+    if dry_run:
+        counts = queryset.aggregate(matched=Count('pk'), changed=Count('pk', filter=stale))
+        return BulkResult(counts['matched'], counts['changed'], dry_run=True)
+    with transaction.atomic():
+        matched = queryset.count()
+        queryset = queryset.filter(stale)
+        pks = list(queryset.select_for_update().values_list('pk', flat=True))
+        changed = queryset.update(**changes) if pks else 0
+    after_write(queryset.model, pks, object_cache)
+    return BulkResult(matched, changed, dry_run=False)
+
+
+def bulk_delete(queryset, dry_run=False, object_cache=None):
+    """Delete every row of `queryset` in one DELETE, without the collector."""
+    queryset = queryset.order_by()
+    if dry_run:
+        matched = queryset.count()
+        return BulkResult(matched, matched, dry_run=True)
+    with transaction.atomic():
+        pks = list(queryset.select_for_update().values_list('pk', flat=True))
+        # delete_rows() skips the collector, which would load every row to
+        # send signals one by one.
+        deleted = delete_rows(queryset) if pks else 0
+    after_write(queryset.model, pks, object_cache)
+    return BulkResult(len(pks), deleted, dry_run=False)
+
+
+def delete_rows(queryset):
+    """
+    DELETE the rows of `queryset` after doing what on_delete asks of the
+    rows that reference them: raise ProtectedError, delete them (the same
+    way, recursively) or null the reference.
+    """
+    for relation in queryset.model._meta.related_objects:
+        if relation.many_to_many:
+            raise TypeError(f'Cannot bulk delete {queryset.model._meta.label}: it has many-to-many relations.')
+        field = relation.field
+        related = field.model._base_manager.filter(**{f'{field.name}__in': queryset})
+        if relation.on_delete in (models.PROTECT, models.RESTRICT):
+            if related.exists():
+                raise ProtectedError(
+                    f'Some {queryset.model._meta.verbose_name_plural} are still referenced by '
+                    f'{field.model._meta.verbose_name_plural}.',
+                    related,
+                )
+        elif relation.on_delete is models.CASCADE:
+            if delete_rows(related):
+                bump_version(field.model)
+        elif relation.on_delete is models.SET_NULL:
+            if related.update(**{field.name: None}):
+                bump_version(field.model)
+        elif relation.on_delete is not models.DO_NOTHING:
+            raise TypeError(f'Cannot bulk delete through {field}: unsupported on_delete.')
+    return queryset._raw_delete(queryset.db)
+
+
+def after_write(model, pks, object_cache):
+    if not pks:
+        return
+    bump_version(model)
+    if object_cache is not None:
+        object_cache.invalidate_pks(pks)
+    rows_changed.send(sender=model, pks=pks)
@@ -0,0 +1,182 @@
+"""
+Circulation: lending copies, returning them and queueing holds.
+
+Every change of a copy's status goes through a conditional UPDATE
+("set on_loan where status is available") and is accepted only if it
+matched a row, so of two concurrent requests for the same copy exactly
+one wins without either holding a lock while it decides. The partial
+unique constraint on open loans backs this up at the database level.
+
+Returned copies are not reshelved or passed to holds here: that is done
+in batches by relationship_app.allocation, so a busy branch's returns do
+not queue on the locks of its hold queues.
+
+Availability keeps the number of copies of each title at each branch and
+how many are on the shelf. It is adjusted with F() expressions in the
+same transaction as the status change, so it never drifts from the
+copies; rebuild_availability() recomputes it from scratch all the same.
+annotate_availability() joins it onto a page of books through its unique
+(book, library) index, so a result page shows availability in the query
+that fetches the books.
+"""
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, FilteredRelation, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Availability, Copy, Hold, Loan
+
+LOAN_PERIOD = timedelta(days=21)
+
+
+class CirculationError(Exception):
+    """The copy, loan or hold is not in a state that allows the operation."""
+
+
+def adjust_availability(book_id, library_id, total=0, available=0):
+    Availability.objects.filter(book_id=book_id, library_id=library_id).update(
+        total_copies=F('total_copies') + total,
+        available_copies=F('available_copies') + available,
+    )
+
+
+def add_copies(book, library, barcodes):
+    """Put new copies of `book` on the shelf at `library`."""
+    with transaction.atomic():
+        copies = Copy.objects.bulk_create(
+            [Copy(book=book, library=library, barcode=barcode) for barcode in barcodes]
+        )
+        # Make sure the row exists, then count the copies in with F(), so
+        # concurrent additions add up.
+        Availability.objects.bulk_create([Availability(book=book, library=library)], ignore_conflicts=True)
+        adjust_availability(book.pk, library.pk, total=len(copies), available=len(copies))
+    return copies
+
+
+def withdraw_copy(copy):
+    """Take a copy that is on the shelf out of circulation."""
+    with transaction.atomic():
+        if not Copy.objects.filter(pk=copy.pk, status=Copy.AVAILABLE).update(status=Copy.WITHDRAWN):
+            raise CirculationError(f'Copy {copy.barcode} is not on the shelf.')
+        adjust_availability(copy.book_id, copy.library_id, total=-1, available=-1)
+    copy.status = Copy.WITHDRAWN
+
+
+def checkout(copy, borrower, now=None):
+    """
+    Lend `copy` to `borrower`. A copy on the hold shelf can only be lent to
+    the patron it was set aside for, which fulfils their hold.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        if Copy.objects.filter(pk=copy.pk, status=Copy.AVAILABLE).update(status=Copy.ON_LOAN):
+            adjust_availability(copy.book_id, copy.library_id, available=-1)
+        elif Hold.objects.filter(copy_id=copy.pk, patron=borrower, status=Hold.READY).update(
+            status=Hold.FULFILLED
+        ):
+            Copy.objects.filter(pk=copy.pk).update(status=Copy.ON_LOAN)
+        else:
+            raise CirculationError(f'Copy {copy.barcode} is not available.')
+        try:
+            with transaction.atomic():
+                loan = Loan.objects.create(
+                    copy_id=copy.pk, borrower=borrower, checked_out_at=now, due_at=now + LOAN_PERIOD
+                )
+        except IntegrityError:
+            raise CirculationError(f'Copy {copy.barcode} is already on loan.')
+    copy.status = Copy.ON_LOAN
+    return loan
+
+
+def checkout_title(book, library, borrower, now=None):
+    """Lend `borrower` any copy of `book` on the shelf at `library`."""
+    shelf = Copy.objects.filter(book=book, library=library, status=Copy.AVAILABLE)
+    for copy in shelf[:5]:
+        try:
+            return checkout(copy, borrower, now)
+        except CirculationError:
+            # Lent to someone else since the query; try the next one.
+            continue
+    raise CirculationError(f'No copy of {book} is on the shelf at {library}.')
+
+
+def return_copy(copy, now=None):
+    """
+    Close the copy's open loan and mark it returned. It reaches the next
+    hold or the shelf when relationship_app.allocation next runs.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        if not Loan.objects.filter(copy_id=copy.pk, returned_at__isnull=True).update(returned_at=now):
+            raise CirculationError(f'Copy {copy.barcode} is not on loan.')
+        Copy.objects.filter(pk=copy.pk).update(status=Copy.RETURNED)
+    copy.status = Copy.RETURNED
+
+
+def place_hold(book, library, patron, now=None):
+    """Queue `patron` for the next copy of `book` to come back at `library`."""
+    try:
+        with transaction.atomic():
+            return Hold.objects.create(
+                book=book, library=library, patron=patron, placed_at=now or timezone.now()
+            )
+    except IntegrityError:
+        raise CirculationError(f'{patron} already has a hold on {book}.')
+
+
+def cancel_hold(hold):
+    """
+    Cancel a waiting or ready hold. A copy set aside for it goes back to
+    the allocator as if just returned.
+    """
+    with transaction.atomic():
+        current = Hold.objects.select_for_update().get(pk=hold.pk)
+        if current.status not in Hold.ACTIVE:
+            raise CirculationError('The hold is no longer active.')
+        Hold.objects.filter(pk=hold.pk).update(status=Hold.CANCELLED)
+        if current.status == Hold.READY:
+            Copy.objects.filter(pk=current.copy_id, status=Copy.ON_HOLD).update(status=Copy.RETURNED)
+    hold.status = Hold.CANCELLED
+
+
+def annotate_availability(books, library):
+    """
+    Annotate `books` with total_copies and available_copies at `library`
+    (zero where it holds none), without an extra query.
+    """
+    return books.annotate(
+        branch=FilteredRelation('availability', condition=Q(availability__library=library)),
+        total_copies=Coalesce(F('branch__total_copies'), 0),
+        available_copies=Coalesce(F('branch__available_copies'), 0),
+    )
+
+
+def rebuild_availability():
+    """Recompute every availability row from the copies. Returns rows written."""
+    counts = (
+        Copy.objects.exclude(status=Copy.WITHDRAWN)
+        .order_by()
+        .values('book', 'library')
+        .annotate(total=Count('pk'), available=Count('pk', filter=Q(status=Copy.AVAILABLE)))
+    )
+    rows = [
+        Availability(
+            book_id=row['book'],
+            library_id=row['library'],
+            total_copies=row['total'],
+            available_copies=row['available'],
+        )
+        for row in counts
+    ]
+    with transaction.atomic():
+        Availability.objects.update(total_copies=0, available_copies=0)
+        Availability.objects.bulk_create(
+            rows,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['book', 'library'],
+            update_fields=['total_copies', 'available_copies'],
+        )
+    return len(rows)
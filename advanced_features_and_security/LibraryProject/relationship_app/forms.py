@@ -1,5 +1,5 @@
 from django import forms
-from .models import Book, Author
+from .models import Book, Author, Library
 
 class BookForm(forms.ModelForm):
     class Meta:
@@ -14,4 +14,91 @@ class BookForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.fields['author'].queryset = Author.objects.all()
-        self.fields['author'].empty_label = "Select an author"
\ No newline at end of file
+        self.fields['author'].empty_label = "Select an author"
+
+class BulkBookForm(forms.Form):
+    """
+    Select books by filter and move them, reassign them or delete them all
+    at once; see relationship_app.bulk.
+    """
+    MOVE = 'move'
+    REASSIGN = 'reassign'
+    DELETE = 'delete'
+    ACTION_CHOICES = [
+        (MOVE, 'Move to another library'),
+        (REASSIGN, 'Reassign to another author'),
+        (DELETE, 'Delete'),
+    ]
+    # The permission each action needs, checked once for the whole batch.
+    PERMISSIONS = {
+        MOVE: 'relationship_app.can_change_book',
+        REASSIGN: 'relationship_app.can_change_book',
+        DELETE: 'relationship_app.can_delete_book',
+    }
+
+    book_ids = forms.CharField(
+        required=False,
+        help_text='Comma-separated book IDs.',
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'e.g. 3, 7, 12'}),
+    )
+    library = forms.ModelChoiceField(
+        Library.objects.all(), required=False, label='In library',
+        widget=forms.Select(attrs={'class': 'form-control'}),
+    )
+    author = forms.ModelChoiceField(
+        Author.objects.all(), required=False, label='By author',
+        widget=forms.Select(attrs={'class': 'form-control'}),
+    )
+    title_contains = forms.CharField(
+        required=False, max_length=100,
+        widget=forms.TextInput(attrs={'class': 'form-control'}),
+    )
+    action = forms.ChoiceField(choices=ACTION_CHOICES, widget=forms.Select(attrs={'class': 'form-control'}))
+    target_library = forms.ModelChoiceField(
+        Library.objects.all(), required=False,
+        widget=forms.Select(attrs={'class': 'form-control'}),
+    )
+    target_author = forms.ModelChoiceField(
+        Author.objects.all(), required=False,
+        widget=forms.Select(attrs={'class': 'form-control'}),
+    )
+    dry_run = forms.BooleanField(
+        required=False, initial=True, help_text='Only count the books that would be affected.',
+    )
+
+    def clean_book_ids(self):
+        value = self.cleaned_data['book_ids']
+        try:
+            return [int(pk) for pk in value.replace(',', ' ').split()]
+        except ValueError:
+            raise forms.ValidationError('Enter book IDs as numbers separated by commas.')
+
+    def clean(self):
+        cleaned_data = super().clean()
+        filters = ('book_ids', 'library', 'author', 'title_contains')
+        if not any(cleaned_data.get(name) for name in filters):
+            raise forms.ValidationError('Choose at least one filter, so a typo cannot select every book.')
+        action = cleaned_data.get('action')
+        if action == self.MOVE and not cleaned_data.get('target_library'):
+            self.add_error('target_library', 'Choose the library to move the books to.')
+        if action == self.REASSIGN and not cleaned_data.get('target_author'):
+            self.add_error('target_author', 'Choose the author to reassign the books to.')
+        return cleaned_data
+
+    def get_queryset(self):
+        books = Book.objects.all()
+        data = self.cleaned_data
+        if data['book_ids']:
+            books = books.filter(pk__in=data['book_ids'])
+        if data['library']:
+            books = books.filter(library=data['library'])
+        if data['author']:
+            books = books.filter(author=data['author'])
+        if data['title_contains']:
+            books = books.filter(title__icontains=data['title_contains'])
+        return books
+
+    def get_changes(self):
+        if self.cleaned_data['action'] == self.MOVE:
+            return {'library': self.cleaned_data['target_library']}
+        return {'author': self.cleaned_data['target_author']}
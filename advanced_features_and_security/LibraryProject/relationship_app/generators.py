@@ -0,0 +1,76 @@
+# Synthetic data for the generate_fixtures command. Books per author follow a
+# Zipf distribution and libraries are sized the same way, so a few authors
+# and branches hold most of the catalogue. Each book has a few copies spread
+# over the branches, and availability is rebuilt from them at the end.
+from functools import partial
+
+from django.contrib.auth import get_user_model
+
+from LibraryProject.LibraryProject.datagen import ZipfSampler, generate as write, heavy_tail, next_pk, text
+
+from .circulation import rebuild_availability
+from .models import Author, Availability, Book, Copy, Librarian, Library, UserProfile
+
+
+def generate(options):
+    scale = options['scale']
+    write_rows = partial(
+        write,
+        seed=options['seed'],
+        workers=options['workers'],
+        batch_size=options['batch_size'],
+    )
+
+    # bulk_create() skips the post_save signal that creates profiles.
+    User = get_user_model()
+    missing = list(
+        User.objects.filter(userprofile__isnull=True).order_by('pk').values_list('pk', flat=True)
+    )
+
+    def build_profile(index, rng):
+        yield UserProfile(user_id=missing[index], role='Member')
+
+    yield UserProfile, write_rows(UserProfile, range(len(missing)), build_profile)
+
+    start = next_pk(Author)
+    authors = range(start, start + int(2000 * scale))
+
+    def build_author(pk, rng):
+        yield Author(pk=pk, name=f'{text(rng, 2).title()} {pk}')
+
+    yield Author, write_rows(Author, authors, build_author)
+
+    start = next_pk(Library)
+    libraries = range(start, start + max(int(50 * scale), 1))
+
+    def build_library(pk, rng):
+        yield Library(pk=pk, name=f'Library {pk}', location=text(rng, 2).title())
+
+    def build_librarian(pk, rng):
+        yield Librarian(name=f'{text(rng, 2).title()} {pk}', library_id=pk)
+
+    yield Library, write_rows(Library, libraries, build_library)
+    yield Librarian, write_rows(Librarian, libraries, build_librarian)
+
+    start = next_pk(Book)
+    books = range(start, start + int(50000 * scale))
+    prolific = ZipfSampler(authors)
+    branches = ZipfSampler(libraries, s=0.8)
+
+    def build_book(pk, rng):
+        yield Book(
+            pk=pk,
+            title=text(rng, 4).title(),
+            author_id=prolific.pick(rng),
+            library_id=branches.pick(rng),
+            publication_year=rng.randint(1900, 2025),
+        )
+
+    yield Book, write_rows(Book, books, build_book)
+
+    def build_copies(pk, rng):
+        for number in range(1 + heavy_tail(rng, 1, limit=20)):
+            yield Copy(book_id=pk, library_id=branches.pick(rng), barcode=f'{pk:08d}-{number:02d}')
+
+    yield Copy, write_rows(Copy, books, build_copies)
+    yield Availability, rebuild_availability()
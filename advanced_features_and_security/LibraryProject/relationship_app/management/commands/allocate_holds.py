@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from LibraryProject.relationship_app.allocation import DEFAULT_BATCH_SIZE, allocate_parallel, allocate_returns
+
+
+class Command(BaseCommand):
+    help = 'Pass returned copies to waiting holds or back to the shelf. Run from cron, e.g. every minute.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1, help='worker processes, split by library')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument(
+            '--library', type=int, action='append', dest='libraries', help='only this library (repeatable)'
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        if options['libraries']:
+            allocated, filled = allocate_returns(options['libraries'], options['batch_size'])
+        else:
+            allocated, filled = allocate_parallel(options['workers'], options['batch_size'])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f'Allocated {allocated:,} returned copies, {filled:,} to waiting holds, in {elapsed:.2f}s.'
+        )
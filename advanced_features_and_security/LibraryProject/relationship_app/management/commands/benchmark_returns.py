@@ -0,0 +1,143 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from LibraryProject.relationship_app.allocation import allocate, allocate_parallel
+from LibraryProject.relationship_app.circulation import LOAN_PERIOD, rebuild_availability, return_copy
+from LibraryProject.relationship_app.models import Author, Book, Copy, Hold, Library, Loan
+
+
+def summary(label, latencies, elapsed):
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return (
+        f'{label:<34} {len(latencies) / elapsed:>8,.0f} returns/s   '
+        f'p50 {statistics.median(latencies) * 1000:>7.2f}ms   p99 {p99 * 1000:>7.2f}ms'
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Simulate a peak return hour: every copy at a few busy branches comes back at once, '
+        'with holds queued on every title. Compares allocating each return inline, the way '
+        'a return view would, with returning only and running the batch allocator. Use '
+        'PostgreSQL for --workers > 1; SQLite serialises every writer.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--libraries', type=int, default=8)
+        parser.add_argument('--titles', type=int, default=200, help='titles per library')
+        parser.add_argument('--copies', type=int, default=3, help='copies per title')
+        parser.add_argument('--holds', type=int, default=2, help='waiting holds per title')
+        parser.add_argument('--workers', type=int, default=4, help='request threads / allocator processes')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        for name, scenario in (('inline', self.run_inline), ('batch', self.run_batch)):
+            author, libraries, patrons = self.seed(name, options)
+            try:
+                copies = list(Copy.objects.filter(library__in=libraries).order_by('?'))
+                self.stdout.write(scenario(copies, options))
+                self.stdout.write(f'{"":<34} {self.fifo_violations(libraries)} holds served out of order')
+            finally:
+                self.clean_up(author, libraries, patrons)
+
+    def seed(self, name, options):
+        User = get_user_model()
+        patrons = [
+            User.objects.create_user(f'benchmark-{name}-{index}', f'benchmark-{name}-{index}@example.com')
+            for index in range(options['holds'] + 1)
+        ]
+        borrower, holders = patrons[0], patrons[1:]
+        author = Author.objects.create(name=f'Benchmark {name}')
+        libraries = Library.objects.bulk_create(
+            Library(name=f'Benchmark {name} {index}', location='Nowhere')
+            for index in range(options['libraries'])
+        )
+        books = Book.objects.bulk_create(
+            Book(title=f'Title {index}', author=author, library=library, publication_year=2000)
+            for library in libraries
+            for index in range(options['titles'])
+        )
+        copies = Copy.objects.bulk_create(
+            Copy(
+                book=book,
+                library=book.library,
+                barcode=f'benchmark-{name}-{book.pk}-{number}',
+                status=Copy.ON_LOAN,
+            )
+            for book in books
+            for number in range(options['copies'])
+        )
+        now = timezone.now()
+        Loan.objects.bulk_create(
+            Loan(copy=copy, borrower=borrower, checked_out_at=now, due_at=now + LOAN_PERIOD)
+            for copy in copies
+        )
+        Hold.objects.bulk_create(
+            Hold(book=book, library=book.library, patron=patron, placed_at=now + timedelta(seconds=position))
+            for book in books
+            for position, patron in enumerate(holders)
+        )
+        rebuild_availability()
+        return author, libraries, patrons
+
+    def run_inline(self, copies, options):
+        # Each return allocates its own copy in its own transaction, the way
+        # the return view did before allocation was batched.
+        start = time.perf_counter()
+
+        def give_back(copy):
+            with transaction.atomic():
+                return_copy(copy)
+                allocate([Copy.objects.select_for_update().get(pk=copy.pk)], timezone.now())
+            return time.perf_counter() - start
+
+        with ThreadPoolExecutor(options['workers']) as pool:
+            latencies = list(pool.map(give_back, copies))
+        return summary(f'inline, {options["workers"]} request threads', latencies, time.perf_counter() - start)
+
+    def run_batch(self, copies, options):
+        start = time.perf_counter()
+
+        def give_back(copy):
+            return_copy(copy)
+            return time.perf_counter() - start
+
+        with ThreadPoolExecutor(options['workers']) as pool:
+            latencies = list(pool.map(give_back, copies))
+        returned = time.perf_counter()
+        allocated, filled = allocate_parallel(options['workers'], options['batch_size'])
+        finished = time.perf_counter()
+        return '\n'.join([
+            summary(f'returns only, {options["workers"]} threads', latencies, returned - start),
+            f'{"batch allocator, " + str(options["workers"]) + " processes":<34} '
+            f'{allocated / (finished - returned):>8,.0f} copies/s   '
+            f'{filled:,} holds filled in {finished - returned:.2f}s',
+        ])
+
+    def fifo_violations(self, libraries):
+        """Ready holds with an older hold on the same queue still waiting."""
+        older_waiting = Hold.objects.filter(
+            book=OuterRef('book'),
+            library=OuterRef('library'),
+            status=Hold.WAITING,
+            placed_at__lt=OuterRef('placed_at'),
+        )
+        return Hold.objects.filter(library__in=libraries, status=Hold.READY).filter(Exists(older_waiting)).count()
+
+    def clean_up(self, author, libraries, patrons):
+        Loan.objects.filter(copy__library__in=libraries).delete()
+        Hold.objects.filter(library__in=libraries).delete()
+        Copy.objects.filter(library__in=libraries).delete()
+        # Cascades to the books and their availability.
+        Library.objects.filter(pk__in=[library.pk for library in libraries]).delete()
+        author.delete()
+        get_user_model().objects.filter(pk__in=[patron.pk for patron in patrons]).delete()
@@ -0,0 +1,96 @@
+import random
+import resource
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from LibraryProject.LibraryProject.datagen import ZipfSampler
+from LibraryProject.relationship_app.models import Book
+from LibraryProject.relationship_app.search import TYPEAHEAD_BUDGET, ModelIndex, tokenize
+
+SYLLABLES = [consonant + vowel for consonant in 'bcdfghklmnprstvz' for vowel in 'aeiou']
+
+
+def vocabulary(rng, size):
+    """`size` distinct made-up words of two to four syllables."""
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    return sorted(words, key=lambda word: rng.random())
+
+
+def summary(label, latencies):
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return f'{label:<30} p50 {statistics.median(latencies) * 1000:>7.3f}ms   p99 {p99 * 1000:>7.3f}ms'
+
+
+def megabytes(size):
+    return f'{size / 2**20:,.0f} MB'
+
+
+class Command(BaseCommand):
+    help = (
+        'Build the book search index over a synthetic catalog (titles of Zipf-distributed words, '
+        'no database rows) and time typeahead lookups against it, with and without a library '
+        'filter, reporting build time and memory. Lookup times exclude the one query that '
+        'fetches the matching books. "search" finds every match, as the search page does; '
+        '"typeahead" stops after TYPEAHEAD_BUDGET seeks, as the search box does.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=5_000_000)
+        parser.add_argument('--libraries', type=int, default=100)
+        parser.add_argument('--vocabulary', type=int, default=50_000, help='distinct title words')
+        parser.add_argument('--queries', type=int, default=2000)
+        parser.add_argument('--limit', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        words = ZipfSampler(vocabulary(rng, options['vocabulary']))
+        libraries = options['libraries']
+
+        def rows():
+            for pk in range(1, options['books'] + 1):
+                title = ' '.join(words.sample(rng, rng.randint(1, 6)))
+                yield pk, title, rng.randrange(libraries) + 1
+
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        index = ModelIndex(Book, ['title'], group_field='library_id')
+        start = time.perf_counter()
+        index.index, index.groups = index.load(rows())
+        built = time.perf_counter() - start
+        after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        self.stdout.write(
+            f'{options["books"]:,} books, {len(index.index.words):,} words indexed in {built:.1f}s; '
+            f'index {megabytes(index.memory())}, peak RSS grew by {megabytes(after - before)}'
+        )
+
+        # What someone types: a title's first words, the last one cut short.
+        queries = []
+        for _ in range(options['queries']):
+            typed = words.sample(rng, rng.randint(1, 3))
+            typed[-1] = typed[-1][:rng.randint(1, len(typed[-1]))]
+            queries.append(tokenize(' '.join(typed)))
+
+        # What the index is asked for a page: twice the limit, in case some
+        # candidates turn out stale.
+        count = 2 * options['limit']
+        for label, pick in (('all libraries', lambda: None), ('one library', lambda: rng.randrange(libraries) + 1)):
+            exhaustive, budgeted, short = [], [], 0
+            for tokens in queries:
+                group = pick()
+                start = time.perf_counter()
+                pks, expansions = index.candidates(tokens, group, 0, count)
+                exhaustive.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                found, expansions = index.candidates(tokens, group, 0, count, TYPEAHEAD_BUDGET)
+                budgeted.append(time.perf_counter() - start)
+                short += len(found) < len(pks)
+            self.stdout.write(summary(f'search, {label}', exhaustive))
+            self.stdout.write(
+                f'{summary(f"typeahead, {label}", budgeted)}   '
+                f'{short / len(queries):.1%} cut short by the budget'
+            )
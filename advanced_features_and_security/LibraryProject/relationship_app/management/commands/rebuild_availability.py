@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from LibraryProject.relationship_app.circulation import rebuild_availability
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-branch availability counts from the copies.'
+
+    def handle(self, *args, **options):
+        written = rebuild_availability()
+        self.stdout.write(f'Wrote {written:,} availability rows.')
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:35
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('relationship_app', '0002_profile'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Copy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('barcode', models.CharField(max_length=32, unique=True)),
+                ('status', models.CharField(choices=[('available', 'Available'), ('on_loan', 'On loan'), ('on_hold', 'On the hold shelf'), ('withdrawn', 'Withdrawn')], default='available', max_length=10)),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='copies', to='relationship_app.book')),
+                ('library', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='copies', to='relationship_app.library')),
+            ],
+            options={
+                'verbose_name_plural': 'copies',
+            },
+        ),
+        migrations.CreateModel(
+            name='Hold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('waiting', 'Waiting'), ('ready', 'Ready for pickup'), ('fulfilled', 'Fulfilled'), ('cancelled', 'Cancelled')], default='waiting', max_length=10)),
+                ('placed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('ready_at', models.DateTimeField(blank=True, null=True)),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holds', to='relationship_app.book')),
+                ('copy', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='holds', to='relationship_app.copy')),
+                ('library', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holds', to='relationship_app.library')),
+                ('patron', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holds', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Loan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('checked_out_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('due_at', models.DateTimeField()),
+                ('returned_at', models.DateTimeField(blank=True, null=True)),
+                ('borrower', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='loans', to=settings.AUTH_USER_MODEL)),
+                ('copy', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='loans', to='relationship_app.copy')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Availability',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_copies', models.PositiveIntegerField(default=0)),
+                ('available_copies', models.PositiveIntegerField(default=0)),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability', to='relationship_app.book')),
+                ('library', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability', to='relationship_app.library')),
+            ],
+            options={
+                'verbose_name_plural': 'availability',
+                'constraints': [models.UniqueConstraint(fields=('book', 'library'), name='availability_book_library'), models.CheckConstraint(condition=models.Q(('available_copies__lte', models.F('total_copies'))), name='availability_within_total')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='copy',
+            index=models.Index(fields=['book', 'library', 'status'], name='copy_shelf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hold',
+            index=models.Index(condition=models.Q(('status', 'waiting')), fields=['book', 'library', 'placed_at', 'id'], name='hold_queue_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='hold',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['waiting', 'ready'])), fields=('patron', 'book'), name='hold_one_active_per_patron'),
+        ),
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(condition=models.Q(('returned_at__isnull', True)), fields=['borrower'], name='loan_open_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='loan',
+            constraint=models.UniqueConstraint(condition=models.Q(('returned_at__isnull', True)), fields=('copy',), name='loan_one_open_per_copy'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('relationship_app', '0003_circulation'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='copy',
+            name='status',
+            field=models.CharField(choices=[('available', 'Available'), ('on_loan', 'On loan'), ('returned', 'Returned, awaiting allocation'), ('on_hold', 'On the hold shelf'), ('withdrawn', 'Withdrawn')], default='available', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='copy',
+            index=models.Index(condition=models.Q(('status', 'returned')), fields=['library', 'id'], name='copy_returned_idx'),
+        ),
+    ]
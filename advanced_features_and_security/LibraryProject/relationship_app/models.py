@@ -1,9 +1,13 @@
 # Create your models here.
 from django.conf import settings
 from django.db import models
+from django.db.models import F, Q
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from LibraryProject.LibraryProject.objectcache import ObjectCache
 
 
 
@@ -95,6 +99,12 @@ class Book(models.Model):
     
     def __str__(self):
         return self.title
+
+
+# Books and libraries by pk for the detail and edit views; see
+# LibraryProject.objectcache.
+book_cache = ObjectCache(Book)
+library_cache = ObjectCache(Library)
     
 
 
@@ -106,3 +116,127 @@ class Librarian(models.Model):
 
     def __str__(self):
         return self.name
+
+
+# Circulation: physical copies of a book held at a branch, the loans and
+# holds on them, and the per-branch availability counts kept in step with
+# both. Change them through relationship_app.circulation, never directly.
+
+# Copy Model
+class Copy(models.Model):
+    AVAILABLE = 'available'
+    ON_LOAN = 'on_loan'
+    RETURNED = 'returned'
+    ON_HOLD = 'on_hold'
+    WITHDRAWN = 'withdrawn'
+    STATUS_CHOICES = [
+        (AVAILABLE, 'Available'),
+        (ON_LOAN, 'On loan'),
+        (RETURNED, 'Returned, awaiting allocation'),
+        (ON_HOLD, 'On the hold shelf'),
+        (WITHDRAWN, 'Withdrawn'),
+    ]
+
+    book = models.ForeignKey(Book, on_delete=models.PROTECT, related_name='copies')
+    library = models.ForeignKey(Library, on_delete=models.PROTECT, related_name='copies')
+    barcode = models.CharField(max_length=32, unique=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=AVAILABLE)
+
+    class Meta:
+        verbose_name_plural = 'copies'
+        indexes = [
+            # Finding a copy of a title on the shelf at a branch.
+            models.Index(fields=['book', 'library', 'status'], name='copy_shelf_idx'),
+            # The allocator's work queue (relationship_app.allocation).
+            models.Index(fields=['library', 'id'], condition=Q(status='returned'), name='copy_returned_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.barcode} ({self.book})"
+
+
+# Loan Model
+class Loan(models.Model):
+    copy = models.ForeignKey(Copy, on_delete=models.PROTECT, related_name='loans')
+    borrower = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='loans')
+    checked_out_at = models.DateTimeField(default=timezone.now)
+    due_at = models.DateTimeField()
+    returned_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            # A copy can be out to one borrower at a time, whatever races
+            # the application-level checks lose.
+            models.UniqueConstraint(
+                fields=['copy'], condition=Q(returned_at__isnull=True), name='loan_one_open_per_copy'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['borrower'], condition=Q(returned_at__isnull=True), name='loan_open_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.copy} to {self.borrower}"
+
+
+# Hold Model
+class Hold(models.Model):
+    WAITING = 'waiting'
+    READY = 'ready'
+    FULFILLED = 'fulfilled'
+    CANCELLED = 'cancelled'
+    STATUS_CHOICES = [
+        (WAITING, 'Waiting'),
+        (READY, 'Ready for pickup'),
+        (FULFILLED, 'Fulfilled'),
+        (CANCELLED, 'Cancelled'),
+    ]
+    ACTIVE = [WAITING, READY]
+
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='holds')
+    library = models.ForeignKey(Library, on_delete=models.CASCADE, related_name='holds')  # pickup branch
+    patron = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='holds')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=WAITING)
+    placed_at = models.DateTimeField(default=timezone.now)
+    copy = models.ForeignKey(Copy, on_delete=models.SET_NULL, null=True, blank=True, related_name='holds')
+    ready_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['patron', 'book'], condition=Q(status__in=['waiting', 'ready']),
+                name='hold_one_active_per_patron',
+            ),
+        ]
+        indexes = [
+            # The FIFO queue of a title at a branch.
+            models.Index(
+                fields=['book', 'library', 'placed_at', 'id'], condition=Q(status='waiting'),
+                name='hold_queue_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.patron}: {self.book} ({self.get_status_display()})"
+
+
+# Availability Model
+class Availability(models.Model):
+    """Copies of a book held at a library, and how many are on the shelf."""
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='availability')
+    library = models.ForeignKey(Library, on_delete=models.CASCADE, related_name='availability')
+    total_copies = models.PositiveIntegerField(default=0)
+    available_copies = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'availability'
+        constraints = [
+            models.UniqueConstraint(fields=['book', 'library'], name='availability_book_library'),
+            models.CheckConstraint(
+                condition=Q(available_copies__lte=F('total_copies')), name='availability_within_total'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.book} at {self.library}: {self.available_copies}/{self.total_copies}"
+
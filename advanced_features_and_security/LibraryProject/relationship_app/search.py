@@ -0,0 +1,493 @@
+"""
+Catalog search and typeahead over books, authors and libraries.
+
+Each process keeps an in-memory index per model. Every word maps to a
+sorted array of the ids of the rows containing it, and the words are kept
+in a sorted list, so the words starting with a prefix are one bisect
+away: a trie flattened into a sorted array, a few bytes per word instead
+of a node per letter. Prefixes of one or two letters, which start too
+many words to merge on the fly, get posting lists of their own. Ids are
+stored as 32-bit integers (array('I')); benchmark_search reports the
+footprint for a catalog of any size.
+
+A query matches the rows that contain, for every query word, some word
+starting with it. Matches are found by leapfrogging the posting lists,
+shortest first, in ascending id order, so a page of results costs a few
+bisects per match however long the lists are. Books are restricted to a
+library by one more list: the books it holds. Only words that rarely
+occur together make the lists skip past each other for long; typeahead
+gives up after TYPEAHEAD_BUDGET seeks with the matches found so far.
+
+Saves and deletes, and relationship_app.bulk writes, record the changed
+ids in a journal kept in the default cache, which must be shared by every
+process (see CACHES in the settings). Before searching, every process
+replays the entries it has not seen into its own index, with one query
+for the changed rows. Replaying only adds ids; a row that no
+longer matches a word it used to contain is dropped from that word when
+a search finds it there, since every result is checked against the row
+fetched for display. A process that falls behind the journal, or starts
+cold, rebuilds its index on a background thread and answers from the
+database meanwhile.
+"""
+import bisect
+import heapq
+import re
+import sys
+import threading
+import time
+from array import array
+from collections import defaultdict
+from itertools import islice
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Q
+
+from .circulation import annotate_availability
+from .models import Author, Book, Library
+
+TYPECODE = 'I'
+# A prefix expands to at most this many of the words it starts (the most
+# frequent among the first MAX_SCAN in alphabetical order).
+MAX_EXPANSIONS = 32
+MAX_SCAN = 2000
+# Prefixes up to this long get posting lists of their own, since they
+# start too many words to merge on the fly.
+SHORT_PREFIX = 2
+JOURNAL_TIMEOUT = 24 * 60 * 60
+# How long a journal entry may be missing before it counts as lost: the
+# writer increments the sequence before it stores the entry.
+JOURNAL_GRACE = 5
+# Sequence numbers a writer tries before overwriting an entry; see Journal.record().
+JOURNAL_ATTEMPTS = 20
+# Further behind than this, rebuilding is cheaper than replaying.
+MAX_REPLAY = 10000
+# Seeks a typeahead lookup may spend: enough to find the first matches of
+# all but the rarest combinations of words, and a few milliseconds at most.
+TYPEAHEAD_BUDGET = 5000
+
+word_re = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return word_re.findall(text.casefold())
+
+
+def insert(postings, doc):
+    index = bisect.bisect_left(postings, doc)
+    if index == len(postings) or postings[index] != doc:
+        postings.insert(index, doc)
+
+
+def remove(postings, doc):
+    index = bisect.bisect_left(postings, doc)
+    if index < len(postings) and postings[index] == doc:
+        del postings[index]
+
+
+class Postings:
+    """Forward-only cursor over one sorted posting list."""
+
+    def __init__(self, postings):
+        self.postings = postings
+        self.size = len(postings)
+        self.position = 0
+
+    def seek(self, doc):
+        """The smallest id >= doc in the list, or None."""
+        postings, position = self.postings, self.position
+        if position < self.size and postings[position] < doc:
+            position = self.position = bisect.bisect_left(postings, doc, position + 1)
+        return postings[position] if position < self.size else None
+
+
+class Union:
+    """
+    Forward-only cursor over the union of sorted posting lists: a heap of
+    the lists by their next id, so a seek only moves the lists behind it.
+    """
+
+    def __init__(self, lists):
+        self.size = sum(map(len, lists))
+        self.heap = [(postings[0], 0, number, postings) for number, postings in enumerate(lists)]
+        heapq.heapify(self.heap)
+
+    def seek(self, doc):
+        """The smallest id >= doc in any of the lists, or None."""
+        heap = self.heap
+        while heap and heap[0][0] < doc:
+            head, position, number, postings = heap[0]
+            position = bisect.bisect_left(postings, doc, position + 1)
+            if position < len(postings):
+                heapq.heapreplace(heap, (postings[position], position, number, postings))
+            else:
+                heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+
+def cursor(lists):
+    lists = [postings for postings in lists if postings]
+    return Postings(lists[0]) if len(lists) == 1 else Union(lists)
+
+
+def leapfrog(cursors, start=0, budget=None):
+    """
+    Yield, in ascending order from `start`, the ids every cursor contains;
+    with a `budget`, stop after that many seeks.
+    """
+    cursors = sorted(cursors, key=lambda cursor: cursor.size)
+    candidate = start
+    seeks = 0
+    while budget is None or seeks < budget:
+        for cursor in cursors:
+            seeks += 1
+            doc = cursor.seek(candidate)
+            if doc is None:
+                return
+            if doc != candidate:
+                candidate = doc
+                break
+        else:
+            yield candidate
+            candidate += 1
+
+
+def keys(words):
+    """The posting lists a row with `words` belongs to: its words and their short prefixes."""
+    found = set(words)
+    for word in words:
+        found.update(word[:length] + '*' for length in range(1, min(len(word), SHORT_PREFIX) + 1))
+    return found
+
+
+class PrefixIndex:
+    def __init__(self):
+        # Keyed by word, and by prefix + '*' for prefixes of up to
+        # SHORT_PREFIX characters ('*' is never part of a word).
+        self.postings = {}
+        self.words = []
+
+    def load(self, docs):
+        """Index (id, words) pairs given in ascending id order, from empty."""
+        postings = self.postings
+        for doc, words in docs:
+            for key in keys(words):
+                try:
+                    postings[key].append(doc)
+                except KeyError:
+                    postings[key] = array(TYPECODE, [doc])
+        self.words = sorted(key for key in postings if not key.endswith('*'))
+
+    def add(self, doc, words):
+        for key in keys(words):
+            postings = self.postings.get(key)
+            if postings is None:
+                postings = self.postings[key] = array(TYPECODE)
+                if not key.endswith('*'):
+                    bisect.insort(self.words, key)
+            insert(postings, doc)
+
+    def discard(self, doc, keys):
+        for key in keys:
+            postings = self.postings.get(key)
+            if postings is not None:
+                remove(postings, doc)
+
+    def expand(self, prefix):
+        """The keys of the posting lists of rows with a word starting with `prefix`."""
+        if len(prefix) <= SHORT_PREFIX:
+            return [prefix + '*']
+        start = bisect.bisect_left(self.words, prefix)
+        end = bisect.bisect_left(
+            self.words, prefix + '\U0010ffff', start, min(len(self.words), start + MAX_SCAN)
+        )
+        words = self.words[start:end]
+        if len(words) > MAX_EXPANSIONS:
+            # The prefix itself, if it is a word, is always kept.
+            words = words[:1] if words[0] == prefix else []
+            words += heapq.nlargest(
+                MAX_EXPANSIONS - len(words), self.words[start + len(words):end],
+                key=lambda word: len(self.postings[word]),
+            )
+        return words
+
+    def memory(self):
+        """Approximate bytes held by the index."""
+        size = sys.getsizeof(self.postings) + sys.getsizeof(self.words)
+        for key, postings in self.postings.items():
+            size += sys.getsizeof(key) + sys.getsizeof(postings)
+        return size
+
+
+class Journal:
+    """Ids of changed rows of one model, shared by every process through the cache."""
+
+    def __init__(self, model):
+        self.prefix = f'search-journal:{model._meta.label_lower}'
+
+    def position(self):
+        return cache.get(f'{self.prefix}:seq', 0)
+
+    def record(self, pks):
+        key = f'{self.prefix}:seq'
+        pks = list(pks)
+        step = 1
+        for _ in range(JOURNAL_ATTEMPTS):
+            try:
+                seq = cache.incr(key, step)
+            except ValueError:
+                cache.add(key, 0, None)
+                seq = cache.incr(key, step)
+            # add() claims the number. It is taken when incr() is a get and a
+            # set (the database and file caches) and another writer was
+            # handed it too, or when the sequence was evicted and restarted
+            # under entries that are still live. Skip further each time, so
+            # a run of old entries is passed in a few attempts; readers
+            # replay old entries harmlessly and rebuild over the gaps.
+            if cache.add(f'{self.prefix}:{seq}', pks, JOURNAL_TIMEOUT):
+                return
+            step *= 2
+        # Rather than lose the change, replace whatever holds the last number.
+        cache.set(f'{self.prefix}:{seq}', pks, JOURNAL_TIMEOUT)
+
+    def read(self, first, last):
+        """{seq: ids} for the entries first..last still in the cache."""
+        entries = cache.get_many([f'{self.prefix}:{seq}' for seq in range(first, last + 1)])
+        return {int(key.rsplit(':', 1)[1]): pks for key, pks in entries.items()}
+
+
+class ModelIndex:
+    """
+    The PrefixIndex of one model's text fields, optionally with the ids
+    grouped by a foreign key, kept in step with the model through its
+    journal.
+    """
+
+    def __init__(self, model, text_fields, group_field=None):
+        self.model = model
+        self.text_fields = text_fields
+        self.group_field = group_field
+        self.fields = ['pk', *text_fields] + ([group_field] if group_field else [])
+        self.journal = Journal(model)
+        self.lock = threading.RLock()
+        self.index = None
+        self.groups = None
+        self.position = 0
+        self.missing_since = None
+        self.rebuilding = False
+
+    def words(self, texts):
+        return set(tokenize(' '.join(texts)))
+
+    def row_words(self, row):
+        return self.words(getattr(row, field) for field in self.text_fields)
+
+    def load(self, rows):
+        """Build a fresh index from (pk, *text_fields[, group]) tuples in pk order."""
+        index = PrefixIndex()
+        groups = defaultdict(lambda: array(TYPECODE))
+        count = len(self.text_fields)
+
+        def docs():
+            for row in rows:
+                if self.group_field:
+                    groups[row[-1]].append(row[0])
+                yield row[0], self.words(row[1:1 + count])
+
+        index.load(docs())
+        return index, dict(groups)
+
+    def rebuild(self):
+        # Read before the scan, so that changes made during it are replayed.
+        position = self.journal.position()
+        rows = self.model._default_manager.order_by('pk').values_list(*self.fields).iterator(
+            chunk_size=10000
+        )
+        index, groups = self.load(rows)
+        with self.lock:
+            self.index, self.groups, self.position = index, groups, position
+            self.missing_since = None
+
+    def start_rebuild(self):
+        with self.lock:
+            if self.rebuilding:
+                return
+            self.rebuilding = True
+
+        def run():
+            try:
+                self.rebuild()
+            finally:
+                self.rebuilding = False
+                connection.close()
+
+        name = f'search-{self.model._meta.model_name}'
+        threading.Thread(target=run, name=name, daemon=True).start()
+
+    def ready(self):
+        """Bring the index up to date; False while it is (re)building from scratch."""
+        if self.index is None:
+            self.start_rebuild()
+            return False
+        latest = self.journal.position()
+        if latest == self.position:
+            return True
+        if latest < self.position or latest - self.position > MAX_REPLAY:
+            # The journal was reset or has moved on too far.
+            self.start_rebuild()
+            return True
+        entries = self.journal.read(self.position + 1, latest)
+        position, pks = self.position, set()
+        while position < latest and position + 1 in entries:
+            position += 1
+            pks.update(entries[position])
+        if position < latest:
+            if self.missing_since is None:
+                self.missing_since = time.monotonic()
+            elif time.monotonic() - self.missing_since > JOURNAL_GRACE:
+                self.start_rebuild()
+        else:
+            self.missing_since = None
+        rows = ()
+        if pks:
+            rows = self.model._default_manager.filter(pk__in=pks).values_list(*self.fields)
+        count = len(self.text_fields)
+        with self.lock:
+            for row in rows:
+                self.index.add(row[0], self.words(row[1:1 + count]))
+                if self.group_field:
+                    insert(self.groups.setdefault(row[-1], array(TYPECODE)), row[0])
+            self.position = max(self.position, position)
+        return True
+
+    def candidates(self, tokens, group=None, start=0, count=10, budget=None):
+        """
+        Up to `count` ids from `start` up containing every token as a word
+        prefix (and in `group`), found within `budget` seeks if given, with
+        the keys each token expanded to.
+        """
+        with self.lock:
+            expansions = [self.index.expand(token) for token in tokens]
+            postings = self.index.postings
+            cursors = [
+                cursor(postings.get(key) for key in expansion) for expansion in expansions
+            ]
+            if group is not None:
+                cursors.append(cursor([self.groups.get(group)]))
+            if not cursors:
+                return [], expansions
+            return list(islice(leapfrog(cursors, start, budget), count)), expansions
+
+    def search(self, tokens, queryset, group=None, limit=10, budget=None):
+        """
+        The first `limit` rows of `queryset` the index matches, checked
+        against the rows themselves. Stale entries found on the way are
+        dropped from the index.
+        """
+        found, start = [], 0
+        while len(found) < limit:
+            # Fetch extra candidates, in case some turn out stale.
+            pks, expansions = self.candidates(tokens, group, start, 2 * limit, budget)
+            if not pks:
+                break
+            rows = queryset.in_bulk(pks)
+            for pk in pks:
+                row = rows.get(pk)
+                if row is not None and self.matches(row, tokens, group):
+                    found.append(row)
+                else:
+                    self.forget(pk, row, expansions, group)
+            if len(pks) < 2 * limit:
+                break
+            start = pks[-1] + 1
+        return found[:limit]
+
+    def matches(self, row, tokens, group):
+        words = self.row_words(row)
+        if group is not None and getattr(row, self.group_field) != group:
+            return False
+        return all(any(word.startswith(token) for word in words) for token in tokens)
+
+    def forget(self, pk, row, expansions, group):
+        """Drop `pk` from the lists it was found in but no longer belongs to."""
+        words = self.row_words(row) if row is not None else set()
+        with self.lock:
+            found_in = {key for expansion in expansions for key in expansion}
+            self.index.discard(pk, found_in - keys(words))
+            if group is not None and (row is None or getattr(row, self.group_field) != group):
+                remove(self.groups.get(group, array(TYPECODE)), pk)
+
+    def fallback(self, tokens, queryset, group=None, limit=10):
+        """The database's answer, while the index is being built."""
+        condition = Q()
+        for token in tokens:
+            condition &= Q(
+                *[Q(**{f'{field}__icontains': token}) for field in self.text_fields],
+                _connector=Q.OR,
+            )
+        if group is not None:
+            condition &= Q(**{self.group_field: group})
+        return list(queryset.filter(condition).order_by('pk')[:limit]) if tokens or group else []
+
+    def lookup(self, query, queryset=None, group=None, limit=10, budget=None):
+        tokens = tokenize(query)
+        queryset = queryset if queryset is not None else self.model._default_manager.all()
+        if not tokens and group is None:
+            return []
+        if self.ready():
+            return self.search(tokens, queryset, group, limit, budget)
+        return self.fallback(tokens, queryset, group, limit)
+
+    def memory(self):
+        """Approximate bytes held by the index and the groups."""
+        with self.lock:
+            if self.index is None:
+                return 0
+            groups = sum(sys.getsizeof(postings) for postings in self.groups.values())
+            return self.index.memory() + sys.getsizeof(self.groups) + groups
+
+
+book_index = ModelIndex(Book, ['title'], group_field='library_id')
+author_index = ModelIndex(Author, ['name'])
+library_index = ModelIndex(Library, ['name', 'location'])
+INDEXES = {index.model: index for index in (book_index, author_index, library_index)}
+
+
+def search_books(query, library=None, limit=10, budget=None):
+    """Books matching `query`, held by `library` and annotated with its availability if given."""
+    books = Book.objects.select_related('author')
+    if library is None:
+        return book_index.lookup(query, books, limit=limit, budget=budget)
+    books = annotate_availability(books, library)
+    return book_index.lookup(query, books, library.pk, limit, budget)
+
+
+def typeahead(query, library=None, limit=5):
+    """
+    A few books, authors and libraries for the search box, each found
+    within TYPEAHEAD_BUDGET: the rarest combinations of words may get
+    fewer suggestions than they have matches.
+    """
+    return {
+        'books': search_books(query, library, limit, TYPEAHEAD_BUDGET),
+        'authors': author_index.lookup(query, limit=limit, budget=TYPEAHEAD_BUDGET),
+        'libraries': library_index.lookup(query, limit=limit, budget=TYPEAHEAD_BUDGET),
+    }
+
+
+def record(model, pks):
+    index = INDEXES.get(model)
+    if index is not None and pks:
+        pks = list(pks)
+        transaction.on_commit(lambda: index.journal.record(pks))
+
+
+def row_changed(sender, instance, raw=False, **kwargs):
+    """post_save / post_delete receiver."""
+    if not raw:
+        record(sender, [instance.pk])
+
+
+def rows_changed(sender, pks, **kwargs):
+    """relationship_app.bulk.rows_changed receiver."""
+    record(sender, pks)
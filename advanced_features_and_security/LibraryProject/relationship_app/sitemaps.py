@@ -0,0 +1,14 @@
+from django.urls import reverse
+
+from LibraryProject.LibraryProject.sitemaps import Section
+
+from .models import Library
+
+
+def library_rows():
+    return Library.objects.values_list('pk')
+
+
+SECTIONS = [
+    Section('libraries', library_rows, lambda row: (reverse('library_detail', args=[row[0]]), None)),
+]
@@ -1,3 +1,408 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .allocation import allocate_returns
+from .bulk import bulk_update
+from .circulation import (
+    LOAN_PERIOD,
+    CirculationError,
+    add_copies,
+    cancel_hold,
+    checkout,
+    checkout_title,
+    place_hold,
+    rebuild_availability,
+    return_copy,
+)
+from .models import Author, Availability, Book, Copy, Hold, Library, Loan
+from .search import (
+    INDEXES,
+    JOURNAL_ATTEMPTS,
+    author_index,
+    book_index,
+    library_index,
+    search_books,
+    typeahead,
+)
+
+User = get_user_model()
+
+
+class CatalogTestCase(TestCase):
+    """Two branches, a few books and patrons."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Author.objects.create(name='Chinua Achebe')
+        cls.central = Library.objects.create(name='Central', location='Lagos')
+        cls.branch = Library.objects.create(name='Riverside', location='Onitsha')
+        cls.book = Book.objects.create(
+            title='Things Fall Apart', author=cls.author, library=cls.central, publication_year=1958
+        )
+        cls.other_book = Book.objects.create(
+            title='Arrow of God', author=cls.author, library=cls.central, publication_year=1964
+        )
+        cls.ada = User.objects.create_user('ada', 'ada@example.com')
+        cls.bola = User.objects.create_user('bola', 'bola@example.com')
+        cls.chidi = User.objects.create_user('chidi', 'chidi@example.com')
+
+    def availability(self, book=None, library=None):
+        row = Availability.objects.get(book=book or self.book, library=library or self.central)
+        return row.total_copies, row.available_copies
+
+
+class CirculationTests(CatalogTestCase):
+    def setUp(self):
+        self.copy, self.spare = add_copies(self.book, self.central, ['TFA-1', 'TFA-2'])
+
+    def test_add_copies_counts_them_in(self):
+        self.assertEqual(self.availability(), (2, 2))
+        add_copies(self.book, self.central, ['TFA-3'])
+        self.assertEqual(self.availability(), (3, 3))
+
+    def test_checkout_lends_the_copy(self):
+        now = timezone.now()
+        loan = checkout(self.copy, self.ada, now)
+        self.assertEqual(loan.due_at, now + LOAN_PERIOD)
+        self.assertEqual(Copy.objects.get(pk=self.copy.pk).status, Copy.ON_LOAN)
+        self.assertEqual(self.availability(), (2, 1))
+
+    def test_double_checkout_fails_cleanly(self):
+        checkout(self.copy, self.ada)
+        with self.assertRaises(CirculationError):
+            checkout(self.copy, self.bola)
+        self.assertEqual(Loan.objects.filter(copy=self.copy).count(), 1)
+        self.assertEqual(Loan.objects.get(copy=self.copy).borrower, self.ada)
+        self.assertEqual(self.availability(), (2, 1))
+
+    def test_checkout_losing_the_race_rolls_back(self):
+        # The copy reads as on the shelf, but another request has already
+        # opened a loan on it: the constraint rejects the second loan and
+        # the status change and count that preceded it are undone.
+        Loan.objects.create(copy=self.copy, borrower=self.ada, due_at=timezone.now() + LOAN_PERIOD)
+        with self.assertRaisesMessage(CirculationError, 'already on loan'):
+            checkout(self.copy, self.bola)
+        self.assertEqual(Copy.objects.get(pk=self.copy.pk).status, Copy.AVAILABLE)
+        self.assertEqual(self.availability(), (2, 2))
+
+    def test_one_open_loan_per_copy(self):
+        due = timezone.now() + LOAN_PERIOD
+        Loan.objects.create(copy=self.copy, borrower=self.ada, due_at=due)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Loan.objects.create(copy=self.copy, borrower=self.bola, due_at=due)
+        # The constraint is partial: closed loans do not count.
+        Loan.objects.filter(copy=self.copy).update(returned_at=timezone.now())
+        Loan.objects.create(copy=self.copy, borrower=self.bola, due_at=due)
+        self.assertEqual(Loan.objects.filter(copy=self.copy).count(), 2)
+
+    def test_return_waits_for_allocation(self):
+        checkout(self.copy, self.ada)
+        return_copy(self.copy)
+        self.assertEqual(Copy.objects.get(pk=self.copy.pk).status, Copy.RETURNED)
+        self.assertIsNotNone(Loan.objects.get(copy=self.copy).returned_at)
+        # Not on the shelf until relationship_app.allocation runs.
+        self.assertEqual(self.availability(), (2, 1))
+        with self.assertRaises(CirculationError):
+            return_copy(self.copy)
+
+    def test_checkout_title_takes_any_copy_on_the_shelf(self):
+        checkout_title(self.book, self.central, self.ada)
+        checkout_title(self.book, self.central, self.bola)
+        self.assertEqual(self.availability(), (2, 0))
+        with self.assertRaises(CirculationError):
+            checkout_title(self.book, self.central, self.chidi)
+
+    def test_rebuild_availability_matches_counts(self):
+        checkout(self.copy, self.ada)
+        add_copies(self.other_book, self.branch, ['AOG-1'])
+        expected = {
+            (row.book_id, row.library_id): (row.total_copies, row.available_copies)
+            for row in Availability.objects.all()
+        }
+        Availability.objects.update(total_copies=7, available_copies=7)
+        rebuild_availability()
+        self.assertEqual(
+            {
+                (row.book_id, row.library_id): (row.total_copies, row.available_copies)
+                for row in Availability.objects.all()
+            },
+            expected,
+        )
+
+
+class AllocationTests(CatalogTestCase):
+    def setUp(self):
+        self.copy, = add_copies(self.book, self.central, ['TFA-1'])
+        checkout(self.copy, self.ada)
+        return_copy(self.copy)
+
+    def place_holds(self, *patrons):
+        # Placed in the order given, an hour apart.
+        start = timezone.now() - timedelta(days=1)
+        return [
+            place_hold(self.book, self.central, patron, start + timedelta(hours=hour))
+            for hour, patron in enumerate(patrons)
+        ]
+
+    def test_returned_copy_goes_to_the_oldest_hold(self):
+        # Created newest first, so that pk order is not queue order.
+        start = timezone.now() - timedelta(days=1)
+        newer = place_hold(self.book, self.central, self.chidi, start + timedelta(hours=1))
+        older = place_hold(self.book, self.central, self.bola, start)
+        self.assertEqual(allocate_returns(), (1, 1))
+        older.refresh_from_db()
+        newer.refresh_from_db()
+        self.assertEqual((older.status, older.copy_id), (Hold.READY, self.copy.pk))
+        self.assertIsNotNone(older.ready_at)
+        self.assertEqual(newer.status, Hold.WAITING)
+        self.assertEqual(Copy.objects.get(pk=self.copy.pk).status, Copy.ON_HOLD)
+        # Set aside, not on the shelf.
+        self.assertEqual(self.availability(), (1, 0))
+
+    def test_holds_elsewhere_are_not_eligible(self):
+        at_branch = place_hold(self.book, self.branch, self.bola)
+        other_title = place_hold(self.other_book, self.central, self.chidi)
+        self.assertEqual(allocate_returns(), (1, 0))
+        self.assertEqual(Copy.objects.get(pk=self.copy.pk).status, Copy.AVAILABLE)
+        self.assertEqual(self.availability(), (1, 1))
+        for hold in (at_branch, other_title):
+            hold.refresh_from_db()
+            self.assertEqual(hold.status, Hold.WAITING)
+
+    def test_second_run_does_not_allocate_again(self):
+        self.place_holds(self.bola, self.chidi)
+        self.assertEqual(allocate_returns(), (1, 1))
+        self.assertEqual(allocate_returns(), (0, 0))
+        self.assertEqual(
+            list(Hold.objects.order_by('placed_at').values_list('status', flat=True)),
+            [Hold.READY, Hold.WAITING],
+        )
+        self.assertEqual(self.availability(), (1, 0))
+
+    def test_copies_beyond_the_queue_are_shelved(self):
+        spare, = add_copies(self.book, self.central, ['TFA-2'])
+        checkout(spare, self.chidi)
+        return_copy(spare)
+        self.place_holds(self.bola)
+        self.assertEqual(allocate_returns(batch_size=1), (2, 1))
+        self.assertEqual(
+            sorted(Copy.objects.values_list('status', flat=True)), [Copy.AVAILABLE, Copy.ON_HOLD]
+        )
+        self.assertEqual(self.availability(), (2, 1))
+
+    def test_held_copy_is_lent_only_to_its_patron(self):
+        hold, = self.place_holds(self.bola)
+        allocate_returns()
+        with self.assertRaises(CirculationError):
+            checkout(self.copy, self.chidi)
+        checkout(self.copy, self.bola)
+        hold.refresh_from_db()
+        self.assertEqual(hold.status, Hold.FULFILLED)
+        self.assertEqual(self.availability(), (1, 0))
+
+    def test_cancelled_ready_hold_passes_the_copy_on(self):
+        first, second = self.place_holds(self.bola, self.chidi)
+        allocate_returns()
+        cancel_hold(first)
+        self.assertEqual(allocate_returns(), (1, 1))
+        second.refresh_from_db()
+        self.assertEqual((second.status, second.copy_id), (Hold.READY, self.copy.pk))
+
+
+class BulkBooksViewTests(CatalogTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.third_book = Book.objects.create(
+            title='No Longer at Ease', author=cls.author, library=cls.branch, publication_year=1960
+        )
+        cls.ada.user_permissions.add(
+            *Permission.objects.filter(
+                content_type__app_label='relationship_app',
+                codename__in=['can_change_book', 'can_delete_book'],
+            )
+        )
+
+    def setUp(self):
+        self.client.force_login(self.ada)
+
+    def post(self, **data):
+        return self.client.post(reverse('bulk_books'), data)
+
+    def libraries(self):
+        return dict(Book.objects.values_list('pk', 'library'))
+
+    def test_dry_run_only_counts(self):
+        before = self.libraries()
+        response = self.post(author=self.author.pk, action='move', target_library=self.branch.pk, dry_run='on')
+        result = response.context['result']
+        # One of the three is already at the branch.
+        self.assertEqual((result.matched, result.changed, result.dry_run), (3, 2, True))
+        self.assertContains(response, 'Dry run:')
+        self.assertEqual(self.libraries(), before)
+
+    def test_dry_run_delete_deletes_nothing(self):
+        response = self.post(library=self.central.pk, action='delete', dry_run='on')
+        result = response.context['result']
+        self.assertEqual((result.matched, result.changed), (2, 2))
+        self.assertEqual(Book.objects.count(), 3)
+
+    def test_move_applies(self):
+        response = self.post(author=self.author.pk, action='move', target_library=self.branch.pk)
+        self.assertContains(response, '2 of 3 matching books updated.')
+        self.assertEqual(set(self.libraries().values()), {self.branch.pk})
+
+    def test_delete_of_books_with_copies_is_refused(self):
+        add_copies(self.book, self.central, ['TFA-1'])
+        response = self.post(library=self.central.pk, action='delete')
+        self.assertFormError(
+            response.context['form'], None, 'Some of these books still have copies; withdraw them first.'
+        )
+        self.assertNotContains(response, 'books deleted.')
+        self.assertEqual(Book.objects.count(), 3)
+
+    def test_delete_removes_books_and_their_holds(self):
+        place_hold(self.other_book, self.central, self.bola)
+        response = self.post(book_ids=f'{self.book.pk}, {self.other_book.pk}', action='delete')
+        self.assertContains(response, '2 books deleted.')
+        self.assertEqual(list(Book.objects.all()), [self.third_book])
+        self.assertFalse(Hold.objects.exists())
+
+    def test_action_needs_its_permission(self):
+        self.client.force_login(self.bola)
+        response = self.post(library=self.central.pk, action='delete', dry_run='on')
+        self.assertEqual(response.status_code, 403)
+
+
+class SearchTests(CatalogTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.river_books = [
+            Book.objects.create(
+                title=f'River Song {number}', author=cls.author, library=library, publication_year=2000
+            )
+            for number, library in enumerate([cls.branch, cls.central, cls.branch, cls.central])
+        ]
+
+    def setUp(self):
+        # The indexes are per process; start each test from this one's rows
+        # and an empty journal.
+        cache.clear()
+        for index in INDEXES.values():
+            index.rebuild()
+
+    def titles(self, query, library=None, limit=10):
+        return [book.title for book in search_books(query, library, limit)]
+
+    def test_words_match_by_prefix_in_any_order(self):
+        for query in ('things fall apart', 'thin fa', 'fall thi', 'APART'):
+            with self.subTest(query=query):
+                self.assertEqual(self.titles(query), ['Things Fall Apart'])
+        self.assertEqual(self.titles('things arrow'), [])
+        self.assertEqual(self.titles('thingsx'), [])
+
+    def test_short_prefixes(self):
+        self.assertEqual(self.titles('a'), ['Things Fall Apart', 'Arrow of God'])
+        self.assertEqual(self.titles('go'), ['Arrow of God'])
+
+    def test_results_in_ascending_id_order(self):
+        books = search_books('river')
+        self.assertEqual([book.pk for book in books], sorted(book.pk for book in self.river_books))
+        self.assertEqual(search_books('riv so', limit=2), self.river_books[:2])
+
+    def test_library_filter_and_availability(self):
+        add_copies(self.river_books[0], self.branch, ['RS-1', 'RS-2'])
+        books = search_books('river', library=self.branch)
+        self.assertEqual(books, [self.river_books[0], self.river_books[2]])
+        self.assertEqual(
+            [(book.total_copies, book.available_copies) for book in books], [(2, 2), (0, 0)]
+        )
+
+    def test_typeahead(self):
+        results = typeahead('riv')
+        self.assertEqual(results['books'], self.river_books)
+        self.assertEqual(results['libraries'], [self.branch])
+        self.assertEqual(typeahead('onit')['libraries'], [self.branch])
+        self.assertEqual(typeahead('ach')['authors'], [self.author])
+
+    def test_typeahead_view(self):
+        response = self.client.get(reverse('catalog_typeahead'), {'q': 'things f'})
+        self.assertEqual(
+            response.json(),
+            {
+                'books': [{'id': self.book.pk, 'title': 'Things Fall Apart', 'author': 'Chinua Achebe'}],
+                'authors': [],
+                'libraries': [],
+            },
+        )
+
+    def test_search_view(self):
+        response = self.client.get(reverse('catalog_search'), {'q': 'river', 'library': self.central.pk})
+        self.assertEqual(list(response.context['books']), [self.river_books[1], self.river_books[3]])
+
+    def test_saved_book_is_found_through_the_journal(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            book = Book.objects.create(
+                title='Anthills of the Savannah', author=self.author, library=self.central,
+                publication_year=1987,
+            )
+        self.assertEqual(search_books('anthill'), [book])
+        self.assertEqual(book_index.position, book_index.journal.position())
+
+    def test_renamed_book_is_found_under_its_new_title_only(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.title = 'Things Came Together'
+            self.book.save()
+        self.assertEqual(self.titles('came tog'), ['Things Came Together'])
+        self.assertEqual(self.titles('fall apart'), [])
+
+    def test_deleted_book_is_not_found(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other_book.delete()
+        self.assertEqual(self.titles('arrow'), [])
+
+    def test_bulk_move_is_seen_by_the_library_filter(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_update(Book.objects.filter(pk=self.book.pk), {'library': self.branch})
+        self.assertEqual(self.titles('things', self.branch), ['Things Fall Apart'])
+        self.assertEqual(self.titles('things', self.central), [])
+
+    def test_saved_author_and_library_are_found_through_the_journal(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            author = Author.objects.create(name='Buchi Emecheta')
+            library = Library.objects.create(name='Harbour', location='Port Harcourt')
+            self.branch.name = 'Riverbank'
+            self.branch.save()
+        self.assertEqual(author_index.lookup('emech'), [author])
+        self.assertEqual(library_index.lookup('harc'), [library])
+        self.assertEqual(library_index.lookup('riverb'), [self.branch])
+        self.assertEqual(library_index.position, library_index.journal.position())
+
+    def test_journal_passes_entries_left_by_a_reset_sequence(self):
+        journal = book_index.journal
+        for pk in (1, 2, 3):
+            journal.record([pk])
+        # The sequence is evicted while its entries live on.
+        cache.delete(f'{journal.prefix}:seq')
+        journal.record([4])
+        entries = journal.read(1, journal.position())
+        self.assertEqual(entries[journal.position()], [4])
+        self.assertEqual({entries[seq][0] for seq in (1, 2, 3)}, {1, 2, 3})
 
-# Create your tests here.
+    def test_journal_record_gives_up_claiming(self):
+        journal = book_index.journal
+        journal.record([1])
+        with mock.patch.object(cache, 'add', return_value=False) as add:
+            journal.record([2])
+        self.assertEqual(add.call_count, JOURNAL_ATTEMPTS)
+        position = journal.position()
+        self.assertEqual(journal.read(position, position), {position: [2]})
@@ -16,14 +16,20 @@ urlpatterns = [
 
     # Function-based view for listing all books
     path('books/', views.list_books, name='list_books'),
+
+    # Catalog search and its typeahead
+    path('search/', views.catalog_search, name='catalog_search'),
+    path('search/typeahead/', views.catalog_typeahead, name='catalog_typeahead'),
     
-    # Class-based view for library detail
+    # Class-based views for libraries
+    path('libraries/', views.LibraryListView.as_view(), name='library_list'),
     path('library/<int:pk>/', LibraryDetailView.as_view(), name='library_detail'),
 
     # Book management URLs 
     path('add_book/', views.add_book, name='add_book'),
     path('edit_book/', views.edit_book, name='edit_book'),
     path('books/<int:book_id>/delete/', views.delete_book, name='delete_book'),
+    path('books/bulk/', views.bulk_books, name='bulk_books'),
     
     # Home and main pages
     path('', views.home_view, name='home'),
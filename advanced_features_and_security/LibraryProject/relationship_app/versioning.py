@@ -0,0 +1,56 @@
+"""
+Per-model version stamps for cache keys.
+
+Saving or deleting any model instance bumps the stamp of its model, so a
+value cached under a key that includes the stamp goes stale the moment the
+data behind it changes, without relying on timeouts. Bulk operations
+(update(), bulk_create(), raw SQL) do not send signals: call bump_version()
+after them.
+
+The stamps live in the default cache, which must be shared by every
+process (see CACHES in the settings) for a change made in one process to
+reach the keys cached by the others.
+"""
+import time
+
+from django.core.cache import cache
+
+VERSION_KEY = 'model-version:{}'
+
+
+def _key(label):
+    return VERSION_KEY.format(label.lower())
+
+
+def new_stamp():
+    # A value no earlier key used. Bumps write a new one rather than incr(),
+    # which some backends do as a get and a set: two concurrent bumps could
+    # write the same stamp, and a key filled between them would survive.
+    return time.time_ns()
+
+
+def bump_version(model):
+    cache.set(_key(model._meta.label), new_stamp(), None)
+
+
+def get_versions(labels):
+    """Return the current stamps of the models named by `labels`, in order."""
+    keys = [_key(label) for label in labels]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, new_stamp(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def model_changed(sender, update_fields=None, **kwargs):
+    # Logins only write last_login, which no cached fragment renders.
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    bump_version(sender)
+
+
+def m2m_changed(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_version(sender)
@@ -7,16 +7,21 @@ from django.contrib.auth.decorators import user_passes_test, login_required
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, logout
 from django.contrib.auth.forms import UserCreationForm
-from django.http import HttpResponse, HttpResponseForbidden
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
 from django.core.exceptions import PermissionDenied
+from django.db.models import ProtectedError
 from django.contrib.auth.views import LoginView
 from django.contrib.auth import authenticate, login as auth_login
 from django.contrib import messages
 from .models import Library
-from .models import Book
+from .models import Book, book_cache, library_cache
 from .models import Author
 from .models import UserProfile
-from .forms import BookForm
+from .forms import BookForm, BulkBookForm
+from .bulk import bulk_delete, bulk_update
+from .circulation import annotate_availability
+from .search import search_books, typeahead
+from LibraryProject.LibraryProject.objectcache import get_cached_or_404
 
 
 # Function-based view to list all books
@@ -28,16 +33,80 @@ def list_books(request):
     return render(request, 'relationship_app/list_books.html', {'books': books})
 
 
+def search_library(request):
+    """The library in ?library=, if any."""
+    library_id = request.GET.get('library', '')
+    return get_cached_or_404(library_cache, pk=library_id) if library_id.isdigit() else None
+
+
+def catalog_search(request):
+    """
+    Search books by title, or list an author's books (?author=, from the
+    typeahead), optionally only those at one library with their
+    availability there (see relationship_app.search).
+    """
+    query = request.GET.get('q', '').strip()
+    library = search_library(request)
+    author_id = request.GET.get('author', '')
+    author = get_object_or_404(Author, pk=author_id) if author_id.isdigit() else None
+    if author is not None:
+        books = author.book_set.select_related('author').order_by('title')
+        if library is not None:
+            books = annotate_availability(books.filter(library=library), library)
+        books = books[:50]
+    else:
+        books = search_books(query, library, limit=50) if query else []
+    context = {
+        'query': query,
+        'author': author,
+        'library': library,
+        'libraries': Library.objects.order_by('name'),
+        'books': books,
+    }
+    return render(request, 'relationship_app/catalog_search.html', context)
+
+
+def catalog_typeahead(request):
+    """Suggestions for the search box: a few books, authors and libraries."""
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return JsonResponse({'books': [], 'authors': [], 'libraries': []})
+    results = typeahead(query, search_library(request))
+    return JsonResponse({
+        'books': [
+            {'id': book.pk, 'title': book.title, 'author': book.author.name}
+            for book in results['books']
+        ],
+        'authors': [{'id': author.pk, 'name': author.name} for author in results['authors']],
+        'libraries': [
+            {'id': library.pk, 'name': library.name, 'location': library.location}
+            for library in results['libraries']
+        ],
+    })
+
+
+# Class-based view listing all libraries
+class LibraryListView(ListView):
+    """Display every library with a preview of its books."""
+    model = Library
+    template_name = 'relationship_app/library_list.html'
+    context_object_name = 'libraries'
+
+
 # Class-based view for library details 
 class LibraryDetailView(DetailView):
     """Create a class-based view that displays details for a specific library, listing all books available in that library."""
     model = Library
     template_name = 'relationship_app/library_detail.html'
     context_object_name = 'library'
+
+    def get_object(self, queryset=None):
+        return get_cached_or_404(library_cache, pk=self.kwargs['pk'])
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['books'] = self.object.books.all()  
+        # Copies of each book on the shelf here, from the same query.
+        context['books'] = annotate_availability(self.object.books.select_related('author'), self.object)
         return context
 
 
@@ -191,7 +260,7 @@ def edit_book(request, book_id):
     """
     View to edit an existing book - requires can_change_book permission
     """
-    book = get_object_or_404(Book, id=book_id)
+    book = get_cached_or_404(book_cache, pk=book_id)
     if request.method == 'POST':
         form = BookForm(request.POST, instance=book)
         if form.is_valid():
@@ -208,9 +277,47 @@ def delete_book(request, book_id):
     """
     View to delete a book - requires can_delete_book permission
     """
-    book = get_object_or_404(Book, id=book_id)
+    book = get_cached_or_404(book_cache, pk=book_id)
     if request.method == 'POST':
-        book.delete()
-        messages.success(request, 'Book deleted successfully!')
+        try:
+            book.delete()
+        except ProtectedError:
+            messages.error(request, 'This book still has copies; withdraw them first.')
+        else:
+            messages.success(request, 'Book deleted successfully!')
         return redirect('list_books')
-    return render(request, 'relationship_app/delete_book.html', {'book': book})
\ No newline at end of file
+    return render(request, 'relationship_app/delete_book.html', {'book': book})
+
+
+@login_required
+def bulk_books(request):
+    """
+    Move, reassign or delete every book matching a filter in one statement
+    (see relationship_app.bulk). The permission for the chosen action is
+    checked once for the whole batch; dry runs only report the counts.
+    """
+    result = None
+    if request.method == 'POST':
+        form = BulkBookForm(request.POST)
+        if form.is_valid():
+            action = form.cleaned_data['action']
+            if not request.user.has_perm(form.PERMISSIONS[action]):
+                raise PermissionDenied
+            dry_run = form.cleaned_data['dry_run']
+            if action == BulkBookForm.DELETE:
+                try:
+                    result = bulk_delete(form.get_queryset(), dry_run=dry_run, object_cache=book_cache)
+                except ProtectedError:
+                    form.add_error(None, 'Some of these books still have copies; withdraw them first.')
+                else:
+                    if not dry_run:
+                        messages.success(request, f'{result.changed} books deleted.')
+            else:
+                result = bulk_update(
+                    form.get_queryset(), form.get_changes(), dry_run=dry_run, object_cache=book_cache
+                )
+                if not dry_run:
+                    messages.success(request, f'{result.changed} of {result.matched} matching books updated.')
+    else:
+        form = BulkBookForm()
+    return render(request, 'relationship_app/bulk_books.html', {'form': form, 'result': result})
@@ -0,0 +1,47 @@
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from api.models import Book
+from api.serializers import BookSerializer, BookValuesSerializer
+
+
+class Command(BaseCommand):
+    help = "Report peak memory of buffered against streamed Book list JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 50000])
+
+    def handle(self, *args, **options):
+        renderer = JSONRenderer()
+
+        def buffered(queryset):
+            return len(renderer.render(BookSerializer(queryset, many=True).data))
+
+        def streamed(queryset):
+            rows = BookValuesSerializer.values(queryset)
+            return sum(len(chunk) for chunk in BookValuesSerializer(rows).stream())
+
+        # Seed inside a transaction that is rolled back, so the benchmark
+        # never leaves data behind in the project database.
+        with transaction.atomic():
+            seeded = 0
+            for rows in sorted(options["rows"]):
+                Book.objects.bulk_create(
+                    Book(title=f"Book {i}", author=f"Author {i % 50}")
+                    for i in range(seeded, rows)
+                )
+                seeded = rows
+                queryset = Book.objects.order_by("id")[:rows]
+                for name, func in (("buffered", buffered), ("streamed", streamed)):
+                    tracemalloc.start()
+                    size = func(queryset)
+                    peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                    self.stdout.write(
+                        f"{rows:>8} rows  {name:<9} {size / 1024:>10,.0f} KiB body"
+                        f"  {peak / 1024:>10,.0f} KiB peak"
+                    )
+            transaction.set_rollback(True)
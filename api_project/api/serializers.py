@@ -1,2 +1,155 @@
-# BookSerializer
-# serializers.ModelSerializer", "from rest_framework import serializers
+import json
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+
+from .models import Book
+
+
+class BookSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Book
+        fields = "__all__"
+
+
+# Fields whose to_representation() returns database values unchanged, so the
+# compiled plan can copy the column straight into the output.
+PASSTHROUGH_FIELDS = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+# Fields that need more than one column or a model instance to render.
+UNSUPPORTED_FIELDS = (
+    serializers.RelatedField,
+    serializers.ManyRelatedField,
+    serializers.BaseSerializer,
+    serializers.SerializerMethodField,
+)
+
+
+class JSONEncoder(json.JSONEncoder):
+    """
+    Escapes U+2028 and U+2029 after encoding, as JSONRenderer does, since
+    JavaScript string literals cannot contain them raw.
+    """
+
+    def encode(self, o):
+        return super().encode(o).replace("\u2028", "\\u2028").replace("\u2029", "\\u2029")
+
+
+# Same output as rest_framework.renderers.JSONRenderer with the default
+# UNICODE_JSON, COMPACT_JSON and STRICT_JSON settings.
+JSON_ENCODER = JSONEncoder(
+    ensure_ascii=False,
+    check_circular=False,
+    allow_nan=False,
+    separators=(",", ":"),
+)
+
+# Rows fetched from the database and encoded per streamed chunk.
+STREAM_CHUNK_SIZE = 2000
+
+
+class ValuesSerializer:
+    """
+    Read-only counterpart of a ModelSerializer for list endpoints.
+
+    Rows are read with values_list() instead of being loaded as model
+    instances. The columns to select, the output keys and the per-field
+    converters are compiled once per class from `serializer_class`.
+    """
+
+    serializer_class = None
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    @classmethod
+    def get_plan(cls):
+        plan = cls.__dict__.get("_plan")
+        if plan is None:
+            plan = cls._plan = cls.compile_plan()
+        return plan
+
+    @classmethod
+    def compile_plan(cls):
+        serializer = cls.serializer_class()
+        opts = serializer.Meta.model._meta
+        keys, columns, converters = [], [], []
+        for key, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if field.source == "*" or "." in field.source:
+                raise ImproperlyConfigured(
+                    f"{cls.__name__} cannot read field '{key}' from a single column."
+                )
+            if isinstance(field, serializers.PrimaryKeyRelatedField):
+                if field.pk_field is not None:
+                    raise ImproperlyConfigured(
+                        f"{cls.__name__} does not support pk_field on '{key}'."
+                    )
+                column = opts.get_field(field.source).attname
+            elif isinstance(field, UNSUPPORTED_FIELDS):
+                raise ImproperlyConfigured(
+                    f"{cls.__name__} only supports plain model fields, not '{key}'."
+                )
+            else:
+                column = opts.get_field(field.source).attname
+            keys.append(key)
+            columns.append(column)
+            if type(field) in PASSTHROUGH_FIELDS:
+                converters.append(None)
+            else:
+                converters.append(field.to_representation)
+        return tuple(keys), tuple(columns), tuple(converters)
+
+    @classmethod
+    def values(cls, queryset):
+        """Return `queryset` as the values_list() rows this serializer reads."""
+        return queryset.values_list(*cls.get_plan()[1])
+
+    def iter_data(self, rows):
+        keys, _, converters = self.get_plan()
+        if not any(converters):
+            return (dict(zip(keys, row)) for row in rows)
+        return (
+            {
+                key: value if convert is None or value is None else convert(value)
+                for key, convert, value in zip(keys, converters, row)
+            }
+            for row in rows
+        )
+
+    @property
+    def data(self):
+        return list(self.iter_data(self.rows))
+
+    @property
+    def json(self):
+        return JSON_ENCODER.encode(self.data).encode("utf-8")
+
+    def stream(self, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Yield the JSON array in pieces of `chunk_size` rows. Querysets are
+        read with iterator(), so memory use does not grow with row count.
+        """
+        rows = self.rows
+        if hasattr(rows, "iterator"):
+            rows = rows.iterator(chunk_size=chunk_size)
+        yield b"["
+        separator, batch = b"", []
+        for item in self.iter_data(rows):
+            batch.append(item)
+            if len(batch) == chunk_size:
+                yield separator + JSON_ENCODER.encode(batch)[1:-1].encode("utf-8")
+                separator, batch = b",", []
+        if batch:
+            yield separator + JSON_ENCODER.encode(batch)[1:-1].encode("utf-8")
+        yield b"]"
+
+
+class BookValuesSerializer(ValuesSerializer):
+    serializer_class = BookSerializer
@@ -1,3 +1,162 @@
+import gzip
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+
+from api_project.throttling import CacheBuckets, LocalBuckets, get_buckets
+
+from .models import Book
+from .serializers import BookSerializer, BookValuesSerializer
+
+
+class BookValuesSerializerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Book.objects.bulk_create(
+            [
+                Book(title="Things Fall Apart", author="Chinua Achebe"),
+                Book(title="Half of a Yellow Sun", author="Chimamanda Adichie"),
+                Book(title="Ìfẹ́ & “quotes”", author="Wọlé Ṣóyínká"),
+            ]
+        )
+
+    def test_data_matches_model_serializer(self):
+        queryset = Book.objects.order_by("id")
+        expected = BookSerializer(queryset, many=True).data
+        rows = BookValuesSerializer.values(queryset)
+        self.assertEqual(BookValuesSerializer(rows).data, expected)
+
+    def test_json_matches_json_renderer(self):
+        queryset = Book.objects.order_by("id")
+        expected = JSONRenderer().render(BookSerializer(queryset, many=True).data)
+        rows = BookValuesSerializer.values(queryset)
+        self.assertEqual(BookValuesSerializer(rows).json, expected)
+
+    def test_json_escapes_line_separators_like_json_renderer(self):
+        Book.objects.create(title="Line\u2028and\u2029paragraph", author="Separator")
+        queryset = Book.objects.order_by("id")
+        expected = JSONRenderer().render(BookSerializer(queryset, many=True).data)
+        rows = BookValuesSerializer.values(queryset)
+        self.assertIn(b"\\u2028", expected)
+        self.assertEqual(BookValuesSerializer(rows).json, expected)
+        self.assertEqual(b"".join(BookValuesSerializer(rows).stream(2)), expected)
+
+    def test_stream_matches_json(self):
+        rows = BookValuesSerializer.values(Book.objects.order_by("id"))
+        expected = BookValuesSerializer(rows).json
+        for chunk_size in (1, 2, 3, 10):
+            with self.subTest(chunk_size=chunk_size):
+                chunks = list(BookValuesSerializer(rows).stream(chunk_size))
+                self.assertEqual(b"".join(chunks), expected)
+
+    def test_stream_empty(self):
+        rows = BookValuesSerializer.values(Book.objects.none())
+        self.assertEqual(b"".join(BookValuesSerializer(rows).stream()), b"[]")
+
+    def test_book_list_view(self):
+        response = self.client.get(reverse("book-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            json.loads(b"".join(response.streaming_content)),
+            BookSerializer(Book.objects.all(), many=True).data,
+        )
+
+    def test_book_list_view_paginated(self):
+        response = self.client.get(reverse("book-list"), {"limit": 2, "offset": 1})
+        data = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(data["count"], 3)
+        self.assertIsNone(data["next"])
+        self.assertTrue(data["previous"].endswith("/books/?limit=2"))
+        self.assertEqual(
+            data["results"], BookSerializer(Book.objects.all()[1:], many=True).data
+        )
+
+    def test_book_list_view_compressed(self):
+        Book.objects.bulk_create(
+            Book(title=f"Book {i}", author="Author") for i in range(100)
+        )
+        response = self.client.get(reverse("book-list"), HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        data = json.loads(gzip.decompress(b"".join(response.streaming_content)))
+        self.assertEqual(len(data), 103)
+
+    def test_book_list_uses_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("book-list"))
+            b"".join(response.streaming_content)
+
+
+class TokenBucketThrottleTests(TestCase):
+    def setUp(self):
+        get_buckets().clear()
+        self.addCleanup(get_buckets().clear)
+
+    def test_rate_limit_headers(self):
+        response = self.client.get(reverse("book-list"))
+        self.assertEqual(response["RateLimit-Limit"], "120")
+        self.assertEqual(response["RateLimit-Remaining"], "119")
+        self.assertEqual(response["RateLimit-Reset"], "1")
+
+    def test_exhausted_bucket_returns_429(self):
+        for _ in range(120):
+            self.client.get(reverse("book-list"))
+        response = self.client.get(reverse("book-list"))
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["RateLimit-Remaining"], "0")
+        self.assertIn("Retry-After", response)
+
+    def test_buckets_are_per_client(self):
+        for _ in range(120):
+            self.client.get(reverse("book-list"), REMOTE_ADDR="10.0.0.1")
+        response = self.client.get(reverse("book-list"), REMOTE_ADDR="10.0.0.2")
+        self.assertEqual(response.status_code, 200)
+
+    def test_bucket_refills_over_time(self):
+        buckets = LocalBuckets()
+        self.assertEqual(buckets.take("key", 2, 1.0, now=0), (True, 1))
+        self.assertEqual(buckets.take("key", 2, 1.0, now=0), (True, 0))
+        self.assertEqual(buckets.take("key", 2, 1.0, now=0.5), (False, 0.5))
+        self.assertEqual(buckets.take("key", 2, 1.0, now=1.5), (True, 0.5))
+
+
+class CacheBucketsTests(TestCase):
+    def setUp(self):
+        self.buckets = CacheBuckets("default")
+        self.buckets.cache.clear()
+        self.addCleanup(self.buckets.cache.clear)
+
+    def test_bucket_refills_over_time(self):
+        self.assertEqual(self.buckets.take("key", 2, 1.0, now=0), (True, 1))
+        self.assertEqual(self.buckets.take("key", 2, 1.0, now=0), (True, 0))
+        self.assertEqual(self.buckets.take("key", 2, 1.0, now=0.5), (False, 0.5))
+        self.assertEqual(self.buckets.take("key", 2, 1.0, now=1.5), (True, 0.5))
+
+    def test_concurrent_takes_spend_each_token_once(self):
+        get = self.buckets.cache.get
+
+        def slow_get(*args, **kwargs):
+            # Widen the window between reading a bucket and writing it back.
+            value = get(*args, **kwargs)
+            time.sleep(0.001)
+            return value
+
+        def take(_):
+            return self.buckets.take("key", 20, 1e-9, now=0)[0]
+
+        with mock.patch.object(self.buckets.cache, "get", slow_get):
+            with ThreadPoolExecutor(8) as pool:
+                allowed = sum(pool.map(take, range(80)))
+        self.assertEqual(allowed, 20)
 
-# Create your tests here.
+    def test_held_lock_throttles(self):
+        self.buckets.cache.add("key:lock", 1)
+        self.buckets.lock_attempts = 2
+        self.assertEqual(self.buckets.take("key", 2, 1.0, now=0), (False, 0))
+        self.assertIsNone(self.buckets.cache.get("key"))
@@ -1,8 +1,43 @@
-from rest_framework.generics import ListAPIView
+from django.http import StreamingHttpResponse
+from rest_framework import generics
+from rest_framework.response import Response
 
+from .models import Book
+from .pagination import StreamingLimitOffsetPagination
+from .serializers import BookSerializer, BookValuesSerializer
 
-class BookListSerializer(ListAPIView):
-    pass
+
+class BookList(generics.ListAPIView):
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+    values_serializer_class = BookValuesSerializer
+    pagination_class = StreamingLimitOffsetPagination
+    throttle_scope = "books"
+
+    def list(self, request, *args, **kwargs):
+        # Read-only fast path: serialize values_list() rows instead of model
+        # instances. The output matches BookSerializer field for field, and
+        # JSON responses are streamed so memory stays flat for large lists.
+        values_serializer = self.values_serializer_class
+        rows = values_serializer.values(self.filter_queryset(self.get_queryset()))
+        stream = request.accepted_renderer.format == "json"
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            serializer = values_serializer(page)
+            if stream:
+                return StreamingHttpResponse(
+                    self.paginator.stream_paginated_response(serializer.stream()),
+                    content_type="application/json",
+                )
+            return self.get_paginated_response(serializer.data)
+
+        serializer = values_serializer(rows)
+        if stream:
+            return StreamingHttpResponse(
+                serializer.stream(), content_type="application/json"
+            )
+        return Response(serializer.data)
 
 
 # serializers.ModelSerializer", "from rest_framework import serializers
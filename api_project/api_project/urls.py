@@ -1,10 +1,14 @@
-from django.contrib import admin
+from django.conf import settings
 from django.urls import path
 from api.views import BookList
 
 urlpatterns = [
-    path("admin/", admin.site.urls),
     path("books/", BookList.as_view(), name="book-list"),
 ]
 
+if settings.ADMIN_ENABLED:
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path("admin/", admin.site.urls))
+
 # api.urls
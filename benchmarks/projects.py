@@ -0,0 +1,198 @@
+"""
+Projects, datasets and endpoints driven by the benchmark suite.
+
+Each project entry names the directory holding its manage.py, its settings
+module, a seed function and the scenarios to time. Seed functions run inside
+the project's own process after django.setup(), so model imports are local.
+Every dataset is derived from a seeded random.Random, so a given size always
+produces the same rows.
+"""
+
+import random
+
+SIZES = {
+    "small": 1,
+    "medium": 10,
+    "large": 100,
+}
+
+SEED = 20240101
+
+
+def scenario(name, url=None, args=(), query=None, view=None, login=False):
+    """
+    Describe one endpoint. `url` is a URL name reversed with `args`; `view`
+    is a dotted path to a view callable for endpoints that are not routed,
+    which can only be driven in-process.
+    """
+    return {
+        "name": name,
+        "url": url,
+        "args": args,
+        "query": query or {},
+        "view": view,
+        "login": login,
+    }
+
+
+def seed_blog(scale, rng):
+    from django.contrib.auth.models import User
+    from taggit.models import Tag
+
+    from blog.models import Comment, Post
+
+    users = User.objects.bulk_create(
+        User(username=f"author{i}", email=f"author{i}@example.com")
+        for i in range(10 * scale)
+    )
+    tags = Tag.objects.bulk_create(
+        Tag(name=f"tag{i}", slug=f"tag{i}") for i in range(20 + scale)
+    )
+    posts = Post.objects.bulk_create(
+        Post(
+            title=f"Post {i} about {rng.choice(WORDS)}",
+            slug=f"post-{i}",
+            content=" ".join(rng.choices(WORDS, k=120)),
+            author=rng.choice(users),
+            status=Post.PUBLISHED,
+        )
+        for i in range(100 * scale)
+    )
+    Post.tags.through.objects.bulk_create(
+        Post.tags.through(content_object=post, tag=tag)
+        for post in posts
+        for tag in rng.sample(tags, 3)
+    )
+    Comment.objects.bulk_create(
+        Comment(
+            post=rng.choice(posts),
+            author=rng.choice(users),
+            content=" ".join(rng.choices(WORDS, k=20)),
+        )
+        for _ in range(500 * scale)
+    )
+    return {"slug": posts[0].slug, "query": WORDS[0]}
+
+
+def seed_library(scale, rng):
+    from django.contrib.auth import get_user_model
+
+    from LibraryProject.bookshelf.models import Book as ShelfBook
+    from LibraryProject.relationship_app.models import Author, Book, Library
+
+    get_user_model().objects.create_superuser("bench", "bench@example.com", "bench")
+    authors = Author.objects.bulk_create(
+        Author(name=f"Author {i}") for i in range(20 * scale)
+    )
+    libraries = Library.objects.bulk_create(
+        Library(name=f"Library {i}", location=f"City {i % 7}") for i in range(5 * scale)
+    )
+    Book.objects.bulk_create(
+        Book(
+            title=f"{rng.choice(WORDS).title()} {i}",
+            author=rng.choice(authors),
+            library=rng.choice(libraries),
+            publication_year=rng.randint(1900, 2024),
+        )
+        for i in range(200 * scale)
+    )
+    ShelfBook.objects.bulk_create(
+        ShelfBook(title=f"Shelf book {i}", author=f"Author {i % 50}")
+        for i in range(200 * scale)
+    )
+    return {"library": libraries[0].pk}
+
+
+def seed_api(scale, rng):
+    from api.models import Book
+
+    Book.objects.bulk_create(
+        Book(title=f"{rng.choice(WORDS).title()} {i}", author=f"Author {i % 50}")
+        for i in range(1000 * scale)
+    )
+    return {}
+
+
+def seed_advanced_api(scale, rng):
+    from api.models import Author, Book
+
+    authors = Author.objects.bulk_create(
+        Author(name=f"Author {i}") for i in range(100 * scale)
+    )
+    Book.objects.bulk_create(
+        Book(
+            title=f"{rng.choice(WORDS).title()} {i}",
+            publication_year=rng.randint(1900, 2024),
+            author=rng.choice(authors),
+        )
+        for i in range(1000 * scale)
+    )
+    return {}
+
+
+def seed_social(scale, rng):
+    return {}
+
+
+PROJECTS = {
+    "django_blog": {
+        "path": "django_blog",
+        "settings": "django_blog.settings",
+        "seed": seed_blog,
+        "scenarios": [
+            scenario("PostListView", url="post-list"),
+            scenario("search_posts", url="search_posts", query={"q": "{query}"}),
+            scenario(
+                "post_detail_with_comments",
+                view="blog.views.post_detail_with_comments",
+                args=("{slug}",),
+            ),
+        ],
+    },
+    "LibraryProject": {
+        "path": "advanced_features_and_security",
+        "settings": "LibraryProject.LibraryProject.settings",
+        "seed": seed_library,
+        "scenarios": [
+            scenario("list_books", url="list_books"),
+            scenario("LibraryDetailView", url="library_detail", args=("{library}",)),
+            scenario("book_list", url="book_list", login=True),
+        ],
+    },
+    "api_project": {
+        "path": "api_project",
+        "settings": "api_project.settings",
+        "seed": seed_api,
+        "scenarios": [
+            scenario("book_list", url="book-list"),
+        ],
+    },
+    "advanced-api-project": {
+        "path": "advanced-api-project",
+        "settings": "advanced_api_project.settings",
+        "seed": seed_advanced_api,
+        "scenarios": [
+            scenario("book_list", url="book-list"),
+            scenario("author_list", url="author-list", query={"limit": "20"}),
+        ],
+    },
+    "social_media_api": {
+        "path": "social_media_api",
+        "settings": "social_media_api.settings",
+        "seed": seed_social,
+        # The project routes no views yet (posts/urls.py only lists the
+        # feed/ and like/ URLs to come), so only its startup and seeding are
+        # measured. Add the feed scenario with the view.
+        "scenarios": [],
+    },
+}
+
+WORDS = (
+    "django python library author book reader chapter story archive shelf "
+    "comment post tag search index query cache stream page model view "
+    "template history novel poem essay journal review travel science art"
+).split()
+
+
+def make_rng(project, size):
+    return random.Random(f"{SEED}:{project}:{size}")
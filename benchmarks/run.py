@@ -0,0 +1,137 @@
+"""
+Reproducible benchmark suite for the projects in this repository.
+
+    python -m benchmarks.run                      # every project, small size
+    python -m benchmarks.run --size medium --http django_blog
+    python -m benchmarks.run --save-baseline      # record a new baseline
+
+Each project runs in its own subprocess (see benchmarks.worker) against a
+freshly migrated scratch database seeded deterministically. Results are
+compared with benchmarks/baseline.json; the exit status is 1 when a
+scenario regressed beyond the tolerance.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from .projects import PROJECTS, SIZES
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+REPO_ROOT = BASELINE.parent.parent
+
+
+def run_project(project, size, requests, http):
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.worker",
+        project,
+        size,
+        f"--requests={requests}",
+    ]
+    if http:
+        command.append("--http")
+    completed = subprocess.run(command, cwd=REPO_ROOT, capture_output=True, text=True)
+    if completed.returncode:
+        return {"project": project, "size": size, "error": completed.stderr.strip()}
+    return json.loads(completed.stdout)
+
+
+def compare(result, baseline, tolerance):
+    """Yield a message for every scenario that is slower than its baseline."""
+    if not baseline:
+        return
+    for name, current in result.get("scenarios", {}).items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous or "p50_ms" not in previous or "p50_ms" not in current:
+            continue
+        if current["p50_ms"] > previous["p50_ms"] * (1 + tolerance):
+            yield (
+                f"{name}: p50 {current['p50_ms']:.2f}ms, "
+                f"baseline {previous['p50_ms']:.2f}ms"
+            )
+        if (current["queries"] or 0) > (previous["queries"] or 0):
+            yield (
+                f"{name}: {current['queries']} queries, "
+                f"baseline {previous['queries']}"
+            )
+    if result.get("peak_rss_kb", 0) > baseline.get("peak_rss_kb", 0) * (1 + tolerance):
+        yield (
+            f"peak RSS {result['peak_rss_kb']} KiB, "
+            f"baseline {baseline['peak_rss_kb']} KiB"
+        )
+
+
+def report(result):
+    print(f"== {result['project']} ({result['size']})")
+    if "error" in result:
+        print(f"   failed: {result['error'].splitlines()[-1]}")
+        return
+    print(
+        f"   seeded in {result['seed_seconds']:.2f}s, "
+        f"peak RSS {result['peak_rss_kb'] / 1024:.0f} MiB"
+    )
+    for name, stats in result["scenarios"].items():
+        if "skipped" in stats or "error" in stats:
+            print(f"   {name:<40} {stats.get('skipped') or stats['error']}")
+            continue
+        queries = "-" if stats["queries"] is None else stats["queries"]
+        print(
+            f"   {name:<40} {stats['throughput']:>8.1f} req/s"
+            f"  p50 {stats['p50_ms']:>7.2f}ms  p90 {stats['p90_ms']:>7.2f}ms"
+            f"  p99 {stats['p99_ms']:>7.2f}ms  {queries:>4} queries"
+            f"  status {','.join(map(str, stats['statuses']))}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    # Not choices=PROJECTS: before Python 3.12 argparse checks the default of
+    # a nargs="*" positional against the choices as a single value.
+    parser.add_argument(
+        "projects",
+        nargs="*",
+        default=list(PROJECTS),
+        metavar="project",
+        help=f"{', '.join(PROJECTS)} (default: all)",
+    )
+    parser.add_argument("--size", choices=SIZES, default="small")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--http", action="store_true", help="also drive a local server")
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    options = parser.parse_args(argv)
+    unknown = [project for project in options.projects if project not in PROJECTS]
+    if unknown:
+        parser.error(f"unknown project: {', '.join(unknown)}")
+
+    baseline = json.loads(options.baseline.read_text()) if options.baseline.exists() else {}
+    regressions = []
+    for project in options.projects:
+        result = run_project(project, options.size, options.requests, options.http)
+        report(result)
+        key = f"{project}:{options.size}"
+        if options.save_baseline:
+            if "error" not in result:
+                baseline[key] = result
+            continue
+        for message in compare(result, baseline.get(key, {}), options.tolerance):
+            regressions.append(f"{key} {message}")
+
+    if options.save_baseline:
+        options.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"baseline written to {options.baseline}")
+    elif regressions:
+        print("\nRegressions:")
+        for message in regressions:
+            print(f"   {message}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
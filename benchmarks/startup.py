@@ -0,0 +1,186 @@
+"""
+Cold-start profiler for the projects in this repository.
+
+    python -m benchmarks.startup                  # report every project
+    python -m benchmarks.startup django_blog --top 30
+    python -m benchmarks.startup --check          # CI: exit 1 when over budget
+    python -m benchmarks.startup --save-budget    # record new budgets
+
+Every sample is a fresh interpreter, so the numbers are cold-start times of
+`import django; django.setup()` and, separately, of importing the root
+URLconf, which happens on the first request. One extra run with
+`python -X importtime` attributes the time to modules, and every
+AppConfig.ready() call is timed on its own. Budgets for `django.setup()`
+live in benchmarks/startup_budget.json.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from importlib import import_module
+from pathlib import Path
+
+from .projects import PROJECTS
+
+BUDGET = Path(__file__).resolve().parent / "startup_budget.json"
+REPO_ROOT = BUDGET.parent.parent
+
+# Saved budgets leave this much room over the measured median, so CI only
+# fails on real regressions and not on a noisy machine.
+BUDGET_HEADROOM = 1.5
+
+
+def elapsed_ms(start):
+    return (time.perf_counter() - start) * 1000
+
+
+def probe(name):
+    """Boot one project in this (fresh) process and print its timings as JSON."""
+    project = PROJECTS[name]
+    sys.path.insert(0, str(REPO_ROOT / project["path"]))
+    os.environ["DJANGO_SETTINGS_MODULE"] = project["settings"]
+
+    start = time.perf_counter()
+    from django.apps.config import AppConfig
+
+    ready = {}
+    create = AppConfig.create.__func__
+
+    def timed_create(cls, entry):
+        app_config = create(cls, entry)
+        original = app_config.ready
+
+        def timed_ready():
+            began = time.perf_counter()
+            original()
+            ready[app_config.label] = elapsed_ms(began)
+
+        app_config.ready = timed_ready
+        return app_config
+
+    AppConfig.create = classmethod(timed_create)
+
+    import django
+
+    django.setup()
+    setup_ms = elapsed_ms(start)
+
+    from django.conf import settings
+
+    start = time.perf_counter()
+    import_module(settings.ROOT_URLCONF)
+    urlconf_ms = elapsed_ms(start)
+
+    print(json.dumps({"setup_ms": setup_ms, "urlconf_ms": urlconf_ms, "ready_ms": ready}))
+
+
+def run_probe(name, importtime=False):
+    command = [sys.executable, "-m", "benchmarks.startup", "--probe", name]
+    if importtime:
+        command[1:1] = ["-X", "importtime"]
+    completed = subprocess.run(command, cwd=REPO_ROOT, capture_output=True, text=True)
+    if completed.returncode:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+    return json.loads(completed.stdout), completed.stderr
+
+
+def parse_importtime(output):
+    """Return (module, self_ms, cumulative_ms) for every line of -X importtime output."""
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:") :].split("|")
+        modules.append((module.strip(), int(self_us) / 1000, int(cumulative_us) / 1000))
+    return modules
+
+
+def profile(name, repeat):
+    samples = [run_probe(name)[0] for _ in range(repeat)]
+    result, importtime = run_probe(name, importtime=True)
+    modules = parse_importtime(importtime)
+    packages = defaultdict(float)
+    for module, self_ms, _ in modules:
+        packages[module.split(".")[0]] += self_ms
+    return {
+        "project": name,
+        "setup_ms": statistics.median(sample["setup_ms"] for sample in samples),
+        "urlconf_ms": statistics.median(sample["urlconf_ms"] for sample in samples),
+        "ready_ms": result["ready_ms"],
+        "modules": sorted(modules, key=lambda module: module[1], reverse=True),
+        "packages": sorted(packages.items(), key=lambda item: item[1], reverse=True),
+    }
+
+
+def report(result, top):
+    print(f"== {result['project']}")
+    if "error" in result:
+        print(f"   failed: {result['error']}")
+        return
+    print(
+        f"   django.setup() {result['setup_ms']:.1f}ms, "
+        f"root URLconf {result['urlconf_ms']:.1f}ms (median, cold)"
+    )
+    print("   AppConfig.ready():")
+    for label, ms in sorted(result["ready_ms"].items(), key=lambda item: item[1], reverse=True):
+        print(f"      {label:<40} {ms:>8.2f}ms")
+    print("   import time by top-level package (self, under -X importtime):")
+    for package, ms in result["packages"][:top]:
+        print(f"      {package:<40} {ms:>8.2f}ms")
+    print("   slowest modules (self / cumulative):")
+    for module, self_ms, cumulative_ms in result["modules"][:top]:
+        print(f"      {module:<40} {self_ms:>8.2f}ms {cumulative_ms:>8.2f}ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("projects", nargs="*", choices=[[], *PROJECTS], default=[])
+    parser.add_argument("--repeat", type=int, default=5, help="cold starts per project")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--check", action="store_true", help="fail when over budget")
+    parser.add_argument("--budget", type=Path, default=BUDGET)
+    parser.add_argument("--save-budget", action="store_true")
+    parser.add_argument("--probe", help=argparse.SUPPRESS)
+    options = parser.parse_args(argv)
+
+    if options.probe:
+        probe(options.probe)
+        return 0
+
+    budget = json.loads(options.budget.read_text()) if options.budget.exists() else {}
+    over = []
+    for name in options.projects or PROJECTS:
+        try:
+            result = profile(name, options.repeat)
+        except RuntimeError as error:
+            result = {"project": name, "error": str(error)}
+        report(result, options.top)
+        if "error" in result:
+            over.append(f"{name}: {result['error']}")
+            continue
+        if options.save_budget:
+            budget[name] = {"setup_ms": round(result["setup_ms"] * BUDGET_HEADROOM)}
+        elif name in budget and result["setup_ms"] > budget[name]["setup_ms"]:
+            over.append(
+                f"{name}: django.setup() {result['setup_ms']:.1f}ms, "
+                f"budget {budget[name]['setup_ms']}ms"
+            )
+
+    if options.save_budget:
+        options.budget.write_text(json.dumps(budget, indent=2, sort_keys=True) + "\n")
+        print(f"budget written to {options.budget}")
+    elif options.check and over:
+        print("\nOver budget:")
+        for message in over:
+            print(f"   {message}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
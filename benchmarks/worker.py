@@ -0,0 +1,244 @@
+"""
+Run the scenarios of one project inside that project's own process.
+
+Invoked by benchmarks.run as `python -m benchmarks.worker PROJECT SIZE ...`;
+prints one JSON document with the results on stdout.
+"""
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.client import HTTPConnection
+from pathlib import Path
+from urllib.parse import urlencode
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+from .projects import PROJECTS, SIZES, make_rng
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Untimed requests per scenario, so template compilation and first-use
+# imports do not count against the measured latencies.
+WARMUP_REQUESTS = 5
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def setup_django(project, database):
+    sys.path.insert(0, str(REPO_ROOT / project["path"]))
+    os.environ["DJANGO_SETTINGS_MODULE"] = project["settings"]
+
+    from django.conf import settings
+
+    # Benchmark against a scratch database, never the project's own, and
+    # without throttling so the load generator is not rate limited.
+    settings.DATABASES["default"]["NAME"] = database
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ["*"]
+    rest_framework = getattr(settings, "REST_FRAMEWORK", {})
+    settings.REST_FRAMEWORK = {
+        key: value
+        for key, value in rest_framework.items()
+        if not key.startswith("DEFAULT_THROTTLE")
+    }
+
+    import django
+
+    django.setup()
+
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0, interactive=False)
+
+
+def resolve(scenario, context):
+    """Return the request path for `scenario`, or None if it is not routed."""
+    from django.urls import NoReverseMatch, reverse
+
+    if scenario["url"] is None:
+        return None
+    args = [str(arg).format(**context) for arg in scenario["args"]]
+    try:
+        path = reverse(scenario["url"], args=args)
+    except NoReverseMatch:
+        return None
+    query = {key: value.format(**context) for key, value in scenario["query"].items()}
+    return f"{path}?{urlencode(query)}" if query else path
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(latencies, statuses, queries):
+    return {
+        "requests": len(latencies),
+        "throughput": len(latencies) / sum(latencies),
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p90_ms": percentile(latencies, 0.90) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "queries": queries,
+        "statuses": sorted(set(statuses)),
+    }
+
+
+def count_queries(send):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as captured:
+        send()
+    return len(captured)
+
+
+def drive_in_process(scenario, context, user, requests):
+    from django.test import Client, RequestFactory
+    from django.utils.module_loading import import_string
+
+    path = resolve(scenario, context)
+    if path is None and scenario["view"] is None:
+        return {"skipped": f"no URL named '{scenario['url']}'"}
+
+    if path is not None:
+        client = Client()
+        if scenario["login"]:
+            client.force_login(user)
+
+        def send():
+            response = client.get(path)
+            if response.streaming:
+                b"".join(response.streaming_content)
+            return response.status_code
+
+    else:
+        from django.contrib.auth.models import AnonymousUser
+
+        view = import_string(scenario["view"])
+        args = [str(arg).format(**context) for arg in scenario["args"]]
+        factory = RequestFactory()
+
+        def send():
+            request = factory.get("/")
+            request.user = user if scenario["login"] else AnonymousUser()
+            request.session = {}
+            request._messages = []
+            return view(request, *args).status_code
+
+    return time_requests(send, requests, count=True)
+
+
+def drive_http(scenario, context, user, requests, port):
+    path = resolve(scenario, context)
+    if path is None:
+        return {"skipped": "not routed, in-process only"}
+
+    headers = {}
+    if scenario["login"]:
+        from django.test import Client
+
+        client = Client()
+        client.force_login(user)
+        headers["Cookie"] = "; ".join(
+            f"{name}={morsel.value}" for name, morsel in client.cookies.items()
+        )
+    connection = HTTPConnection("127.0.0.1", port)
+
+    def send():
+        connection.request("GET", path, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        return response.status
+
+    try:
+        # Queries run in the server thread, so they are only counted in-process.
+        return time_requests(send, requests, count=False)
+    finally:
+        connection.close()
+
+
+def time_requests(send, requests, count):
+    try:
+        queries = count_queries(send) if count else None
+        for _ in range(WARMUP_REQUESTS):
+            send()
+        latencies, statuses = [], []
+        for _ in range(requests):
+            start = time.perf_counter()
+            statuses.append(send())
+            latencies.append(time.perf_counter() - start)
+    except Exception as exc:
+        return {"error": f"{type(exc).__name__}: {exc}"}
+    return summarize(latencies, statuses, queries)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("project", choices=PROJECTS)
+    parser.add_argument("size", choices=SIZES)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--http", action="store_true")
+    options = parser.parse_args(argv)
+
+    project = PROJECTS[options.project]
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(project, str(Path(tmp) / "bench.sqlite3"))
+
+        from django.contrib.auth import get_user_model
+
+        seed_start = time.perf_counter()
+        rng = make_rng(options.project, options.size)
+        context = project["seed"](SIZES[options.size], rng)
+        seed_seconds = time.perf_counter() - seed_start
+
+        User = get_user_model()
+        user = User.objects.filter(is_superuser=True).first()
+        if user is None:
+            user = User.objects.create_superuser("bench", "bench@example.com", "bench")
+
+        results = {}
+        for scenario in project["scenarios"]:
+            results[f"{scenario['name']}:in-process"] = drive_in_process(
+                scenario, context, user, options.requests
+            )
+
+        if options.http:
+            from django.core.wsgi import get_wsgi_application
+
+            server = make_server(
+                "127.0.0.1", 0, get_wsgi_application(), handler_class=QuietHandler
+            )
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            try:
+                for scenario in project["scenarios"]:
+                    results[f"{scenario['name']}:http"] = drive_http(
+                        scenario, context, user, options.requests, server.server_port
+                    )
+            finally:
+                server.shutdown()
+
+    json.dump(
+        {
+            "project": options.project,
+            "size": options.size,
+            "seed_seconds": seed_seconds,
+            "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "scenarios": results,
+        },
+        sys.stdout,
+    )
+
+
+if __name__ == "__main__":
+    main()
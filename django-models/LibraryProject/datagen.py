@@ -0,0 +1,113 @@
+"""
+Helpers for the generate_fixtures management command.
+
+Rows are built in blocks of `batch_size` driving keys (usually primary keys)
+and written with bulk_create(). Every block draws from its own RNG seeded
+with the command's seed, the model and the block start, so the generated
+data is the same whatever the number of worker processes. Workers are
+forked and each writes a disjoint range of blocks.
+"""
+
+import itertools
+import multiprocessing
+import random
+
+from django.core.management.color import no_style
+from django.db import connections, transaction
+from django.db.models import Max
+
+
+class ZipfSampler:
+    """Pick values from `population` with probability proportional to 1 / rank**s."""
+
+    def __init__(self, population, s=1.1):
+        self.population = population
+        self.cum_weights = list(
+            itertools.accumulate(1 / rank**s for rank in range(1, len(population) + 1))
+        )
+
+    def sample(self, rng, k=1):
+        return rng.choices(self.population, cum_weights=self.cum_weights, k=k)
+
+    def pick(self, rng):
+        return self.sample(rng)[0]
+
+
+def heavy_tail(rng, mean, alpha=1.5, limit=None):
+    """
+    Return a non-negative integer from a Lomax (shifted Pareto) distribution
+    with the given `mean`: most draws are small, a few are very large.
+    """
+    value = int(mean * (alpha - 1) * (rng.paretovariate(alpha) - 1))
+    return min(value, limit) if limit is not None else value
+
+
+WORDS = (
+    'library book author reader story chapter novel poem essay archive shelf '
+    'python django model view query index cache stream page post comment '
+    'tag search travel science history art music garden city river night'
+).split()
+
+
+def text(rng, words):
+    return ' '.join(rng.choices(WORDS, k=words))
+
+
+def next_pk(model):
+    return (model.objects.aggregate(Max('pk'))['pk__max'] or 0) + 1
+
+
+def generate(model, keys, build, seed, workers=1, batch_size=5000, using='default'):
+    """
+    Call build(key, rng) for every key in the range `keys` and insert the
+    model instances it yields. Returns the number of rows written.
+    """
+    blocks = [keys[i : i + batch_size] for i in range(0, len(keys), batch_size)]
+    label = model._meta.label_lower
+    if workers <= 1 or len(blocks) <= 1:
+        written = write_blocks(model, blocks, build, seed, label, using)
+    else:
+        # Children inherit the parent's state through fork(), so `build` may
+        # be a closure. Each child opens its own database connection.
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        queue = context.SimpleQueue()
+        processes = [
+            context.Process(
+                target=lambda part: queue.put(
+                    write_blocks(model, part, build, seed, label, using)
+                ),
+                args=(blocks[index::workers],),
+            )
+            for index in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            if process.exitcode:
+                raise RuntimeError(f'fixture worker for {label} failed')
+        written = sum(queue.get() for _ in processes)
+    reset_sequences(model, using)
+    return written
+
+
+def write_blocks(model, blocks, build, seed, label, using):
+    written = 0
+    for block in blocks:
+        rng = random.Random(f'{seed}:{label}:{block.start}')
+        rows = [row for key in block for row in build(key, rng)]
+        with transaction.atomic(using=using):
+            model.objects.using(using).bulk_create(rows, batch_size=1000)
+        written += len(rows)
+    connections[using].close()
+    return written
+
+
+def reset_sequences(model, using='default'):
+    """Move the pk sequence past explicitly assigned keys (no-op on SQLite)."""
+    statements = connections[using].ops.sequence_reset_sql(no_style(), [model])
+    if statements:
+        with connections[using].cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
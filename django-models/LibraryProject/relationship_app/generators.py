@@ -0,0 +1,54 @@
+# Synthetic data for the generate_fixtures command. Books per author follow a
+# Zipf distribution and libraries are sized the same way, so a few authors
+# and branches hold most of the catalogue.
+from functools import partial
+
+from LibraryProject.datagen import ZipfSampler, generate as write, next_pk, text
+
+from .models import Author, Book, Librarian, Library
+
+
+def generate(options):
+    scale = options['scale']
+    write_rows = partial(
+        write,
+        seed=options['seed'],
+        workers=options['workers'],
+        batch_size=options['batch_size'],
+    )
+
+    start = next_pk(Author)
+    authors = range(start, start + int(2000 * scale))
+
+    def build_author(pk, rng):
+        yield Author(pk=pk, name=f'{text(rng, 2).title()} {pk}')
+
+    yield Author, write_rows(Author, authors, build_author)
+
+    start = next_pk(Library)
+    libraries = range(start, start + max(int(50 * scale), 1))
+
+    def build_library(pk, rng):
+        yield Library(pk=pk, name=f'Library {pk}', location=text(rng, 2).title())
+
+    def build_librarian(pk, rng):
+        yield Librarian(name=f'{text(rng, 2).title()} {pk}', library_id=pk)
+
+    yield Library, write_rows(Library, libraries, build_library)
+    yield Librarian, write_rows(Librarian, libraries, build_librarian)
+
+    start = next_pk(Book)
+    books = range(start, start + int(50000 * scale))
+    prolific = ZipfSampler(authors)
+    branches = ZipfSampler(libraries, s=0.8)
+
+    def build_book(pk, rng):
+        yield Book(
+            pk=pk,
+            title=text(rng, 4).title(),
+            author_id=prolific.pick(rng),
+            library_id=branches.pick(rng),
+            publication_year=rng.randint(1900, 2025),
+        )
+
+    yield Book, write_rows(Book, books, build_book)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,6 +43,12 @@ INSTALLED_APPS = [
     'users',
 ]
 
+# Workers that never serve /admin/ can boot without the admin, which
+# imports every app's admin module on startup: DJANGO_ADMIN_ENABLED=0.
+ADMIN_ENABLED = os.environ.get('DJANGO_ADMIN_ENABLED', '1') != '0'
+if not ADMIN_ENABLED:
+    INSTALLED_APPS.remove('django.contrib.admin')
+
 AUTH_USER_MODEL = 'users.CustomUser'
 
 MIDDLEWARE = [
@@ -64,13 +71,23 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / "templates"],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Production template mode: every template is read and parsed
+            # once per process, then served from memory by the cached loader.
+            'loaders': [
+                (
+                    'django.template.loaders.cached.Loader',
+                    [
+                        'django.template.loaders.filesystem.Loader',
+                        'django.template.loaders.app_directories.Loader',
+                    ],
+                ),
+            ],
         },
     },
 ]
@@ -0,0 +1,28 @@
+# Synthetic books for the generate_fixtures command.
+from LibraryProject.datagen import ZipfSampler, generate as write, next_pk, text
+
+from .models import Book
+
+
+def generate(options):
+    scale = options['scale']
+    start = next_pk(Book)
+    books = range(start, start + int(20000 * scale))
+    authors = ZipfSampler([f'Author {rank}' for rank in range(1, int(500 * scale) + 2)])
+
+    def build_book(pk, rng):
+        yield Book(
+            pk=pk,
+            title=text(rng, 4).title(),
+            author=authors.pick(rng),
+            publication_year=rng.randint(1900, 2025),
+        )
+
+    yield Book, write(
+        Book,
+        books,
+        build_book,
+        seed=options['seed'],
+        workers=options['workers'],
+        batch_size=options['batch_size'],
+    )
@@ -0,0 +1,29 @@
+# Synthetic users for the generate_fixtures command.
+from functools import partial
+
+from LibraryProject.datagen import generate as write, next_pk
+from LibraryProject.relationship_app.models import UserProfile
+
+from .models import CustomUser
+
+
+def generate(options):
+    write_rows = partial(
+        write,
+        seed=options['seed'],
+        workers=options['workers'],
+        batch_size=options['batch_size'],
+    )
+
+    start = next_pk(CustomUser)
+    users = range(start, start + int(1000 * options['scale']))
+
+    def build_user(pk, rng):
+        yield CustomUser(pk=pk, username=f'user{pk}', email=f'user{pk}@example.com', password='!')
+
+    def build_profile(pk, rng):
+        # bulk_create() skips the post_save signal that creates profiles.
+        yield UserProfile(user_id=pk, role='Member')
+
+    yield CustomUser, write_rows(CustomUser, users, build_user)
+    yield UserProfile, write_rows(UserProfile, users, build_profile)
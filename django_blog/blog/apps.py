@@ -1,6 +1,62 @@
 from django.apps import AppConfig
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 
 
 class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
+
+    def ready(self):
+        from . import authorstats, feeds, moderation, related, versioning
+        from .models import Comment, Post, post_cache
+
+        # Object cache of posts (django_blog.objectcache).
+        post_save.connect(post_cache.invalidate, sender=Post, dispatch_uid='blog.post_cache.save')
+        post_delete.connect(
+            post_cache.invalidate, sender=Post, dispatch_uid='blog.post_cache.delete'
+        )
+
+        # Version stamps for {% cachefragment %}, bumped for every model.
+        post_save.connect(versioning.model_changed, dispatch_uid='blog.versioning.save')
+        post_delete.connect(versioning.model_changed, dispatch_uid='blog.versioning.delete')
+        m2m_changed.connect(versioning.m2m_changed, dispatch_uid='blog.versioning.m2m')
+
+        # Post.comment_count and spam scoring of new comments.
+        post_save.connect(
+            moderation.comment_saved, sender=Comment, dispatch_uid='blog.moderation.save'
+        )
+        post_delete.connect(
+            moderation.comment_deleted, sender=Comment, dispatch_uid='blog.moderation.delete'
+        )
+
+        # Incremental refresh of the related-posts table.
+        post_save.connect(related.post_saved, sender=Post, dispatch_uid='blog.related.save')
+        pre_delete.connect(related.post_deleting, sender=Post, dispatch_uid='blog.related.delete')
+        m2m_changed.connect(
+            related.tags_changed, sender=Post.tags.through, dispatch_uid='blog.related.tags'
+        )
+
+        # Version stamps of the site, author and tag feeds a post appears in.
+        post_save.connect(feeds.post_changed, sender=Post, dispatch_uid='blog.feeds.save')
+        pre_delete.connect(feeds.post_changed, sender=Post, dispatch_uid='blog.feeds.delete')
+        m2m_changed.connect(
+            feeds.tags_changed, sender=Post.tags.through, dispatch_uid='blog.feeds.tags'
+        )
+
+        # Precomputed author stats for profile pages.
+        post_save.connect(
+            authorstats.post_changed, sender=Post, dispatch_uid='blog.authorstats.post_save'
+        )
+        post_delete.connect(
+            authorstats.post_changed, sender=Post, dispatch_uid='blog.authorstats.post_delete'
+        )
+        m2m_changed.connect(
+            authorstats.tags_changed, sender=Post.tags.through, dispatch_uid='blog.authorstats.tags'
+        )
+        post_save.connect(
+            authorstats.comment_saved, sender=Comment, dispatch_uid='blog.authorstats.comment_save'
+        )
+        post_delete.connect(
+            authorstats.comment_deleted, sender=Comment,
+            dispatch_uid='blog.authorstats.comment_delete',
+        )
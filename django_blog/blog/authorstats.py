@@ -0,0 +1,128 @@
+"""
+Author statistics for profile pages.
+
+AuthorStats holds each author's published post count, the active comments
+those posts have received, the time of their latest activity and their
+most used tags. It is maintained from signals:
+
+- A new or deleted active comment adjusts comment_count with a single
+  UPDATE, the same way blog.moderation maintains Post.comment_count. A
+  deleted comment that was the latest activity recomputes the row instead.
+- Saving or deleting a post, or changing its tags, recomputes its author's
+  row once the transaction commits, since a status change can move every
+  figure at once.
+- Bulk moderation recomputes the rows of the authors it touched.
+
+refresh_authors() recomputes any set of authors in a fixed number of
+queries; the refresh_author_stats command runs it for everyone, and
+get_stats() runs it for an author whose row does not exist yet.
+"""
+from collections import defaultdict
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, F, Max, Subquery, Sum
+
+from .models import AuthorStats, Comment, Post
+
+TOP_TAGS = 5
+
+
+def refresh_authors(user_ids=None):
+    """Recompute the stats of `user_ids` (default: every author). Returns rows written."""
+    posts = Post.published.order_by()
+    if user_ids is not None:
+        # Skips authors deleted since the refresh was queued.
+        user_ids = set(User.objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+        posts = posts.filter(author__in=user_ids)
+    stats = {
+        row['author']: AuthorStats(
+            user_id=row['author'],
+            post_count=row['posts'],
+            comment_count=row['comments'] or 0,
+            last_activity=row['latest'],
+        )
+        for row in posts.values('author').annotate(
+            posts=Count('pk'), comments=Sum('comment_count'), latest=Max('published_date')
+        )
+    }
+    latest_comments = Comment.objects.filter(
+        is_active=True, post__in=posts.values('pk')
+    ).order_by().values_list('post__author').annotate(latest=Max('created_at'))
+    for author_id, latest in latest_comments:
+        row = stats[author_id]
+        row.last_activity = max(row.last_activity, latest)
+
+    tag_counts = defaultdict(list)
+    for author_id, name, slug, count in posts.filter(tags__isnull=False).values_list(
+        'author', 'tags__name', 'tags__slug'
+    ).annotate(count=Count('pk')):
+        tag_counts[author_id].append((count, name, slug))
+    for author_id, tags in tag_counts.items():
+        tags.sort(key=lambda tag: (-tag[0], tag[1]))
+        stats[author_id].top_tags = [
+            {'name': name, 'slug': slug, 'count': count} for count, name, slug in tags[:TOP_TAGS]
+        ]
+
+    # Authors with nothing published keep a row of zeros.
+    for user_id in user_ids or ():
+        stats.setdefault(user_id, AuthorStats(user_id=user_id))
+    with transaction.atomic():
+        if user_ids is None:
+            AuthorStats.objects.exclude(user__in=stats)._raw_delete(AuthorStats.objects.db)
+        AuthorStats.objects.bulk_create(
+            stats.values(),
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=['post_count', 'comment_count', 'last_activity', 'top_tags'],
+        )
+    return len(stats)
+
+
+def get_stats(user):
+    """The stats row of `user`, computed on first use."""
+    try:
+        return user.author_stats
+    except AuthorStats.DoesNotExist:
+        refresh_authors([user.pk])
+        return AuthorStats.objects.get(user=user)
+
+
+def refresh_later(user_ids):
+    user_ids = set(user_ids)
+    if user_ids:
+        transaction.on_commit(lambda: refresh_authors(user_ids))
+
+
+def post_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_later([instance.author_id])
+
+
+def tags_changed(sender, instance, action, **kwargs):
+    if action.startswith('post_') and isinstance(instance, Post):
+        refresh_later([instance.author_id])
+
+
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    if not created or raw or not instance.is_active:
+        return
+    AuthorStats.objects.filter(
+        user=Subquery(Post.published.filter(pk=instance.post_id).values('author'))
+    ).update(comment_count=F('comment_count') + 1, last_activity=instance.created_at)
+
+
+def comment_deleted(sender, instance, **kwargs):
+    if not instance.is_active:
+        return
+    authors = Post.published.filter(pk=instance.post_id).values('author')
+    updated = AuthorStats.objects.filter(
+        user=Subquery(authors),
+        comment_count__gt=0,
+        last_activity__gt=instance.created_at,
+    ).update(comment_count=F('comment_count') - 1)
+    if not updated:
+        # The comment was the author's latest activity, which only a
+        # recount can move back (or the row does not exist yet).
+        refresh_later(authors.values_list('author', flat=True))
@@ -0,0 +1,59 @@
+"""
+In-process background work queue.
+
+A BatchWorker collects ids submitted from request handlers and passes them
+to its handler in batches on a daemon thread, started on first use. Work is
+best effort: ids still queued when the process exits are lost, so every
+handler has a management command that catches up on missed work. A batch
+whose handler fails is logged and not retried: handlers recompute from the
+database, so the catch-up command repairs it, and retrying a batch that
+always fails would keep the thread busy with it.
+"""
+import logging
+import queue
+import threading
+
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class BatchWorker:
+    def __init__(self, name, handler, batch_size=100, wait=0.5):
+        self.name = name
+        self.handler = handler
+        self.batch_size = batch_size
+        # How long to wait for more ids before handling a partial batch.
+        self.wait = wait
+        self.queue = queue.SimpleQueue()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def submit(self, item):
+        if self.thread is None:
+            with self.lock:
+                if self.thread is None:
+                    self.thread = threading.Thread(target=self.run, name=self.name, daemon=True)
+                    self.thread.start()
+        self.queue.put(item)
+
+    def next_batch(self):
+        batch = [self.queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get(timeout=self.wait))
+            except queue.Empty:
+                break
+        # Drop duplicates, keeping submission order.
+        return list(dict.fromkeys(batch))
+
+    def run(self):
+        while True:
+            batch = self.next_batch()
+            try:
+                self.handler(batch)
+            except Exception:
+                # Left for the catch-up command.
+                logger.exception('%s failed on a batch of %d: %r', self.name, len(batch), batch)
+            finally:
+                connection.close()
@@ -0,0 +1,176 @@
+"""
+RSS, Atom and JSON Feed documents for the whole site, one author or one tag.
+
+A built feed is stored in the cache as one blob (body, ETag, Last-Modified)
+under a key that includes the version stamp of its scope; both are shared
+by every process through the default cache (see CACHES). Saving or
+deleting a post, or changing its tags, bumps the stamps of the site feed,
+its author's feed and its tags' feeds, so only feeds the change appears in
+are rebuilt, on their next poll. Serving a warm feed reads the stamp and
+the blob from the cache without touching the database, and a poll carrying
+a matching If-None-Match or If-Modified-Since gets a 304.
+
+Last-Modified is the newest updated_at or published_date among the
+items, so a rebuild caused by a change elsewhere in the scope leaves it,
+and the ETag of an unchanged body, as they were. Removing an item (or
+tagging an old post) can change a feed without advancing that date; the
+ETag does change, and a poll that sends If-None-Match is judged by it
+alone.
+"""
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db import transaction
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.http import http_date
+
+from .models import Post
+from .versioning import bump_label, get_versions
+
+FEED_SIZE = 20
+# Keys of superseded versions are never read again; let them expire.
+FEED_CACHE_TIMEOUT = 24 * 60 * 60
+
+FORMATS = {
+    'rss': (Rss201rev2Feed, 'application/rss+xml; charset=utf-8'),
+    'atom': (Atom1Feed, 'application/atom+xml; charset=utf-8'),
+    'json': (None, 'application/feed+json; charset=utf-8'),
+}
+
+
+def scope_label(kind, value=''):
+    return f'blog.post:feed:{kind}:{value}'
+
+
+def bump_scopes(authors=(), tags=()):
+    labels = [scope_label('site')]
+    labels += [scope_label('author', username) for username in authors]
+    labels += [scope_label('tag', slug) for slug in tags]
+
+    def bump():
+        for label in labels:
+            bump_label(label)
+
+    transaction.on_commit(bump)
+
+
+def post_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    bump_scopes(
+        authors=[instance.author.username],
+        tags=instance.tags.values_list('slug', flat=True) if instance.pk else [],
+    )
+
+
+def tags_changed(sender, instance, action, pk_set, model, **kwargs):
+    if not isinstance(instance, Post):
+        return
+    if action in ('post_add', 'post_remove') and pk_set:
+        bump_scopes(tags=model.objects.filter(pk__in=pk_set).values_list('slug', flat=True))
+    elif action == 'pre_clear':
+        bump_scopes(tags=instance.tags.values_list('slug', flat=True))
+
+
+def feed_posts(kind, value):
+    posts = Post.published.select_related('author').prefetch_related('tags')
+    if kind == 'author':
+        posts = posts.filter(author__username=value)
+    elif kind == 'tag':
+        posts = posts.filter(tags__slug=value)
+    return list(posts.order_by('-published_date')[:FEED_SIZE])
+
+
+def build_feed(request, kind, value, fmt):
+    """Return the body of one feed document and its items' last change, or None."""
+    posts = feed_posts(kind, value)
+    if kind == 'site':
+        title, description = 'Django Blog', 'Latest posts'
+    elif kind == 'author':
+        title, description = f'Django Blog: posts by {value}', f'Latest posts by {value}'
+    else:
+        title, description = f'Django Blog: {value}', f'Latest posts tagged {value}'
+    home = request.build_absolute_uri('/')
+    feed_url = request.build_absolute_uri(request.path)
+
+    generator, _ = FORMATS[fmt]
+    if generator is None:
+        document = {
+            'version': 'https://jsonfeed.org/version/1.1',
+            'title': title,
+            'description': description,
+            'home_page_url': home,
+            'feed_url': feed_url,
+            'items': [
+                {
+                    'id': request.build_absolute_uri(post.get_absolute_url()),
+                    'url': request.build_absolute_uri(post.get_absolute_url()),
+                    'title': post.title,
+                    'content_text': post.content,
+                    'date_published': post.published_date.isoformat(),
+                    'date_modified': post.updated_at.isoformat(),
+                    'authors': [{'name': post.author.username}],
+                    'tags': [tag.name for tag in post.tags.all()],
+                }
+                for post in posts
+            ],
+        }
+        body = json.dumps(document, ensure_ascii=False).encode()
+    else:
+        feed = generator(
+            title=title, link=home, description=description, feed_url=feed_url, language='en',
+        )
+        for post in posts:
+            link = request.build_absolute_uri(post.get_absolute_url())
+            feed.add_item(
+                title=post.title,
+                link=link,
+                unique_id=link,
+                description=post.content,
+                pubdate=post.published_date,
+                updateddate=post.updated_at,
+                author_name=post.author.username,
+                categories=[tag.name for tag in post.tags.all()],
+            )
+        body = feed.writeString('utf-8').encode()
+    last_modified = max(
+        (max(post.updated_at, post.published_date) for post in posts), default=None
+    )
+    return body, last_modified and int(last_modified.timestamp())
+
+
+def serve_feed(request, fmt, kind='site', value=''):
+    if fmt not in FORMATS:
+        raise Http404('Unknown feed format.')
+    version = get_versions([scope_label(kind, value)])[0]
+    key = f'blog.feed:{kind}:{value}:{fmt}:{request.get_host()}:{version}'
+    cached = cache.get(key)
+    if cached is None:
+        body, last_modified = build_feed(request, kind, value, fmt)
+        etag = f'"{hashlib.md5(body, usedforsecurity=False).hexdigest()}"'
+        cached = (body, etag, last_modified)
+        cache.set(key, cached, FEED_CACHE_TIMEOUT)
+    body, etag, last_modified = cached
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = HttpResponse(body, content_type=FORMATS[fmt][1])
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def site_feed(request, fmt):
+    return serve_feed(request, fmt)
+
+
+def author_feed(request, username, fmt):
+    return serve_feed(request, fmt, 'author', username)
+
+
+def tag_feed(request, tag_slug, fmt):
+    return serve_feed(request, fmt, 'tag', tag_slug)
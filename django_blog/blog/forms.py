@@ -1,7 +1,10 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.utils import timezone
 from .models import Profile, Post, Comment
+from .sanitizer import sanitize
 from taggit.forms import TagWidget
 
 
@@ -51,10 +54,11 @@ class ProfileUpdateForm(forms.ModelForm):
 # It includes fields for the post title and content.
 # The title has a maximum length of 200 characters.
 # The content field allows for rich text input.
+# status and publish_at drive the draft/scheduled/published workflow.
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
-        fields = ['title', 'content', 'tags']
+        fields = ['title', 'content', 'tags', 'status', 'publish_at']
         widgets = {
             'title': forms.TextInput(attrs={
                 'class': 'form-control',
@@ -67,12 +71,40 @@ class PostForm(forms.ModelForm):
                 'placeholder': "What's on your mind? Write your blog post content here..."
             }),
             'tags': TagWidget(),
+            'publish_at': forms.DateTimeInput(attrs={'type': 'datetime-local'}),
+        }
+        labels = {
+            'publish_at': 'Publish at',
         }
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.fields['title'].help_text = 'Maximum 200 characters'
         self.fields['content'].help_text = 'Write your full blog post here. You can use paragraphs and formatting.'
+        self.fields['publish_at'].help_text = 'Only for scheduled posts: when the post goes live.'
+
+    def clean(self):
+        cleaned_data = super().clean()
+        status = cleaned_data.get('status')
+        publish_at = cleaned_data.get('publish_at')
+        if status == Post.SCHEDULED:
+            if publish_at is None:
+                self.add_error('publish_at', 'Choose when a scheduled post should be published.')
+            elif publish_at <= timezone.now():
+                self.add_error('publish_at', 'The publish time must be in the future.')
+        else:
+            cleaned_data['publish_at'] = None
+        return cleaned_data
+
+    def save(self, commit=True):
+        post = super().save(commit=False)
+        # A post is dated when it goes live, not when its draft was started.
+        if post.status == Post.PUBLISHED and self.initial.get('status') != Post.PUBLISHED:
+            post.published_date = timezone.now()
+        if commit:
+            post.save()
+            self.save_m2m()
+        return post
 
 
 
@@ -121,8 +153,7 @@ class CommentForm(forms.ModelForm):
             raise ValidationError("Comment must be at least 5 characters long.")
         
         # Sanitize HTML content to prevent XSS attacks
-        allowed_tags = ['b', 'i', 'u', 'em', 'strong', 'p', 'br']
-        content = bleach.clean(content, tags=allowed_tags, strip=True)
+        content = sanitize(content)
         
         return content
 
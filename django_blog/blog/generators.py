@@ -0,0 +1,79 @@
+# Synthetic data for the generate_fixtures command.
+# Authors per post follow a Zipf distribution (a few prolific writers),
+# comments per post are heavy-tailed (most posts get a handful, a few get
+# thousands) and tag usage is Zipf-distributed as well.
+from functools import partial
+
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from taggit.models import Tag, TaggedItem
+
+from django_blog.datagen import WORDS, ZipfSampler, heavy_tail, next_pk, text
+from django_blog.datagen import generate as write
+from .models import Comment, Post, Profile
+from .moderation import refresh_comment_counts
+
+
+def generate(options):
+    scale = options['scale']
+    write_rows = partial(
+        write,
+        seed=options['seed'],
+        workers=options['workers'],
+        batch_size=options['batch_size'],
+    )
+
+    start = next_pk(User)
+    users = range(start, start + int(1000 * scale))
+
+    def build_user(pk, rng):
+        yield User(pk=pk, username=f'user{pk}', email=f'user{pk}@example.com', password='!')
+
+    def build_profile(pk, rng):
+        # bulk_create() skips the post_save signal that creates profiles.
+        yield Profile(user_id=pk)
+
+    yield User, write_rows(User, users, build_user)
+    yield Profile, write_rows(Profile, users, build_profile)
+
+    start = next_pk(Tag)
+    tags = range(start, start + int(200 + 20 * scale))
+
+    def build_tag(pk, rng):
+        yield Tag(pk=pk, name=f'{rng.choice(WORDS)}-{pk}', slug=f'tag-{pk}')
+
+    yield Tag, write_rows(Tag, tags, build_tag)
+
+    start = next_pk(Post)
+    posts = range(start, start + int(10000 * scale))
+    authors = ZipfSampler(users)
+    post_type = ContentType.objects.get_for_model(Post)
+    popular_tags = ZipfSampler(tags)
+    commenters = ZipfSampler(users, s=0.8)
+
+    def build_post(pk, rng):
+        yield Post(
+            pk=pk,
+            title=text(rng, 6).capitalize(),
+            slug=f'post-{pk}',
+            content=text(rng, 150),
+            author_id=authors.pick(rng),
+            status=Post.PUBLISHED,
+        )
+
+    def build_tagged_items(pk, rng):
+        for tag_id in set(popular_tags.sample(rng, k=rng.randint(1, 5))):
+            yield TaggedItem(content_type=post_type, object_id=pk, tag_id=tag_id)
+
+    def build_comments(pk, rng):
+        for _ in range(heavy_tail(rng, mean=8, limit=5000)):
+            yield Comment(post_id=pk, author_id=commenters.pick(rng), content=text(rng, 25))
+
+    yield Post, write_rows(Post, posts, build_post)
+    yield TaggedItem, write_rows(TaggedItem, posts, build_tagged_items)
+    yield Comment, write_rows(Comment, posts, build_comments)
+
+    # bulk_create() skips the signals that keep Post.comment_count, so
+    # recount the new posts, a slice of ids per UPDATE.
+    for first in range(posts.start, posts.stop, 1000):
+        refresh_comment_counts(range(first, min(first + 1000, posts.stop)))
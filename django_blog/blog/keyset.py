@@ -0,0 +1,45 @@
+"""
+Keyset ("seek") pagination of posts, newest first.
+
+A page ends with a cursor naming its last post by (published_date, pk),
+and the next page is the posts strictly after it in that order. Each page
+is one query that walks an index from the cursor, so page 500 costs the
+same as page 1, and posts published meanwhile do not shift later pages
+the way OFFSET does. The trade-off is that pages can only be stepped
+through, not jumped to.
+"""
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+def encode_cursor(post):
+    return f'{post.published_date.isoformat()},{post.pk}'
+
+
+def decode_cursor(cursor):
+    """Return (published_date, pk), or None for a missing or malformed cursor."""
+    try:
+        published_date, pk = cursor.rsplit(',', 1)
+        published_date = parse_datetime(published_date)
+        pk = int(pk)
+    except (AttributeError, ValueError):
+        return None
+    if published_date is None:
+        return None
+    return published_date, pk
+
+
+def keyset_page(queryset, cursor, per_page):
+    """Return (posts, next cursor or None) for the page after `cursor`."""
+    queryset = queryset.order_by('-published_date', '-pk')
+    position = decode_cursor(cursor)
+    if position is not None:
+        published_date, pk = position
+        queryset = queryset.filter(
+            Q(published_date__lt=published_date) | Q(published_date=published_date, pk__lt=pk)
+        )
+    # One extra row tells whether there is a next page.
+    posts = list(queryset[:per_page + 1])
+    if len(posts) > per_page:
+        return posts[:per_page], encode_cursor(posts[per_page - 1])
+    return posts, None
@@ -0,0 +1,89 @@
+import asyncio
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+
+from blog.models import Post
+
+COMMENT = '<p>Thanks for the <b>great</b> write-up, this helped a lot!</p><script>x()</script>'
+
+
+def summary(label, latencies, elapsed):
+    # Every request of the burst arrives at once, so latencies are measured
+    # from the start of the burst and include time spent queued for a worker.
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return (
+        f'{label:<28} {len(latencies) / elapsed:>8,.0f} req/s   '
+        f'p50 {statistics.median(latencies) * 1000:>7.1f}ms   p99 {p99 * 1000:>7.1f}ms'
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare a burst of AJAX comments through the sync view on a fixed pool of WSGI '
+        'workers with the async view on one ASGI event loop.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=400)
+        parser.add_argument('--workers', type=int, default=4, help='WSGI worker threads')
+
+    def handle(self, *args, **options):
+        user = User.objects.create_user('benchmark-commenter')
+        post = Post.objects.create(
+            title='Benchmark post', content='Benchmark.', author=user, slug='benchmark-comments',
+            status=Post.PUBLISHED,
+        )
+        try:
+            with override_settings(ALLOWED_HOSTS=['*']):
+                self.stdout.write(self.run_wsgi(user, post, options))
+                self.stdout.write(self.run_asgi(user, post, options))
+        finally:
+            # Cascades to the benchmark comments.
+            user.delete()
+
+    def run_wsgi(self, user, post, options):
+        url = reverse('comment_ajax_create', args=[post.slug])
+        clients = {}
+        start = time.perf_counter()
+
+        def submit(_):
+            # One client per worker thread, like one WSGI worker per thread.
+            client = clients.get(threading.get_ident())
+            if client is None:
+                client = clients[threading.get_ident()] = Client()
+                client.force_login(user)
+            response = client.post(url, {'content': COMMENT})
+            assert response.json()['success'], response.content
+            return time.perf_counter() - start
+
+        with ThreadPoolExecutor(options['workers']) as pool:
+            latencies = list(pool.map(submit, range(options['requests'])))
+        label = f'sync, {options["workers"]} WSGI workers'
+        return summary(label, latencies, time.perf_counter() - start)
+
+    def run_asgi(self, user, post, options):
+        url = reverse('comment_ajax_create_async', args=[post.slug])
+
+        async def burst():
+            client = AsyncClient()
+            await client.aforce_login(user)
+            start = time.perf_counter()
+
+            async def submit():
+                response = await client.post(url, {'content': COMMENT})
+                assert response.json()['success'], response.content
+                return time.perf_counter() - start
+
+            latencies = await asyncio.gather(*(submit() for _ in range(options['requests'])))
+            return latencies, time.perf_counter() - start
+
+        latencies, elapsed = asyncio.run(burst())
+        return summary('async, 1 ASGI event loop', latencies, elapsed)
@@ -0,0 +1,78 @@
+import io
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.models import Post
+
+
+def poll(application, url, **headers):
+    """Send one GET through the WSGI handler, as a server would; returns (status, headers, body)."""
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': url,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': io.StringIO(),
+        **headers,
+    }
+    started = {}
+
+    def start_response(status, response_headers, exc_info=None):
+        started['status'] = int(status.split()[0])
+        started['headers'] = dict(response_headers)
+
+    result = application(environ, start_response)
+    body = b''.join(result)
+    result.close()
+    return started['status'], started['headers'], body
+
+
+class Command(BaseCommand):
+    help = 'Measure feed polls per second, cold and warm, and check warm polls skip the database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--polls', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        post = Post.objects.select_related('author').prefetch_related('tags').first()
+        if post is None:
+            raise CommandError('No posts; run generate_fixtures first.')
+        urls = [reverse('site_feed', args=[fmt]) for fmt in ('rss', 'atom', 'json')]
+        urls.append(reverse('author_feed', args=[post.author.username, 'atom']))
+        tag = post.tags.first()
+        if tag is not None:
+            urls.append(reverse('tag_feed', args=[tag.slug, 'atom']))
+
+        with override_settings(ALLOWED_HOSTS=['*']):
+            application = get_wsgi_application()
+            for url in urls:
+                self.stdout.write(url)
+                cache.clear()
+                start = time.perf_counter()
+                status, headers, body = poll(application, url)
+                built = (time.perf_counter() - start) * 1000
+                self.stdout.write(f'   cold build     {built:>9.1f}ms   {len(body):,} bytes')
+                for label, conditional in (
+                    ('warm 200', {}),
+                    ('warm 304', {'HTTP_IF_NONE_MATCH': headers['ETag']}),
+                ):
+                    with CaptureQueriesContext(connection) as queries:
+                        start = time.perf_counter()
+                        for _ in range(options['polls']):
+                            poll(application, url, **conditional)
+                        elapsed = time.perf_counter() - start
+                    self.stdout.write(
+                        f'   {label:<12} {options["polls"] / elapsed:>9,.0f} polls/s   '
+                        f'{len(queries)} queries'
+                    )
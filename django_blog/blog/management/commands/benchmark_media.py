@@ -0,0 +1,82 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.test import override_settings
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def download(port, name):
+    connection = HTTPConnection('127.0.0.1', port)
+    connection.request('GET', f'/media/{name}')
+    response = connection.getresponse()
+    received = 0
+    while chunk := response.read(1 << 20):
+        received += len(chunk)
+    connection.close()
+    return received
+
+
+def read_file(path):
+    received = 0
+    with open(path, 'rb') as file:
+        while chunk := file.read(1 << 20):
+            received += len(chunk)
+    return received
+
+
+class Command(BaseCommand):
+    help = 'Compare concurrent media download throughput with reading the files from disk.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--files', type=int, default=32)
+        parser.add_argument('--size-mb', type=int, default=8)
+        parser.add_argument('--concurrency', type=int, default=8)
+
+    def handle(self, *args, **options):
+        root = tempfile.mkdtemp()
+        try:
+            names = [f'bench/{i}.jpg' for i in range(options['files'])]
+            os.makedirs(os.path.join(root, 'bench'))
+            for name in names:
+                with open(os.path.join(root, name), 'wb') as file:
+                    file.write(os.urandom(options['size_mb'] << 20))
+
+            with override_settings(MEDIA_ROOT=root, ALLOWED_HOSTS=['*'], DEBUG=False):
+                server = make_server(
+                    '127.0.0.1', 0, get_wsgi_application(),
+                    server_class=ThreadingWSGIServer, handler_class=QuietHandler,
+                )
+                threading.Thread(target=server.serve_forever, daemon=True).start()
+                port = server.server_address[1]
+                try:
+                    for label, func, items in (
+                        ('disk read', read_file, [os.path.join(root, name) for name in names]),
+                        ('serve_media', lambda name: download(port, name), names),
+                    ):
+                        start = time.perf_counter()
+                        with ThreadPoolExecutor(options['concurrency']) as pool:
+                            total = sum(pool.map(func, items))
+                        elapsed = time.perf_counter() - start
+                        self.stdout.write(f'{label:<12} {total / elapsed / (1 << 20):>10,.0f} MiB/s')
+                finally:
+                    server.shutdown()
+                    server.server_close()
+        finally:
+            shutil.rmtree(root)
@@ -0,0 +1,72 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.sanitizer import ALLOWED_TAGS, _clean_markup, get_cleaner, sanitize, sanitize_many
+from django_blog.datagen import heavy_tail, text
+
+MARKUP = (
+    '<b>{}</b>', '<i>{}</i>', '<em>{}</em>', '<p>{}</p>', '{} &amp; more', 'x < y but {}',
+)
+HOSTILE = (
+    '<script>alert(1)</script>{}', '<a href="javascript:x()">{}</a>',
+    '<img src=x onerror=alert(1)>{}', '<div style="x">{}</div>', '<b><i>{}</b></i>',
+)
+
+
+def corpus(kind, count, seed):
+    """Comments shaped like real ones: heavy-tailed lengths, mostly plain text."""
+    rng = random.Random(seed)
+    comments = []
+    for _ in range(count):
+        body = text(rng, heavy_tail(rng, 25, limit=300) + 3)
+        roll = rng.random()
+        if kind == 'plain' or (kind == 'mixed' and roll < 0.85):
+            comments.append(body)
+        elif kind == 'markup' or (kind == 'mixed' and roll < 0.97):
+            comments.append(rng.choice(MARKUP).format(body))
+        else:
+            comments.append(rng.choice(HOSTILE).format(body))
+    # Double posts and copy-paste spam: a few texts repeat.
+    comments.extend(rng.choices(comments, k=count // 20))
+    rng.shuffle(comments)
+    return comments
+
+
+class Command(BaseCommand):
+    help = 'Compare bleach.clean() with blog.sanitizer on synthetic comment corpora.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--comments', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        import bleach
+
+        tags = list(ALLOWED_TAGS)
+        candidates = (
+            ('bleach.clean', lambda texts: [bleach.clean(t, tags=tags, strip=True) for t in texts]),
+            ('Cleaner reused', lambda texts: [get_cleaner().clean(t) for t in texts]),
+            ('sanitize', lambda texts: [sanitize(t) for t in texts]),
+            ('sanitize_many', sanitize_many),
+        )
+        for kind in ('plain', 'mixed', 'markup'):
+            comments = corpus(kind, options['comments'], options['seed'])
+            self.stdout.write(f'{kind} ({len(comments)} comments)')
+            baseline = None
+            expected = None
+            for label, clean in candidates:
+                # Every run starts cold; repeats within a corpus still hit.
+                _clean_markup.cache_clear()
+                start = time.perf_counter()
+                result = clean(comments)
+                elapsed = time.perf_counter() - start
+                if expected is None:
+                    expected, baseline = result, elapsed
+                elif result != expected:
+                    self.stderr.write(f'   {label} output differs from bleach.clean()')
+                self.stdout.write(
+                    f'   {label:<16} {len(comments) / elapsed:>12,.0f} comments/s'
+                    f'   {baseline / elapsed:>6.1f}x'
+                )
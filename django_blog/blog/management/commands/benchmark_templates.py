@@ -0,0 +1,83 @@
+import statistics
+import time
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.template import Engine, RequestContext, engines
+from django.test import RequestFactory
+
+from blog.models import Post
+
+
+def uncached_engine():
+    """The configured engine, minus the cached loader around its loaders."""
+    engine = engines['django'].engine
+    loaders = []
+    for loader in engine.loaders:
+        if isinstance(loader, tuple) and loader[0].endswith('cached.Loader'):
+            loaders.extend(loader[1])
+        else:
+            loaders.append(loader)
+    return Engine(
+        dirs=engine.dirs,
+        context_processors=engine.context_processors,
+        debug=engine.debug,
+        loaders=loaders,
+        string_if_invalid=engine.string_if_invalid,
+        libraries=engine.libraries,
+        builtins=engine.builtins,
+        autoescape=engine.autoescape,
+    )
+
+
+class Command(BaseCommand):
+    help = 'Measure render time of blog/post_list.html with and without template caching.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def handle(self, *args, **options):
+        items, repeat = options['items'], options['repeat']
+        request = RequestFactory().get('/posts/')
+        request.user = AnonymousUser()
+        template_name = 'blog/post_list.html'
+        cached = engines['django'].engine
+        uncached = uncached_engine()
+
+        # Seed inside a transaction that is rolled back, so the benchmark
+        # never leaves data behind in the project database.
+        with transaction.atomic():
+            authors = User.objects.bulk_create(
+                User(username=f'bench-author-{i}', password='!') for i in range(10)
+            )
+            Post.objects.bulk_create(
+                Post(title=f'Post {i}', content='lorem ipsum ' * 60, author=authors[i % 10])
+                for i in range(items)
+            )
+
+            def render(engine):
+                context = {'posts': Post.objects.order_by('-published_date')[:items]}
+                return engine.get_template(template_name).render(RequestContext(request, context))
+
+            modes = (
+                ('parse + render', lambda: render(uncached), True),
+                ('cached loader, fragment miss', lambda: render(cached), True),
+                ('cached loader, fragment hit', lambda: render(cached), False),
+            )
+            for name, func, clear in modes:
+                func()
+                samples = []
+                for _ in range(repeat):
+                    if clear:
+                        cache.clear()
+                    start = time.perf_counter()
+                    func()
+                    samples.append((time.perf_counter() - start) * 1000)
+                self.stdout.write(
+                    f'{name:<30} p50 {statistics.median(samples):>7.3f}ms'
+                    f'  min {min(samples):>7.3f}ms'
+                )
+            transaction.set_rollback(True)
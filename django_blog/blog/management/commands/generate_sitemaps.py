@@ -0,0 +1,24 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.sitemaps import SECTIONS
+from django_blog.sitemaps import generate
+
+
+class Command(BaseCommand):
+    help = 'Write sitemap shards and the index to SITEMAP_ROOT, rewriting only changed shards.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default=settings.SITE_URL)
+        parser.add_argument('--force', action='store_true', help='rewrite every shard')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        written, unchanged, removed = generate(SECTIONS, options['base_url'], force=options['force'])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f'Sitemaps: {written} written, {unchanged} unchanged, {removed} removed '
+            f'in {elapsed:.1f}s.'
+        )
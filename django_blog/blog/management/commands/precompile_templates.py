@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from django_blog.template_cache import precompile_templates
+
+
+class Command(BaseCommand):
+    help = 'Parse every template so deploys fail on syntax errors and caches start warm.'
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        compiled, errors = precompile_templates()
+        elapsed = (time.perf_counter() - start) * 1000
+        for name, error in errors:
+            self.stderr.write(f'{name}: {error}')
+        self.stdout.write(f'Compiled {compiled} templates in {elapsed:.0f}ms.')
+        if errors:
+            raise CommandError(f'{len(errors)} templates failed to compile.')
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from blog.publishing import publish_due
+
+
+class Command(BaseCommand):
+    help = 'Publish scheduled posts whose publish time has passed. Run from cron, e.g. every minute.'
+
+    def handle(self, *args, **options):
+        published = publish_due()
+        self.stdout.write(f'Published {published} scheduled posts.')
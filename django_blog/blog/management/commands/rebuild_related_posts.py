@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.related import has_numpy, rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recompute the related-posts table for every post.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--engine', choices=['numpy', 'python'],
+            help='Similarity engine (default: numpy when NumPy and SciPy are installed).',
+        )
+
+    def handle(self, *args, **options):
+        if options['engine'] == 'numpy' and not has_numpy():
+            raise CommandError('The numpy engine needs NumPy and SciPy installed.')
+        start = time.perf_counter()
+        links = rebuild(options['engine'])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f'Wrote {links} related-post links in {elapsed:.1f}s.')
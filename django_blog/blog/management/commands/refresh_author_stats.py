@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from blog.authorstats import refresh_authors
+
+
+class Command(BaseCommand):
+    help = 'Recompute every author\'s profile stats, e.g. after importing posts with bulk_create().'
+
+    def handle(self, *args, **options):
+        written = refresh_authors()
+        self.stdout.write(f'Refreshed stats of {written} authors.')
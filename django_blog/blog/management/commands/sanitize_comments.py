@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Comment
+from blog.sanitizer import sanitize_many
+from blog.versioning import bump_version
+
+
+class Command(BaseCommand):
+    help = 'Sanitize stored comments, e.g. after an import that bypassed CommentForm.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        comments = Comment.objects.order_by('pk').only('pk', 'content')
+        checked = changed = 0
+        last_pk = 0
+        while True:
+            batch = list(comments.filter(pk__gt=last_pk)[:options['batch_size']])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            checked += len(batch)
+            dirty = []
+            for comment, cleaned in zip(batch, sanitize_many([c.content for c in batch])):
+                if cleaned != comment.content:
+                    comment.content = cleaned
+                    dirty.append(comment)
+            changed += len(dirty)
+            if dirty and not options['dry_run']:
+                Comment.objects.bulk_update(dirty, ['content'])
+        if changed and not options['dry_run']:
+            bump_version(Comment)
+        verb = 'would change' if options['dry_run'] else 'changed'
+        self.stdout.write(f'Checked {checked} comments, {verb} {changed}.')
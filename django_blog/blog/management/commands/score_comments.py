@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Comment
+from blog.spam import BATCH_SIZE, score_comments
+
+
+class Command(BaseCommand):
+    help = 'Score comments that the background spam scorer has not seen yet.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE * 10)
+
+    def handle(self, *args, **options):
+        unscored = Comment.objects.filter(spam_score__isnull=True).order_by('pk')
+        scored = hidden = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                unscored.filter(pk__gt=last_pk).values_list('pk', flat=True)[:options['batch_size']]
+            )
+            if not batch:
+                break
+            hidden += score_comments(batch)
+            scored += len(batch)
+            last_pk = batch[-1]
+        self.stdout.write(f'Scored {scored} comments, hid {hidden} as spam.')
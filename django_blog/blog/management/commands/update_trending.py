@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from blog.popularity import update_trending
+
+
+class Command(BaseCommand):
+    help = 'Decay trending scores and fold in recent views. Run from cron, e.g. every 15 minutes.'
+
+    def handle(self, *args, **options):
+        updated = update_trending()
+        self.stdout.write(f'Updated trending scores of {updated} posts.')
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:09
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def date_existing_posts(apps, schema_editor):
+    # Existing posts were last changed no later than now; their publication
+    # date is the best record there is.
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.update(updated_at=F('published_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_author_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(date_existing_posts, migrations.RunPython.noop),
+    ]
@@ -2,11 +2,20 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-from PIL import Image
 from django.urls import reverse 
+from django.utils import timezone
 from django.utils.text import slugify
 from taggit.managers import TaggableManager
 
+from django_blog.objectcache import ObjectCache
+
+
+
+class PublishedManager(models.Manager):
+    """Posts readers can see: Post.published.all() instead of Post.objects.filter(status=...)"""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(status=Post.PUBLISHED)
 
 
 # Blog Post Model
@@ -17,13 +26,51 @@ class Post(models.Model):
     title = models.CharField(max_length=200)
     content = models.TextField()
     published_date = models.DateTimeField(auto_now_add=True)
+    # Time of the last save(), given as the post's lastmod in sitemaps and feeds.
+    updated_at = models.DateTimeField(auto_now=True)
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='blog_posts')
     #slug = models.SlugField(unique=True, blank=True)
     slug = models.SlugField(null=True, blank=True) 
     tags = TaggableManager()  # Allows tagging of posts
+    # Publication workflow: drafts are visible to their author only, and
+    # scheduled posts are published at publish_at by blog.publishing.
+    DRAFT = 'draft'
+    SCHEDULED = 'scheduled'
+    PUBLISHED = 'published'
+    STATUS_CHOICES = [
+        (DRAFT, 'Draft'),
+        (SCHEDULED, 'Scheduled'),
+        (PUBLISHED, 'Published'),
+    ]
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=DRAFT)
+    publish_at = models.DateTimeField(null=True, blank=True)
+    # Active comments, kept up to date by blog.moderation.
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    # Popularity, maintained by blog.popularity: views are flushed in
+    # batches, and the trending job folds recent_views into trending_score.
+    view_count = models.PositiveIntegerField(default=0, editable=False)
+    recent_views = models.PositiveIntegerField(default=0, editable=False)
+    trending_score = models.FloatField(default=0, editable=False)
+    trending_updated_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+
+    objects = models.Manager()
+    published = PublishedManager()
 
 
+    # Written only by their maintainers (UPDATEs with F() expressions), so a
+    # plain save() of an existing post, possibly a cached copy, must not
+    # write back the values it happened to load.
+    COUNTER_FIELDS = frozenset({
+        'comment_count', 'view_count', 'recent_views', 'trending_score', 'trending_updated_at',
+    })
+
     def save(self, *args, **kwargs): 
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
         if not self.slug:
             base_slug = slugify(self.title)
             slug = base_slug
@@ -40,12 +87,41 @@ class Post(models.Model):
     
     def get_absolute_url(self):
         return reverse('post-detail', kwargs={'pk': self.pk}) # URL for the post detail view
+
+    def publish(self, when=None):
+        """Mark the post published, dated `when` (default now), and save it."""
+        self.status = self.PUBLISHED
+        self.published_date = when or timezone.now()
+        self.publish_at = None
+        self.save()
     
     class Meta:
         ordering = ['-published_date']  # Show newest posts first
+        indexes = [
+            models.Index(fields=['-trending_score'], name='post_trending_idx'),
+            # Profile pages: one author's posts, newest first, by keyset.
+            models.Index(fields=['author', '-published_date', '-id'], name='post_author_date_idx'),
+            # Partial: every public listing reads published posts newest
+            # first, and drafts never enter the index.
+            models.Index(
+                fields=['-published_date'],
+                name='post_published_idx',
+                condition=models.Q(status='published'),
+            ),
+            # The publisher's lookup of scheduled posts that are due.
+            models.Index(
+                fields=['publish_at'],
+                name='post_scheduled_idx',
+                condition=models.Q(status='scheduled'),
+            ),
+        ]
 
 
 
+# Posts by pk or slug for detail and edit views; see django_blog.objectcache.
+post_cache = ObjectCache(Post, slug_field='slug')
+
+
 # title: CharField with max 200 characters for the blog post title
 # content: TextField for the main blog post content (unlimited length)
 # published_date: DateTimeField that automatically sets the date/time when a post is created
@@ -76,7 +152,10 @@ class Profile(models.Model):
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
         
-        # Resize image if it's too large
+        # Resize image if it's too large. PIL is imported here rather than at
+        # module level so it is only loaded by processes that save profiles.
+        from PIL import Image
+
         img = Image.open(self.profile_picture.path)
         if img.height > 300 or img.width > 300:
             output_size = (300, 300)
@@ -115,14 +194,17 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
-    # Optional: Add moderation fields
+    # Moderation: inactive comments are hidden and wait in the moderation
+    # queue. spam_score is filled in by the background spam scorer.
     is_active = models.BooleanField(default=True)
+    spam_score = models.FloatField(null=True, blank=True, editable=False)
     
     class Meta:
         ordering = ['created_at']  # Oldest comments first
         indexes = [
             models.Index(fields=['post', '-created_at']),
             models.Index(fields=['author', '-created_at']),
+            models.Index(fields=['is_active', 'created_at'], name='comment_moderation_idx'),
         ]
 
     def __str__(self):
@@ -137,4 +219,44 @@ class Comment(models.Model):
 
     def can_delete(self, user):
         """Check if a user can delete this comment"""
-        return self.author == user or user.is_staff
\ No newline at end of file
+        return self.author == user or user.is_staff
+
+# Precomputed "related posts": the top neighbors of each post by tag overlap
+# and text similarity, ranked from 0. Written by blog.related; the detail page
+# reads one post's rows through the (post, rank) unique index.
+class RelatedPost(models.Model):
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='related_links')
+    related = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ['post', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'rank'], name='relatedpost_post_rank_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.post_id} -> {self.related_id} ({self.score:.3f})'
+
+
+# Per-author figures shown on profile pages, kept up to date by
+# blog.authorstats from post and comment signals so that a profile reads
+# them with its user row instead of aggregating on every view.
+class AuthorStats(models.Model):
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name='author_stats'
+    )
+    # Published posts, and active comments on them.
+    post_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    # Latest post published or comment received.
+    last_activity = models.DateTimeField(null=True, blank=True)
+    # [{'name': ..., 'slug': ..., 'count': ...}], most used first.
+    top_tags = models.JSONField(default=list)
+
+    class Meta:
+        verbose_name_plural = 'author stats'
+
+    def __str__(self):
+        return f'Stats for {self.user_id}'
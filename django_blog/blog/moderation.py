@@ -0,0 +1,90 @@
+"""
+Comment moderation.
+
+Bulk actions run as one UPDATE or DELETE over the selected comments, plus
+one UPDATE that recounts Post.comment_count for the posts they belong to
+and a recount of their authors' stats (blog.authorstats).
+Neither sends model signals, so the version stamps used by
+{% cachefragment %} are bumped explicitly.
+
+New comments are queued for spam scoring once their transaction commits;
+see blog.spam.
+"""
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .authorstats import refresh_authors
+from .models import Comment, Post, post_cache
+from .versioning import bump_version
+
+
+def refresh_comment_counts(post_ids):
+    """Recount active comments of `post_ids` in a single UPDATE."""
+    active = (
+        Comment.objects.filter(post=OuterRef('pk'), is_active=True)
+        .order_by()
+        .values('post')
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    Post.objects.filter(pk__in=post_ids).update(
+        comment_count=Coalesce(Subquery(active), 0)
+    )
+    post_cache.invalidate_pks(post_ids)
+
+
+def _moderate(queryset, apply):
+    with transaction.atomic():
+        post_ids = list(queryset.order_by().values_list('post_id', flat=True).distinct())
+        count = apply(queryset)
+        refresh_comment_counts(post_ids)
+        refresh_authors(
+            Post.objects.filter(pk__in=post_ids).values_list('author', flat=True).distinct()
+        )
+    bump_version(Comment)
+    bump_version(Post)
+    return count
+
+
+def approve(queryset):
+    return _moderate(queryset, lambda comments: comments.update(is_active=True))
+
+
+def hide(queryset):
+    return _moderate(queryset, lambda comments: comments.update(is_active=False))
+
+
+def delete(queryset):
+    # _raw_delete() issues one DELETE without the collector, which would
+    # fetch every row first to send signals. Nothing references Comment, so
+    # there is nothing to cascade.
+    return _moderate(queryset, lambda comments: comments._raw_delete(comments.db))
+
+
+ACTIONS = {
+    'approve': approve,
+    'hide': hide,
+    'delete': delete,
+}
+
+
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    if not created or raw:
+        return
+    if instance.is_active:
+        Post.objects.filter(pk=instance.post_id).update(comment_count=F('comment_count') + 1)
+        post_cache.invalidate_pks([instance.post_id])
+        bump_version(Post)
+    from .spam import submit
+
+    transaction.on_commit(lambda: submit(instance.pk))
+
+
+def comment_deleted(sender, instance, **kwargs):
+    if instance.is_active:
+        Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+            comment_count=F('comment_count') - 1
+        )
+        post_cache.invalidate_pks([instance.post_id])
+        bump_version(Post)
@@ -0,0 +1,135 @@
+"""
+Post view counts and trending scores.
+
+Page views are counted in process memory and written by a background
+thread every BLOG_VIEW_FLUSH_INTERVAL seconds as one UPDATE that adds each
+post's buffered delta to Post.view_count and Post.recent_views. Requests
+themselves never write. A flush that fails is logged and its views are
+kept for the next one. Views still buffered when a process is killed are
+lost; a clean exit flushes them.
+
+A flush also stores the new totals in the cache, where get_view_count()
+reads them for the post page. The counters change on every flush, so the
+object cache's copies of those posts are left alone and their view_count
+is not shown.
+
+update_trending(), run on a schedule by the update_trending command, folds
+recent_views into Post.trending_score with exponential decay:
+
+    trending_score = trending_score * 0.5 ** (elapsed / half-life) + recent_views
+
+so a view counts half as much after every BLOG_TRENDING_HALF_LIFE seconds.
+The column is indexed, so listing trending posts is an ordinary indexed
+read.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, Max, Value, When
+from django.utils import timezone
+
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 10
+DEFAULT_HALF_LIFE = 6 * 60 * 60
+VIEW_COUNT_TIMEOUT = 24 * 60 * 60
+
+
+def view_count_key(post_id):
+    return f'blog.views:{post_id}'
+
+
+def add_views(deltas):
+    """Add {post_id: views} to the view counters in a single UPDATE."""
+    if not deltas:
+        return
+    delta = Case(
+        *[When(pk=pk, then=Value(count)) for pk, count in deltas.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    Post.objects.filter(pk__in=deltas).update(
+        view_count=F('view_count') + delta,
+        recent_views=F('recent_views') + delta,
+    )
+    totals = Post.objects.filter(pk__in=deltas).values_list('pk', 'view_count')
+    cache.set_many({view_count_key(pk): total for pk, total in totals}, VIEW_COUNT_TIMEOUT)
+
+
+def get_view_count(post_id):
+    """The post's view count as of the last flush in any process."""
+    key = view_count_key(post_id)
+    count = cache.get(key)
+    if count is None:
+        count = Post.objects.filter(pk=post_id).values_list('view_count', flat=True).first() or 0
+        # add(): a flush that stored a newer total meanwhile wins.
+        cache.add(key, count, VIEW_COUNT_TIMEOUT)
+    return count
+
+
+class ViewCounter:
+    def __init__(self):
+        self.counts = Counter()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def record(self, post_id):
+        with self.lock:
+            self.counts[post_id] += 1
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='view-counter', daemon=True)
+                self.thread.start()
+                atexit.register(self.flush)
+
+    def flush(self):
+        with self.lock:
+            counts, self.counts = self.counts, Counter()
+        try:
+            add_views(counts)
+        except Exception:
+            # Put the views back for the next flush.
+            with self.lock:
+                self.counts.update(counts)
+            raise
+
+    def run(self):
+        interval = getattr(settings, 'BLOG_VIEW_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)
+        while True:
+            time.sleep(interval)
+            try:
+                self.flush()
+            except Exception:
+                # flush() kept the views; they are retried next interval.
+                logger.exception('Flushing buffered post views failed')
+            finally:
+                connection.close()
+
+
+view_counter = ViewCounter()
+
+
+def record_view(post_id):
+    view_counter.record(post_id)
+
+
+def update_trending(now=None):
+    """Decay every post's trending score and add its recent views."""
+    now = now or timezone.now()
+    half_life = getattr(settings, 'BLOG_TRENDING_HALF_LIFE', DEFAULT_HALF_LIFE)
+    with transaction.atomic():
+        last_run = Post.objects.aggregate(last=Max('trending_updated_at'))['last']
+        elapsed = (now - last_run).total_seconds() if last_run else 0
+        decay = 0.5 ** (max(elapsed, 0) / half_life)
+        return Post.objects.update(
+            trending_score=F('trending_score') * decay + F('recent_views'),
+            recent_views=0,
+            trending_updated_at=now,
+        )
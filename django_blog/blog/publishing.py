@@ -0,0 +1,32 @@
+"""
+Scheduled publishing.
+
+A post saved as Post.SCHEDULED carries the time it should go live in
+publish_at. publish_due(), run every minute or so by the publish_scheduled
+command, publishes the posts whose time has come, dated at their scheduled
+time rather than at the run. The due posts are found through the partial
+index on publish_at, so a run costs nothing when none are due.
+
+Each post is published with an ordinary save() so that the feeds, the
+related-posts table and the fragment cache hear about it through their
+signals, exactly as when an author publishes a draft by hand.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Post
+
+
+def publish_due(now=None):
+    """Publish every scheduled post due by `now`. Returns the number published."""
+    now = now or timezone.now()
+    published = 0
+    with transaction.atomic():
+        # Locked so that overlapping runs do not publish a post twice.
+        due = Post.objects.select_for_update().filter(
+            status=Post.SCHEDULED, publish_at__lte=now
+        ).order_by('publish_at')
+        for post in due:
+            post.publish(post.publish_at)
+            published += 1
+    return published
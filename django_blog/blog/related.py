@@ -0,0 +1,388 @@
+"""
+Related posts.
+
+Two posts are related when they share tags and words. Every post is a
+TF-IDF vector over the words of its title (counted TITLE_WEIGHT times) and
+content, and a binary vector over its tags, both L2-normalized. The score of
+a pair is
+
+    TAG_WEIGHT * cosine(tags) + TEXT_WEIGHT * cosine(text)
+
+and the TOP_N best neighbors of each post are stored in RelatedPost, so a
+page view reads them with one indexed query.
+
+rebuild() recomputes the whole table; the rebuild_related_posts command
+runs it. With NumPy and SciPy installed the similarities are sparse matrix
+products over blocks of rows; otherwise the same scores are accumulated
+from an inverted index in pure Python.
+
+Only published posts take part. Saving, deleting or retagging a post
+queues refresh_posts() on a background thread. It scores the changed posts
+against the corpus and rewrites only the neighbor lists the changes enter
+or leave: their own lists, and those of posts whose lists they join or
+drop out of.
+
+The background thread keeps the corpus (word counts, document frequencies,
+vectors and the inverted index) in memory between batches and updates it
+with the changed posts only, so a batch costs the postings of the posts it
+touches rather than a pass over every post. Vectors of unchanged posts keep
+the document frequencies they were computed with, and edits made through
+other processes are not seen, until the corpus is reloaded every
+BLOG_RELATED_CORPUS_MAX_AGE seconds; rebuild() should still run
+periodically to recompute every list with current frequencies.
+"""
+import heapq
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+
+from .background import BatchWorker
+from .models import Post, RelatedPost
+
+TOP_N = 10
+TAG_WEIGHT = 0.4
+TEXT_WEIGHT = 0.6
+TITLE_WEIGHT = 3
+# Pairs scoring below this are not worth showing.
+MIN_SCORE = 0.05
+# Words in more than this share of posts say nothing about relatedness and
+# would make every pair a candidate.
+MAX_DF = 0.5
+# Rows per sparse matrix product in the vectorized rebuild.
+BLOCK_SIZE = 1024
+DEFAULT_CORPUS_MAX_AGE = 60 * 60
+
+STOPWORDS = frozenset(
+    'a about after all also an and any are as at be been but by can could did do does '
+    'for from had has have he her his how i if in into is it its just like me more most '
+    'my no not of on one only or other our out over she so some such than that the their '
+    'them then there these they this to too up us was we were what when where which who '
+    'will with would you your'.split()
+)
+
+word_re = re.compile(r'[a-z0-9]{2,}')
+
+
+def tokenize(text):
+    return [word for word in word_re.findall(text.lower()) if word not in STOPWORDS]
+
+
+def load_corpus(post_ids=None):
+    """
+    Return (post ids, token counts, tag id sets) for every published post,
+    or for those of `post_ids` that are published.
+    """
+    posts = Post.published.all()
+    tagged = Post.tags.through.objects.filter(content_type=ContentType.objects.get_for_model(Post))
+    if post_ids is not None:
+        posts = posts.filter(pk__in=post_ids)
+        tagged = tagged.filter(object_id__in=post_ids)
+    ids, counts = [], []
+    for pk, title, content in posts.order_by('pk').values_list('pk', 'title', 'content'):
+        words = Counter(tokenize(content))
+        for word in tokenize(title):
+            words[word] += TITLE_WEIGHT
+        ids.append(pk)
+        counts.append(words)
+    tags = defaultdict(set)
+    for post_id, tag_id in tagged.values_list('object_id', 'tag_id'):
+        tags[post_id].add(tag_id)
+    return ids, counts, [tags[pk] for pk in ids]
+
+
+def text_vector(words, df, total):
+    """Normalized TF-IDF vector of one post's word counts."""
+    limit = max(1, MAX_DF * total)
+    vector = {
+        word: (1 + math.log(n)) * (math.log((1 + total) / (1 + df[word])) + 1)
+        for word, n in words.items()
+        if df[word] <= limit
+    }
+    norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1
+    return {word: weight / norm for word, weight in vector.items()}
+
+
+def tag_vector(tag_set):
+    return dict.fromkeys(tag_set, 1 / math.sqrt(len(tag_set))) if tag_set else {}
+
+
+def vectorize(counts, tag_sets):
+    """Return normalized text and tag vectors as lists of {feature: weight} dicts."""
+    total = len(counts)
+    df = Counter(word for words in counts for word in words)
+    texts = [text_vector(words, df, total) for words in counts]
+    return texts, [tag_vector(tag_set) for tag_set in tag_sets]
+
+
+class InvertedIndex:
+    """Sparse dot products between one post and all others, in pure Python."""
+
+    def __init__(self, texts=(), tags=()):
+        # {feature: {row: weight}}
+        self.texts = defaultdict(dict)
+        self.tags = defaultdict(dict)
+        for row, (text, tag) in enumerate(zip(texts, tags)):
+            self.add(row, text, tag)
+
+    def add(self, row, text, tags):
+        for word, weight in text.items():
+            self.texts[word][row] = weight
+        for tag, weight in tags.items():
+            self.tags[tag][row] = weight
+
+    def discard(self, row, text, tags):
+        for postings, vector in ((self.texts, text), (self.tags, tags)):
+            for feature in vector:
+                del postings[feature][row]
+                if not postings[feature]:
+                    del postings[feature]
+
+    def scores(self, text, tags):
+        """Return {row: score} for every post sharing a word or tag with the vectors."""
+        scores = defaultdict(float)
+        for postings, vector, factor in (
+            (self.texts, text, TEXT_WEIGHT),
+            (self.tags, tags, TAG_WEIGHT),
+        ):
+            for feature, weight in vector.items():
+                weight *= factor
+                for row, other in postings.get(feature, {}).items():
+                    scores[row] += weight * other
+        return scores
+
+
+def top_neighbors(row, candidates):
+    """Best TOP_N (row, score) pairs from an iterable of (row, score), excluding `row`."""
+    # Scores are rounded for ranking so that float noise between the two
+    # engines does not reorder ties; ties go to the older post.
+    return heapq.nlargest(
+        TOP_N,
+        ((other, score) for other, score in candidates if other != row and score >= MIN_SCORE),
+        key=lambda item: (round(item[1], 9), -item[0]),
+    )
+
+
+def neighbors_python(texts, tags):
+    index = InvertedIndex(texts, tags)
+    for row in range(len(texts)):
+        yield row, top_neighbors(row, index.scores(texts[row], tags[row]).items())
+
+
+def neighbors_numpy(texts, tags):
+    import numpy as np
+    from scipy import sparse
+
+    def matrix(vectors):
+        features = {}
+        rows, columns, values = [], [], []
+        for row, vector in enumerate(vectors):
+            for feature, weight in vector.items():
+                rows.append(row)
+                columns.append(features.setdefault(feature, len(features)))
+                values.append(weight)
+        shape = (len(vectors), max(len(features), 1))
+        return sparse.csr_matrix((values, (rows, columns)), shape=shape, dtype=np.float64)
+
+    text_matrix = matrix(texts)
+    tag_matrix = matrix(tags)
+    combined = sparse.hstack(
+        [text_matrix * math.sqrt(TEXT_WEIGHT), tag_matrix * math.sqrt(TAG_WEIGHT)], format='csr'
+    )
+    transposed = combined.T.tocsc()
+    for start in range(0, combined.shape[0], BLOCK_SIZE):
+        block = (combined[start:start + BLOCK_SIZE] @ transposed).tocsr()
+        for offset in range(block.shape[0]):
+            row = start + offset
+            begin, end = block.indptr[offset], block.indptr[offset + 1]
+            columns, scores = block.indices[begin:end], block.data[begin:end]
+            if len(scores) > TOP_N + 1:
+                # Keep everything tied with the cut-off so the tie-break in
+                # top_neighbors() sees the same candidates as the Python engine.
+                cutoff = np.partition(scores, -(TOP_N + 1))[-(TOP_N + 1)]
+                best = scores >= cutoff - 1e-9
+                columns, scores = columns[best], scores[best]
+            yield row, top_neighbors(row, zip(columns.tolist(), scores.tolist()))
+
+
+def has_numpy():
+    try:
+        import numpy  # noqa: F401
+        import scipy.sparse  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def rebuild(engine=None):
+    """Recompute every post's neighbors. Returns the number of rows written."""
+    ids, counts, tag_sets = load_corpus()
+    texts, tags = vectorize(counts, tag_sets)
+    if engine is None:
+        engine = 'numpy' if has_numpy() else 'python'
+    neighbors = neighbors_numpy if engine == 'numpy' else neighbors_python
+    links = [
+        RelatedPost(post_id=ids[row], related_id=ids[other], rank=rank, score=score)
+        for row, best in neighbors(texts, tags)
+        for rank, (other, score) in enumerate(best)
+    ]
+    with transaction.atomic():
+        # One DELETE; the collector would load every row first.
+        RelatedPost.objects.all()._raw_delete(RelatedPost.objects.db)
+        RelatedPost.objects.bulk_create(links, batch_size=5000)
+    return len(links)
+
+
+class Corpus:
+    """
+    The published posts' word counts, vectors and inverted index, keyed by
+    post id, updated in place as posts change.
+    """
+
+    def __init__(self):
+        ids, counts, tag_sets = load_corpus()
+        texts, tags = vectorize(counts, tag_sets)
+        self.loaded_at = time.monotonic()
+        self.counts = dict(zip(ids, counts))
+        self.df = Counter(word for words in counts for word in words)
+        self.texts = dict(zip(ids, texts))
+        self.tags = dict(zip(ids, tags))
+        self.index = InvertedIndex()
+        for pk in ids:
+            self.index.add(pk, self.texts[pk], self.tags[pk])
+
+    def update(self, post_ids):
+        """Re-read `post_ids` from the database; unpublished ones leave the corpus."""
+        for pk in post_ids:
+            words = self.counts.pop(pk, None)
+            if words is not None:
+                self.df.subtract(words.keys())
+                for word in words:
+                    if not self.df[word]:
+                        del self.df[word]
+                self.index.discard(pk, self.texts.pop(pk), self.tags.pop(pk))
+        ids, counts, tag_sets = load_corpus(post_ids)
+        for pk, words in zip(ids, counts):
+            self.counts[pk] = words
+            self.df.update(words.keys())
+        total = len(self.counts)
+        for pk, words, tag_set in zip(ids, counts, tag_sets):
+            self.texts[pk] = text_vector(words, self.df, total)
+            self.tags[pk] = tag_vector(tag_set)
+            self.index.add(pk, self.texts[pk], self.tags[pk])
+
+    def scores(self, pk):
+        return self.index.scores(self.texts[pk], self.tags[pk])
+
+
+_corpus = None
+_corpus_lock = threading.Lock()
+
+
+def get_corpus():
+    """The in-memory corpus, reloaded when older than BLOG_RELATED_CORPUS_MAX_AGE."""
+    global _corpus
+    max_age = getattr(settings, 'BLOG_RELATED_CORPUS_MAX_AGE', DEFAULT_CORPUS_MAX_AGE)
+    if _corpus is None or time.monotonic() - _corpus.loaded_at > max_age:
+        _corpus = Corpus()
+    return _corpus
+
+
+def refresh_posts(post_ids):
+    """Update the neighbor lists affected by changes to `post_ids`."""
+    with _corpus_lock:
+        corpus = get_corpus()
+        corpus.update(post_ids)
+        lists = find_changed_lists(corpus, post_ids)
+
+    with transaction.atomic():
+        RelatedPost.objects.filter(post_id__in=lists)._raw_delete(RelatedPost.objects.db)
+        RelatedPost.objects.bulk_create([
+            RelatedPost(post_id=pk, related_id=other, rank=rank, score=score)
+            for pk, best in lists.items()
+            for rank, (other, score) in enumerate(best)
+        ])
+
+
+def find_changed_lists(corpus, post_ids):
+    """{post id: new neighbor list} for every list the changes to `post_ids` alter."""
+    changed = {pk for pk in post_ids if pk in corpus.texts}
+    # Deleted or unpublished: drop their lists and leave everyone else's.
+    removed = set(post_ids) - changed
+
+    # Fresh lists for the changed posts, and their scores against everyone.
+    lists = {pk: [] for pk in removed}
+    scores = {}
+    for pk in changed:
+        pairs = corpus.scores(pk)
+        lists[pk] = top_neighbors(pk, pairs.items())
+        scores[pk] = {other: score for other, score in pairs.items() if other != pk}
+
+    # Other posts whose lists a changed post may enter or leave.
+    candidates = {
+        other for pk in changed for other, score in scores[pk].items() if score >= MIN_SCORE
+    }
+    gone = changed | removed
+    candidates.update(
+        RelatedPost.objects.filter(related_id__in=gone).values_list('post_id', flat=True)
+    )
+    candidates -= gone
+    current = defaultdict(list)
+    for post_id, related_id, score in RelatedPost.objects.filter(
+        post_id__in=candidates
+    ).values_list('post_id', 'related_id', 'score'):
+        current[post_id].append((related_id, score))
+    for pk in candidates:
+        stored = dict(current[pk])
+        # A neighbor that was removed, or that now scores lower (perhaps
+        # below MIN_SCORE), may make room for a post ranked below the list,
+        # which only a full rescore finds.
+        demoted = removed.intersection(stored) or any(
+            round(scores[other].get(pk, 0), 9) < round(stored[other], 9)
+            for other in changed.intersection(stored)
+        )
+        if demoted and pk in corpus.texts:
+            best = top_neighbors(pk, corpus.scores(pk).items())
+        else:
+            kept = [(other, score) for other, score in current[pk] if other not in gone]
+            kept += [(other, scores[other][pk]) for other in changed if pk in scores[other]]
+            best = top_neighbors(None, kept)
+        if best != current[pk]:
+            lists[pk] = best
+    return lists
+
+
+worker = BatchWorker('related-posts', refresh_posts, batch_size=50, wait=2)
+
+
+def post_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(lambda: worker.submit(instance.pk))
+
+
+def post_deleting(sender, instance, **kwargs):
+    """
+    pre_delete receiver. Deleting the post cascades to the RelatedPost rows
+    that list it, leaving gaps in those lists; note whose before they go,
+    so they are rescored along with the post's removal.
+    """
+    listed_by = RelatedPost.objects.filter(related=instance).values_list('post_id', flat=True)
+    post_ids = [instance.pk, *listed_by]
+
+    def submit():
+        for pk in post_ids:
+            worker.submit(pk)
+
+    transaction.on_commit(submit)
+
+
+def tags_changed(sender, instance, action, pk_set, model, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if isinstance(instance, Post):
+        transaction.on_commit(lambda: worker.submit(instance.pk))
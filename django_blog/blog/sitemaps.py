@@ -0,0 +1,25 @@
+from django.contrib.contenttypes.models import ContentType
+from django.urls import reverse
+from taggit.models import Tag
+
+from django_blog.sitemaps import Section
+
+from .models import Post
+
+
+def post_rows():
+    return Post.published.values_list('pk', 'updated_at')
+
+
+def tag_rows():
+    # Only tags with a page worth indexing: those used by a published post.
+    return Tag.objects.filter(
+        taggit_taggeditem_items__content_type=ContentType.objects.get_for_model(Post),
+        taggit_taggeditem_items__object_id__in=Post.published.values('pk'),
+    ).distinct().values_list('pk', 'slug')
+
+
+SECTIONS = [
+    Section('posts', post_rows, lambda row: (Post(pk=row[0]).get_absolute_url(), row[1])),
+    Section('tags', tag_rows, lambda row: (reverse('posts_by_tag', args=[row[1]]), None)),
+]
@@ -0,0 +1,113 @@
+"""
+Background spam scoring for new comments.
+
+Comment ids are queued after their transaction commits and scored in
+batches by a daemon thread, so posting a comment never waits for the model.
+Each batch writes spam_score in one UPDATE, and comments scoring at or
+above BLOG_SPAM_THRESHOLD are hidden for moderation.
+
+The model is pluggable: BLOG_SPAM_SCORER is the dotted path of a SpamScorer
+subclass, instantiated once per process. Comments missed by the thread (a
+worker restart, another process) are picked up by the score_comments
+management command.
+"""
+import math
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .background import BatchWorker
+from .models import Comment
+
+DEFAULT_SCORER = 'blog.spam.HeuristicSpamScorer'
+DEFAULT_THRESHOLD = 0.8
+
+# Comments scored per batch, and how long the worker waits to fill one.
+BATCH_SIZE = 100
+BATCH_WAIT = 0.5
+
+
+class SpamScorer:
+    """Base class for spam models. score() returns a 0..1 score per text."""
+
+    def score(self, texts):
+        raise NotImplementedError
+
+
+class HeuristicSpamScorer(SpamScorer):
+    """
+    A small logistic model over hand-picked features: links, shouting,
+    repeated punctuation and common spam vocabulary. It needs no training
+    data or third-party packages.
+    """
+
+    link_re = re.compile(r'https?://|www\.', re.IGNORECASE)
+    repeat_re = re.compile(r'([!?$])\1{2,}')
+    vocabulary = frozenset(
+        'viagra casino crypto bitcoin loan loans porn xxx winner prize '
+        'free cheap discount offer click subscribe'.split()
+    )
+    weights = {
+        'links': 1.6,
+        'caps': 3.0,
+        'repeats': 1.2,
+        'spam_words': 1.1,
+        'short_with_link': 1.5,
+    }
+    bias = -3.0
+
+    def features(self, text):
+        words = re.findall(r'[a-z]+', text.lower())
+        letters = [char for char in text if char.isalpha()]
+        links = len(self.link_re.findall(text))
+        return {
+            'links': min(links, 5),
+            'caps': sum(char.isupper() for char in letters) / len(letters) if letters else 0.0,
+            'repeats': min(len(self.repeat_re.findall(text)), 5),
+            'spam_words': min(sum(word in self.vocabulary for word in words), 5),
+            'short_with_link': float(links > 0 and len(words) < 8),
+        }
+
+    def score(self, texts):
+        scores = []
+        for text in texts:
+            features = self.features(text)
+            z = self.bias + sum(self.weights[name] * value for name, value in features.items())
+            scores.append(1 / (1 + math.exp(-z)))
+        return scores
+
+
+@lru_cache(maxsize=None)
+def get_scorer():
+    return import_string(getattr(settings, 'BLOG_SPAM_SCORER', DEFAULT_SCORER))()
+
+
+def score_comments(comment_ids):
+    """Score the given comments that have no score yet; returns how many were hidden."""
+    from .moderation import hide
+
+    rows = list(
+        Comment.objects.filter(pk__in=comment_ids, spam_score__isnull=True)
+        .values_list('pk', 'content')
+    )
+    if not rows:
+        return 0
+    scores = get_scorer().score([content for _, content in rows])
+    Comment.objects.bulk_update(
+        [Comment(pk=pk, spam_score=score) for (pk, _), score in zip(rows, scores)],
+        ['spam_score'],
+    )
+    threshold = getattr(settings, 'BLOG_SPAM_THRESHOLD', DEFAULT_THRESHOLD)
+    spam = [pk for (pk, _), score in zip(rows, scores) if score >= threshold]
+    if spam:
+        hide(Comment.objects.filter(pk__in=spam, is_active=True))
+    return len(spam)
+
+
+worker = BatchWorker('spam-scorer', score_comments, BATCH_SIZE, BATCH_WAIT)
+
+
+def submit(comment_id):
+    worker.submit(comment_id)
@@ -0,0 +1,49 @@
+from django import template
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+
+from ..versioning import get_versions
+
+register = template.Library()
+
+
+# {% cachefragment "name" "app.Model other_app.Model" [vary_on ...] %}
+# Caches its contents until any of the listed models changes. The key holds
+# the models' version stamps, so there is no timeout to tune and a save or
+# delete is visible on the next render.
+class CacheFragmentNode(template.Node):
+    def __init__(self, nodelist, fragment_name, models, vary_on):
+        self.nodelist = nodelist
+        self.fragment_name = fragment_name
+        self.models = models
+        self.vary_on = vary_on
+
+    def render(self, context):
+        labels = str(self.models.resolve(context)).split()
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        key = make_template_fragment_key(
+            f'cachefragment.{self.fragment_name.resolve(context)}',
+            vary_on + get_versions(labels),
+        )
+        value = cache.get(key)
+        if value is None:
+            value = self.nodelist.render(context)
+            cache.set(key, value, None)
+        return value
+
+
+@register.tag('cachefragment')
+def do_cachefragment(parser, token):
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' tag requires a fragment name and a list of models."
+        )
+    nodelist = parser.parse(('endcachefragment',))
+    parser.delete_first_token()
+    return CacheFragmentNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        parser.compile_filter(bits[2]),
+        [parser.compile_filter(bit) for bit in bits[3:]],
+    )
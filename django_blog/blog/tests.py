@@ -1,3 +1,780 @@
-from django.test import TestCase
+import tempfile
+from collections import Counter
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Max
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from django_blog.objectcache import ObjectCache, request_memo
+from django_blog.sitemaps import generate
+
+from . import authorstats, keyset, popularity, related, sanitizer
+from .models import AuthorStats, Comment, Post, RelatedPost, post_cache
+from .sitemaps import SECTIONS
+
+
+def fresh_stats(user):
+    """What AuthorStats should hold for `user`, aggregated from scratch."""
+    posts = Post.published.filter(author=user)
+    comments = Comment.objects.filter(post__in=posts, is_active=True)
+    latest = [
+        posts.aggregate(latest=Max('published_date'))['latest'],
+        comments.aggregate(latest=Max('created_at'))['latest'],
+    ]
+    tags = Counter((tag.name, tag.slug) for post in posts for tag in post.tags.all())
+    top_tags = sorted(tags.items(), key=lambda item: (-item[1], item[0][0]))
+    return (
+        posts.count(),
+        comments.count(),
+        max(filter(None, latest), default=None),
+        [
+            {'name': name, 'slug': slug, 'count': count}
+            for (name, slug), count in top_tags[:authorstats.TOP_TAGS]
+        ],
+    )
+
+
+def stored_stats(user):
+    stats = AuthorStats.objects.get(user=user)
+    return (stats.post_count, stats.comment_count, stats.last_activity, stats.top_tags)
+
+
+class DraftVisibilityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('ann', password='secret')
+        cls.published = Post.objects.create(
+            title='Published post', content='Out in the open.', author=cls.author,
+            status=Post.PUBLISHED,
+        )
+        cls.draft = Post.objects.create(
+            title='Draft post', content='Not yet.', author=cls.author,
+        )
+        cls.published.tags.add('django')
+        cls.draft.tags.add('django')
+
+    def setUp(self):
+        # Feeds and the object cache keep their entries in the cache.
+        cache.clear()
+
+    def test_new_posts_are_drafts(self):
+        self.assertEqual(self.draft.status, Post.DRAFT)
+
+    def test_list_excludes_drafts(self):
+        response = self.client.get(reverse('post-list'))
+        self.assertEqual(list(response.context['posts']), [self.published])
+
+    def test_draft_detail_is_not_found(self):
+        response = self.client.get(reverse('post-detail', args=[self.draft.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_draft_detail_is_shown_to_its_author(self):
+        self.client.force_login(self.author)
+        response = self.client.get(reverse('post-detail', args=[self.draft.pk]))
+        self.assertContains(response, 'Draft post')
+
+    # The view counter flushes at exit, after the test database is gone.
+    @mock.patch('blog.views.record_view')
+    def test_published_detail_is_shown(self, record_view):
+        response = self.client.get(reverse('post-detail', args=[self.published.pk]))
+        self.assertContains(response, 'Published post')
+        record_view.assert_called_once_with(self.published.pk)
+
+    def test_feeds_exclude_drafts(self):
+        for url in (
+            reverse('site_feed', args=['rss']),
+            reverse('author_feed', args=['ann', 'atom']),
+            reverse('tag_feed', args=['django', 'json']),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertContains(response, 'Published post')
+                self.assertNotContains(response, 'Draft post')
+
+    def test_sitemap_excludes_drafts(self):
+        with tempfile.TemporaryDirectory() as root:
+            generate(SECTIONS, 'http://testserver', root)
+            with open(f'{root}/posts-0.xml') as file:
+                urls = file.read()
+        self.assertIn(f'http://testserver{self.published.get_absolute_url()}<', urls)
+        self.assertNotIn(f'http://testserver{self.draft.get_absolute_url()}<', urls)
+
+
+class RelatedPostsTests(TestCase):
+    """refresh_posts() must leave the table as rebuild() would."""
+
+    # Tag sets of posts whose words are all their own, so only tags relate them.
+    TAGS = [
+        ['a', 'b', 'c'],
+        ['a', 'b', 'c'],
+        ['a', 'b'],
+        ['a', 'c'],
+        ['a'],
+        ['b', 'c'],
+        ['c', 'd'],
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('ann')
+        cls.posts = []
+        for number, tags in enumerate(cls.TAGS):
+            post = Post.objects.create(
+                title=f'Post {number}', content=f'word{number}x', author=author, status=Post.PUBLISHED
+            )
+            post.tags.set(tags)
+            cls.posts.append(post)
+
+    def setUp(self):
+        patcher = mock.patch.object(related, 'TOP_N', 3)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        related._corpus = None
+        related.rebuild('python')
+        # Load the corpus before the change, as the background thread has.
+        related.get_corpus()
+
+    def tearDown(self):
+        related._corpus = None
+
+    def table(self):
+        return [
+            (post, other, rank, round(score, 9))
+            for post, other, rank, score in RelatedPost.objects.values_list(
+                'post', 'related', 'rank', 'score'
+            )
+        ]
+
+    def assertMatchesRebuild(self, post_ids):
+        related.refresh_posts(post_ids)
+        refreshed = self.table()
+        related.rebuild('python')
+        self.assertEqual(refreshed, self.table())
+
+    def test_retagged_neighbor(self):
+        # The top neighbor of several lists drops out of all of them.
+        self.posts[0].tags.set(['other'])
+        self.assertMatchesRebuild([self.posts[0].pk])
+
+    def test_neighbor_scoring_lower(self):
+        self.posts[1].tags.set(['a'])
+        self.assertMatchesRebuild([self.posts[1].pk])
+
+    def test_neighbor_scoring_higher(self):
+        self.posts[6].tags.set(['a', 'b', 'c'])
+        self.assertMatchesRebuild([self.posts[6].pk])
+
+    def test_unpublished_neighbor(self):
+        post = self.posts[0]
+        post.status = Post.DRAFT
+        post.save()
+        self.assertMatchesRebuild([post.pk])
+
+    def test_deleted_neighbor(self):
+        post, pk = self.posts[1], self.posts[1].pk
+        listed_by = list(RelatedPost.objects.filter(related=post).values_list('post_id', flat=True))
+        post.delete()
+        self.assertMatchesRebuild([pk, *listed_by])
+
+    def test_new_post(self):
+        post = Post.objects.create(
+            title='Post new', content='wordnew', author=self.posts[0].author, status=Post.PUBLISHED
+        )
+        post.tags.set(['a', 'b', 'c'])
+        self.assertMatchesRebuild([post.pk])
+
+
+class ObjectCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.post = Post.objects.create(
+            title='Cached post', content='Body.', author=User.objects.create_user('ann'),
+            status=Post.PUBLISHED,
+        )
+
+    def setUp(self):
+        cache.clear()
+        post_cache.lru.clear()
+
+    def forget(self):
+        # Empty the LRU and the shared cache, leaving only the request memo.
+        cache.clear()
+        post_cache.lru.clear()
+
+    def in_request(self):
+        token = request_memo.set({})
+        self.addCleanup(request_memo.reset, token)
+
+    def test_memo_fetches_each_row_once_per_request(self):
+        self.in_request()
+        with self.assertNumQueries(1):
+            first = post_cache.get(pk=self.post.pk)
+        self.forget()
+        with self.assertNumQueries(0):
+            second = post_cache.get(pk=str(self.post.pk))
+        self.assertEqual(second.title, 'Cached post')
+        # Callers get their own copies.
+        self.assertIsNot(first, second)
+
+    def test_memo_is_per_request(self):
+        post_cache.get(pk=self.post.pk)
+        self.forget()
+        with self.assertNumQueries(1):
+            post_cache.get(pk=self.post.pk)
+
+    def test_save_replaces_the_stamp(self):
+        # A second cache of the same model stands in for another process.
+        other = ObjectCache(Post, slug_field='slug')
+        self.assertEqual(other.get(pk=self.post.pk).title, 'Cached post')
+        stamp = cache.get(post_cache.version_key(self.post.pk))
+
+        post = Post.objects.get(pk=self.post.pk)
+        post.title = 'Renamed post'
+        post.save()
+
+        self.assertNotEqual(cache.get(post_cache.version_key(self.post.pk)), stamp)
+        self.assertEqual(other.get(pk=self.post.pk).title, 'Renamed post')
+
+    def test_invalidate_clears_the_request_memo(self):
+        self.in_request()
+        post_cache.get(slug=self.post.slug)
+        Post.objects.filter(pk=self.post.pk).update(title='Renamed post')
+        post_cache.invalidate_pks([self.post.pk])
+        self.assertEqual(post_cache.get(slug=self.post.slug).title, 'Renamed post')
+
+    def test_delete_replaces_the_stamp(self):
+        other = ObjectCache(Post, slug_field='slug')
+        other.get(pk=self.post.pk)
+        other.get(slug=self.post.slug)
+        pk, stamp = self.post.pk, cache.get(post_cache.version_key(self.post.pk))
+
+        Post.objects.get(pk=pk).delete()
+
+        self.assertNotEqual(cache.get(post_cache.version_key(pk)), stamp)
+        with self.assertRaises(Post.DoesNotExist):
+            other.get(pk=pk)
+        with self.assertRaises(Post.DoesNotExist):
+            other.get(slug=self.post.slug)
+
+
+class FeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('ann')
+        cls.post = Post.objects.create(
+            title='Feed post', content='Body.', author=cls.author, status=Post.PUBLISHED,
+        )
+        cls.post.tags.add('django')
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, url=None, **headers):
+        return self.client.get(url or reverse('site_feed', args=['rss']), **headers)
+
+    def test_warm_feed_skips_the_database(self):
+        self.get()
+        with self.assertNumQueries(0):
+            response = self.get()
+        self.assertContains(response, 'Feed post')
+
+    def test_last_modified_is_the_newest_item(self):
+        self.post.refresh_from_db()
+        newest = max(self.post.updated_at, self.post.published_date)
+        self.assertEqual(self.get()['Last-Modified'], http_date(newest.timestamp()))
+
+    def test_if_none_match(self):
+        etag = self.get()['ETag']
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_if_modified_since(self):
+        last_modified = self.get()['Last-Modified']
+        self.assertEqual(self.get(HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+    def test_rebuild_without_changed_items_keeps_validators(self):
+        first = self.get()
+        # A draft bumps the site scope but does not appear in the feed.
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(title='Draft', content='Not yet.', author=self.author)
+        response = self.get(HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['Last-Modified'], first['Last-Modified'])
+
+    def test_edit_rebuilds_the_feed(self):
+        etag = self.get()['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.title = 'Edited post'
+            self.post.save()
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Edited post')
+
+    def test_tag_change_rebuilds_tag_feeds(self):
+        old = reverse('tag_feed', args=['django', 'json'])
+        new = reverse('tag_feed', args=['orm', 'json'])
+        self.assertContains(self.get(old), 'Feed post')
+        self.assertNotContains(self.get(new), 'Feed post')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.tags.set(['orm'])
+        self.assertNotContains(self.get(old), 'Feed post')
+        self.assertContains(self.get(new), 'Feed post')
+
+
+class PopularityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('ann')
+        cls.posts = [
+            Post.objects.create(
+                title=f'Post {n}', content='Body.', author=author, status=Post.PUBLISHED
+            )
+            for n in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def counters(self):
+        return list(Post.objects.order_by('pk').values_list('view_count', 'recent_views'))
+
+    def test_add_views_is_one_update(self):
+        first, second, third = self.posts
+        # The UPDATE, then the read of the new totals.
+        with self.assertNumQueries(2):
+            popularity.add_views({first.pk: 3, second.pk: 5})
+        popularity.add_views({second.pk: 1})
+        self.assertEqual(self.counters(), [(3, 3), (6, 6), (0, 0)])
+        self.assertEqual(popularity.get_view_count(second.pk), 6)
+
+    def test_add_views_keeps_cached_posts(self):
+        post = self.posts[0]
+        post_cache.get(pk=post.pk)
+        stamp = cache.get(post_cache.version_key(post.pk))
+        popularity.add_views({post.pk: 2})
+        self.assertEqual(cache.get(post_cache.version_key(post.pk)), stamp)
+        with self.assertNumQueries(0):
+            self.assertEqual(popularity.get_view_count(post.pk), 2)
+
+    def test_get_view_count_before_any_flush(self):
+        Post.objects.filter(pk=self.posts[0].pk).update(view_count=7)
+        self.assertEqual(popularity.get_view_count(self.posts[0].pk), 7)
+
+    @override_settings(BLOG_TRENDING_HALF_LIFE=60)
+    def test_update_trending_decays_by_half_lives(self):
+        first, second, third = self.posts
+        now = timezone.now()
+        Post.objects.update(trending_updated_at=now - timezone.timedelta(seconds=120))
+        Post.objects.filter(pk=first.pk).update(trending_score=8, recent_views=4)
+        Post.objects.filter(pk=second.pk).update(trending_score=0, recent_views=3)
+
+        self.assertEqual(popularity.update_trending(now), 3)
+
+        # Two half-lives: 8 * 0.25 + 4.
+        scores = Post.objects.order_by('pk').values_list('trending_score', 'recent_views')
+        self.assertEqual(list(scores), [(6.0, 0), (3.0, 0), (0.0, 0)])
+        self.assertFalse(Post.objects.exclude(trending_updated_at=now).exists())
+
+    def test_first_update_trending_does_not_decay(self):
+        Post.objects.filter(pk=self.posts[0].pk).update(trending_score=2, recent_views=1)
+        popularity.update_trending()
+        self.assertEqual(Post.objects.get(pk=self.posts[0].pk).trending_score, 3.0)
+
+
+class ModerationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('ann')
+        cls.staff = User.objects.create_user('mod', is_staff=True)
+        reader = User.objects.create_user('bob')
+        cls.posts = [
+            Post.objects.create(
+                title=f'Post {n}', content='Body.', author=cls.author, status=Post.PUBLISHED
+            )
+            for n in range(2)
+        ]
+        cls.comments = [
+            Comment.objects.create(post=post, author=reader, content='Hi.', is_active=active)
+            for post, active in [
+                (cls.posts[0], True), (cls.posts[0], True), (cls.posts[0], False),
+                (cls.posts[1], True), (cls.posts[1], False),
+            ]
+        ]
+        authorstats.refresh_authors()
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.staff)
+
+    def moderate(self, action, comments, **data):
+        return self.client.post(reverse('comment_moderate'), {
+            'action': action, 'comment_ids': [comment.pk for comment in comments], **data,
+        })
+
+    def assertCountsConsistent(self):
+        for post in Post.objects.all():
+            with self.subTest(post=post.title):
+                self.assertEqual(
+                    post.comment_count, post.comments.filter(is_active=True).count()
+                )
+                self.assertEqual(post_cache.get(pk=post.pk).comment_count, post.comment_count)
+        self.assertEqual(stored_stats(self.author), fresh_stats(self.author))
+
+    def test_counts_start_consistent(self):
+        self.assertCountsConsistent()
+
+    def test_approve(self):
+        # Warm the object cache, which the action must invalidate.
+        post_cache.get(pk=self.posts[0].pk)
+        self.moderate('approve', [self.comments[2], self.comments[4]])
+        self.assertCountsConsistent()
+        self.assertEqual(Post.objects.get(pk=self.posts[0].pk).comment_count, 3)
+
+    def test_hide(self):
+        post_cache.get(pk=self.posts[1].pk)
+        self.moderate('hide', [self.comments[0], self.comments[3]])
+        self.assertCountsConsistent()
+        self.assertEqual(Post.objects.get(pk=self.posts[1].pk).comment_count, 0)
+
+    def test_delete(self):
+        self.moderate('delete', [self.comments[1], self.comments[2], self.comments[3]])
+        self.assertCountsConsistent()
+        self.assertEqual(Comment.objects.count(), 2)
+
+    def test_requires_staff(self):
+        self.client.force_login(self.author)
+        self.assertEqual(self.moderate('hide', self.comments).status_code, 403)
+        self.assertEqual(Comment.objects.filter(is_active=True).count(), 3)
+
+    def test_follows_same_host_next_url(self):
+        for next_url in ('/moderation/comments/?page=2', 'http://testserver/posts/'):
+            with self.subTest(next_url=next_url):
+                response = self.moderate('approve', self.comments[:1], next=next_url)
+                self.assertRedirects(response, next_url, fetch_redirect_response=False)
+
+    def test_ignores_other_host_next_url(self):
+        for next_url in ('https://evil.example/', '//evil.example/', 'javascript:alert(1)', ''):
+            with self.subTest(next_url=next_url):
+                response = self.moderate('approve', self.comments[:1], next=next_url)
+                self.assertRedirects(
+                    response, reverse('comment_moderation'), fetch_redirect_response=False
+                )
+
+
+class AuthorStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('ann')
+        cls.reader = User.objects.create_user('bob')
+        cls.post = Post.objects.create(
+            title='First post', content='Body.', author=cls.author, status=Post.PUBLISHED
+        )
+        cls.post.tags.add('django', 'python')
+        Comment.objects.create(post=cls.post, author=cls.reader, content='Hi.')
+        authorstats.refresh_authors()
+
+    def assertFresh(self):
+        self.assertEqual(stored_stats(self.author), fresh_stats(self.author))
+
+    def test_create(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = Post.objects.create(
+                title='Second post', content='Body.', author=self.author, status=Post.PUBLISHED
+            )
+            post.tags.add('django')
+        self.assertFresh()
+        self.assertEqual(stored_stats(self.author)[0], 2)
+
+    def test_create_draft(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(title='Draft', content='Body.', author=self.author)
+        self.assertFresh()
+        self.assertEqual(stored_stats(self.author)[0], 1)
+
+    def test_publish(self):
+        draft = Post.objects.create(title='Draft', content='Body.', author=self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            draft.publish()
+        self.assertFresh()
+        self.assertEqual(stored_stats(self.author)[0], 2)
+
+    def test_unpublish(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.status = Post.DRAFT
+            self.post.save()
+        self.assertFresh()
+        self.assertEqual(stored_stats(self.author)[:3], (0, 0, None))
+
+    def test_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.get(pk=self.post.pk).delete()
+        self.assertFresh()
+
+    def test_comments(self):
+        older = Comment.objects.create(post=self.post, author=self.reader, content='Again.')
+        newer = Comment.objects.create(post=self.post, author=self.reader, content='More.')
+        self.assertFresh()
+        for comment in (older, newer):
+            with self.captureOnCommitCallbacks(execute=True):
+                comment.delete()
+            self.assertFresh()
+
+    def test_get_stats_creates_missing_row(self):
+        AuthorStats.objects.all().delete()
+        self.assertEqual(authorstats.get_stats(self.author).post_count, 1)
+        self.assertFresh()
+
+
+class KeysetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('ann')
+        cls.posts = [
+            Post.objects.create(
+                title=f'Post {n}', content='Body.', author=cls.author, status=Post.PUBLISHED
+            )
+            for n in range(7)
+        ]
+        # Three posts share a timestamp, so only the pk orders them.
+        now = timezone.now()
+        for n, post in enumerate(cls.posts):
+            post.published_date = now - timezone.timedelta(hours=min(n, 3))
+            Post.objects.filter(pk=post.pk).update(published_date=post.published_date)
+        cls.draft = Post.objects.create(title='Draft', content='Body.', author=cls.author)
+
+    def walk(self, queryset, per_page):
+        pages, cursor = [], None
+        while True:
+            posts, cursor = keyset.keyset_page(queryset, cursor, per_page)
+            pages.append([post.pk for post in posts])
+            if cursor is None:
+                return pages
+
+    def test_cursor_round_trip(self):
+        post = self.posts[1]
+        self.assertEqual(
+            keyset.decode_cursor(keyset.encode_cursor(post)), (post.published_date, post.pk)
+        )
+
+    def test_pages_cover_every_post_once(self):
+        newest_first = sorted(
+            self.posts, key=lambda post: (post.published_date, post.pk), reverse=True
+        )
+        expected = [post.pk for post in newest_first]
+        for per_page in (1, 2, 3, 7, 10):
+            with self.subTest(per_page=per_page):
+                pages = self.walk(Post.published.all(), per_page)
+                self.assertEqual([pk for page in pages for pk in page], expected)
+                self.assertTrue(all(len(page) == per_page for page in pages[:-1]))
+
+    def test_ties_are_broken_by_pk(self):
+        tied = [post.pk for post in self.posts[3:]]
+        # A cursor at the second tied post leaves only the first, lower pk.
+        cursor = keyset.encode_cursor(Post.objects.get(pk=tied[1]))
+        posts, _ = keyset.keyset_page(Post.published.all(), cursor, 10)
+        self.assertEqual([post.pk for post in posts], [tied[0]])
+
+    def test_tampered_cursor_is_ignored(self):
+        first_page = list(Post.published.order_by('-published_date', '-pk')[:2])
+        for cursor in (None, '', 'garbage', '2024-01-01T00:00:00,abc', 'not-a-date,5', ',5'):
+            with self.subTest(cursor=cursor):
+                self.assertIsNone(keyset.decode_cursor(cursor))
+                posts, _ = keyset.keyset_page(Post.published.all(), cursor, 2)
+                self.assertEqual(posts, first_page)
+
+    def test_cursor_does_not_reveal_drafts(self):
+        cursor = keyset.encode_cursor(Post.objects.get(pk=self.draft.pk))
+        response = self.client.get(
+            reverse('profile_view', args=['ann']), {'after': cursor}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(self.draft, response.context['user_posts'])
+
+
+class MediaTests(TestCase):
+    DATA = bytes(range(100))
+
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        with open(f'{root.name}/clip.bin', 'wb') as file:
+            file.write(self.DATA)
+        override = override_settings(MEDIA_ROOT=root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def get(self, path='clip.bin', **headers):
+        response = self.client.get(reverse('media', args=[path]), **headers)
+        self.addCleanup(response.close)
+        return response
+
+    def assertServed(self, response, status, data):
+        self.assertEqual(response.status_code, status)
+        self.assertEqual(b''.join(response.streaming_content), data)
+        self.assertEqual(response['Content-Length'], str(len(data)))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+    def test_whole_file(self):
+        response = self.get()
+        self.assertServed(response, 200, self.DATA)
+        self.assertNotIn('Content-Range', response)
+
+    def test_range(self):
+        response = self.get(HTTP_RANGE='bytes=10-19')
+        self.assertServed(response, 206, self.DATA[10:20])
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/100')
+
+    def test_range_past_the_end_is_truncated(self):
+        response = self.get(HTTP_RANGE='bytes=90-200')
+        self.assertServed(response, 206, self.DATA[90:])
+        self.assertEqual(response['Content-Range'], 'bytes 90-99/100')
+
+    def test_open_ended_range(self):
+        response = self.get(HTTP_RANGE='bytes=95-')
+        self.assertServed(response, 206, self.DATA[95:])
+        self.assertEqual(response['Content-Range'], 'bytes 95-99/100')
+
+    def test_suffix_range(self):
+        response = self.get(HTTP_RANGE='bytes=-5')
+        self.assertServed(response, 206, self.DATA[-5:])
+        self.assertEqual(response['Content-Range'], 'bytes 95-99/100')
+
+    def test_suffix_longer_than_the_file(self):
+        response = self.get(HTTP_RANGE='bytes=-500')
+        self.assertServed(response, 206, self.DATA)
+        self.assertEqual(response['Content-Range'], 'bytes 0-99/100')
+
+    def test_unsatisfiable_ranges(self):
+        for header in ('bytes=100-', 'bytes=150-160', 'bytes=20-10', 'bytes=-0'):
+            with self.subTest(header=header):
+                response = self.get(HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response['Content-Range'], 'bytes */100')
+
+    def test_multiple_or_malformed_ranges_serve_the_whole_file(self):
+        for header in ('bytes=0-1,5-6', 'bytes=-', 'items=0-5', 'bytes=a-b'):
+            with self.subTest(header=header):
+                self.assertServed(self.get(HTTP_RANGE=header), 200, self.DATA)
+
+    def test_if_range(self):
+        etag = self.get()['ETag']
+        self.assertEqual(self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag).status_code, 206)
+        self.assertServed(
+            self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"'), 200, self.DATA
+        )
+
+    def test_conditional_get(self):
+        first = self.get()
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+        response = self.get(HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_missing_file(self):
+        for path in ('missing.bin', '.'):
+            with self.subTest(path=path):
+                self.assertEqual(self.get(path).status_code, 404)
+
+    def test_path_outside_media_root(self):
+        # safe_join() raises SuspiciousFileOperation, answered with a 400.
+        self.assertEqual(self.get('../settings.py').status_code, 400)
+
+
+class AsyncCommentTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user('bob')
+        cls.post = Post.objects.create(
+            title='Async post', content='Body.', author=cls.reader, status=Post.PUBLISHED
+        )
+        cls.draft = Post.objects.create(title='Async draft', content='Body.', author=cls.reader)
+
+    def url(self, post=None):
+        return reverse('comment_ajax_create_async', args=[(post or self.post).slug])
+
+    async def test_create(self):
+        await self.async_client.aforce_login(self.reader)
+        response = await self.async_client.post(
+            self.url(), {'content': 'Nice <b>post</b><script>x()</script>'}
+        )
+        data = response.json()
+        self.assertTrue(data['success'])
+        self.assertEqual(data['author'], 'bob')
+        comment = await Comment.objects.aget(pk=data['comment_id'])
+        self.assertEqual(comment.content, 'Nice <b>post</b>x()')
+        self.assertEqual(comment.post_id, self.post.pk)
+
+    async def test_validation_errors(self):
+        await self.async_client.aforce_login(self.reader)
+        for content in ('', '   ', 'abc'):
+            with self.subTest(content=content):
+                response = await self.async_client.post(self.url(), {'content': content})
+                data = response.json()
+                self.assertFalse(data['success'])
+                self.assertIn('content', data['errors'])
+        self.assertFalse(await Comment.objects.aexists())
+
+    async def test_requires_login(self):
+        response = await self.async_client.post(self.url(), {'content': 'Hello there'})
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response['Location'].startswith(reverse('login')))
+        self.assertFalse(await Comment.objects.aexists())
+
+    async def test_only_post(self):
+        await self.async_client.aforce_login(self.reader)
+        response = await self.async_client.get(self.url())
+        self.assertFalse(response.json()['success'])
+
+    async def test_unpublished_post_is_not_found(self):
+        await self.async_client.aforce_login(self.reader)
+        response = await self.async_client.post(self.url(self.draft), {'content': 'Hello there'})
+        self.assertEqual(response.status_code, 404)
+
+
+class SanitizerTests(TestCase):
+    """sanitize() and sanitize_many() must match bleach.clean() exactly."""
+
+    SAMPLES = [
+        'Plain text, nothing to do.',
+        'Tabs\tand\nnewlines\r\nstay.',
+        'Unicode: caf\u00e9 \u2028 \ufeff \U0001f600',
+        'Fish & chips, 1 < 2 > 0',
+        'Entities: &amp; &lt; &copy; &#169; &#xa9; &bogus; &',
+        '<b>bold</b> <i>it</i> <u>u</u> <em>em</em> <strong>s</strong>',
+        '<p>One</p><p>Two<br>lines<br/></p>',
+        '<b class="x" onclick="evil()">attrs</b>',
+        '<script>alert(1)</script> and <style>p {}</style>',
+        '<a href="javascript:alert(1)">link</a>',
+        '<img src=x onerror=alert(1)>',
+        '<b><i>nested</b></i> <p>unclosed',
+        '<!-- comment --> <![CDATA[data]]> <!DOCTYPE html>',
+        '< b>not a tag</ b> <3 a<b',
+        '<svg><script>alert(1)</script></svg>',
+        '\x00null \x07bell \x1bescape \x7fdel \x85nel',
+    ]
+
+    def bleach_clean(self, text):
+        import bleach
+
+        return bleach.clean(text, tags=list(sanitizer.ALLOWED_TAGS), strip=True)
+
+    def test_samples(self):
+        for text in self.SAMPLES:
+            with self.subTest(text=text):
+                self.assertEqual(sanitizer.sanitize(text), self.bleach_clean(text))
+
+    def test_single_characters(self):
+        # The fast path must skip exactly the characters bleach leaves alone.
+        for code in [*range(0x100), 0x2028, 0x2029, 0xfeff, 0xfffd]:
+            text = f'a{chr(code)}b'
+            with self.subTest(code=hex(code)):
+                self.assertEqual(sanitizer.sanitize(text), self.bleach_clean(text))
+
+    def test_sanitize_many(self):
+        texts = [*self.SAMPLES, *self.SAMPLES[:3]]
+        self.assertEqual(
+            sanitizer.sanitize_many(texts), [self.bleach_clean(text) for text in texts]
+        )
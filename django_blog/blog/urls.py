@@ -1,6 +1,6 @@
 from django.urls import path
 from django.contrib.auth import views as auth_views
-from . import views
+from . import feeds, views
 
 
 # Home and Authentication URLs
@@ -27,7 +27,7 @@ urlpatterns = [
 
 
     # Comment-related URLs
-    path('post/<int:pk>/comments/new/', views.CommentCreateView.as_view(), name='comment_create'),
+    path('post/<slug:slug>/comments/new/', views.CommentCreateView.as_view(), name='comment_create'),
     path('comment/<int:pk>/update/', views.CommentUpdateView.as_view(), name='comment_update'),
     path('comment/<int:pk>/delete/', views.CommentDeleteView.as_view(), name='comment_delete'),
 
@@ -35,12 +35,24 @@ urlpatterns = [
     path('post/<slug:slug>/comment/ajax/', 
          views.comment_ajax_create, 
          name='comment_ajax_create'),
+    path('post/<slug:slug>/comment/ajax/async/',
+         views.comment_ajax_create_async,
+         name='comment_ajax_create_async'),
     
+    # Comment moderation queue (staff only)
+    path('moderation/comments/', views.CommentModerationView.as_view(), name='comment_moderation'),
+    path('moderation/comments/bulk/', views.comment_moderate, name='comment_moderate'),
+
     # User comments page
     path('user/<str:username>/comments/', 
          views.user_comments, 
          name='user_comments'),
 
+    # Syndication feeds; <fmt> is rss, atom or json
+    path('feeds/<str:fmt>/', feeds.site_feed, name='site_feed'),
+    path('feeds/author/<str:username>/<str:fmt>/', feeds.author_feed, name='author_feed'),
+    path('feeds/tag/<slug:tag_slug>/<str:fmt>/', feeds.tag_feed, name='tag_feed'),
+
     # Search and Tag URLs
     path('search/', views.search_posts, name='search_posts'),
     path('tags/<slug:tag_slug>/', views.posts_by_tag, name='posts_by_tag'),
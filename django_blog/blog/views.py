@@ -1,17 +1,29 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib import messages
 from django.contrib.auth.models import User
+from django.views.decorators.http import require_POST
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy, reverse 
+from django.utils.http import url_has_allowed_host_and_scheme
 from .forms import CustomUserCreationForm, UserUpdateForm, ProfileUpdateForm, PostForm
-from .models import Post, Comment, Profile
-from django.http import HttpResponseRedirect, JsonResponse
+from .models import Post, Comment, Profile, RelatedPost, post_cache
+from django.http import Http404, HttpResponseRedirect, JsonResponse
+from django.template.loader import render_to_string
+from django.core.exceptions import PermissionDenied
 from django.core.paginator import Paginator
 from django.db.models import Q
 from .forms import CommentForm, CommentEditForm, CommentDeleteForm
+from .authorstats import get_stats
+from .keyset import keyset_page
+from .moderation import ACTIONS
+from .popularity import get_view_count, record_view
+from django_blog.objectcache import get_cached_or_404
 from taggit.models import Tag
 
 
@@ -24,7 +36,7 @@ class PostByTagListView(ListView):
 
     def get_queryset(self):
         tag_slug = self.kwargs.get('tag_slug')
-        return Post.objects.filter(tags__slug=tag_slug)
+        return Post.published.filter(tags__slug=tag_slug)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -34,8 +46,14 @@ class PostByTagListView(ListView):
     
 # authentication views
 def home(request):
-    posts = Post.objects.all()[:5]  # Get latest 5 posts
-    return render(request, 'blog/home.html', {'posts': posts})
+    trending = request.GET.get('sort') == 'trending'
+    if trending:
+        # Read straight from the indexed trending_score column.
+        posts = Post.published.order_by('-trending_score', '-published_date')
+    else:
+        posts = Post.published.all()  # Get latest 5 posts
+    posts = posts.select_related('author')[:5]
+    return render(request, 'blog/home.html', {'posts': posts, 'trending': trending})
 
 def register(request):
     if request.method == 'POST':
@@ -49,6 +67,9 @@ def register(request):
         form = CustomUserCreationForm()
     return render(request, 'blog/register.html', {'form': form})
 
+PROFILE_POSTS_PER_PAGE = 10
+
+
 @login_required
 def profile(request):
     if request.method == 'POST':
@@ -64,21 +85,35 @@ def profile(request):
         u_form = UserUpdateForm(instance=request.user)
         p_form = ProfileUpdateForm(instance=request.user.profile)
     
+    user_posts, next_cursor = keyset_page(
+        Post.objects.filter(author=request.user), request.GET.get('after'), PROFILE_POSTS_PER_PAGE
+    )
     context = {
         'u_form': u_form,
         'p_form': p_form,
-        'user_posts': Post.objects.filter(author=request.user)
+        'stats': get_stats(request.user),
+        'user_posts': user_posts,
+        'next_cursor': next_cursor,
     }
     return render(request, 'blog/profile.html', context)
 
 def profile_view(request, username):
     """View for displaying a user's public profile"""
-    user = get_object_or_404(User, username=username)
-    user_posts = Post.objects.filter(author=user)
+    # Profile and precomputed stats come with the user row in one query.
+    user = get_object_or_404(
+        User.objects.select_related('profile', 'author_stats'), username=username
+    )
+    # Visitors see published posts; authors also see their drafts.
+    user_posts = Post.objects if request.user == user else Post.published
+    user_posts, next_cursor = keyset_page(
+        user_posts.filter(author=user), request.GET.get('after'), PROFILE_POSTS_PER_PAGE
+    )
     
     context = {
         'profile_user': user,
+        'stats': get_stats(user),
         'user_posts': user_posts,
+        'next_cursor': next_cursor,
         'is_own_profile': request.user == user if request.user.is_authenticated else False
     }
     return render(request, 'blog/profile_view.html', context)
@@ -97,18 +132,70 @@ class PostListView(ListView): # List all blog posts
     context_object_name = 'posts'
     ordering = ['-published_date']
     paginate_by = 5
+
+    def get_queryset(self):
+        # Served by the partial index on published posts.
+        return Post.published.order_by(*self.ordering)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['title'] = 'All Blog Posts'
         return context
 
-class PostDetailView(DetailView): # View a single blog post
+
+RELATED_POSTS_SHOWN = 5
+
+
+def get_published_post_or_404(**lookup):
+    """A published post by pk or slug, read through the object cache"""
+    post = get_cached_or_404(post_cache, **lookup)
+    if post.status != Post.PUBLISHED:
+        raise Http404('No Post matches the given query.')
+    return post
+
+
+class CachedPostMixin:
+    """
+    get_object() through the object cache. test_func() and the view's own
+    get_object() call share one fetch through the per-request memo.
+    """
+
+    def get_object(self, queryset=None):
+        return get_cached_or_404(post_cache, pk=self.kwargs['pk'])
+
+
+class PostDetailView(CachedPostMixin, DetailView): # View a single blog post
     # This view displays the details of a single blog post.
     model = Post
     template_name = 'blog/post_detail.html'
     context_object_name = 'post'
 
+    def get_object(self, queryset=None):
+        post = super().get_object(queryset)
+        if post.status == Post.PUBLISHED:
+            # Buffered in memory; written in batches by blog.popularity.
+            record_view(post.pk)
+        elif post.author_id != self.request.user.pk:
+            # Drafts and scheduled posts are visible to their author only.
+            raise Http404('No Post matches the given query.')
+        return post
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Hidden comments wait in the moderation queue.
+        context['comments'] = self.object.comments.filter(is_active=True).select_related('author')
+        # Kept apart from the cached post, which view flushes do not invalidate.
+        context['view_count'] = get_view_count(self.object.pk)
+        # Precomputed by blog.related; one query on the (post, rank) index.
+        # The status check covers a post unpublished since its last refresh.
+        context['related_posts'] = [
+            link.related
+            for link in RelatedPost.objects.filter(post=self.object, related__status=Post.PUBLISHED)
+            .select_related('related')
+            .only('related__title', 'related__published_date')[:RELATED_POSTS_SHOWN]
+        ]
+        return context
+
 class PostCreateView(LoginRequiredMixin, CreateView): # Create a new blog post
     model = Post
     form_class = PostForm
@@ -125,7 +212,7 @@ class PostCreateView(LoginRequiredMixin, CreateView): # Create a new blog post
         context['button_text'] = 'Create Post'
         return context
 
-class PostUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView): # Update an existing blog post
+class PostUpdateView(LoginRequiredMixin, UserPassesTestMixin, CachedPostMixin, UpdateView): # Update an existing blog post
     # This view allows the author to edit their blog post.
     # It checks if the user is the author before allowing updates.
     # If the user is not the author, they will be redirected to a 403 Forbidden page.
@@ -139,7 +226,7 @@ class PostUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView): # Upd
     
     def test_func(self):
         post = self.get_object()
-        return self.request.user == post.author
+        return post.author_id == self.request.user.pk
     
 
     def get_context_data(self, **kwargs):
@@ -148,7 +235,7 @@ class PostUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView): # Upd
         context['button_text'] = 'Update Post'
         return context
 
-class PostDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView): # Delete a blog post
+class PostDeleteView(LoginRequiredMixin, UserPassesTestMixin, CachedPostMixin, DeleteView): # Delete a blog post
     # This view allows the author to delete their blog post.
     # It checks if the user is the author before allowing deletion.
     # If the user is not the author, they will be redirected to a 403 Forbidden page.
@@ -160,7 +247,7 @@ class PostDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView): # Del
     
     def test_func(self):
         post = self.get_object()
-        return self.request.user == post.author
+        return post.author_id == self.request.user.pk
     
     def delete(self, request, *args, **kwargs):
         messages.success(request, 'Your post has been deleted successfully!')
@@ -173,7 +260,7 @@ class PostDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView): # Del
 # It allows users to view comments, post new comments, and paginate through existing comments.
 def post_detail_with_comments(request, slug):
     """Enhanced post detail view with comments"""
-    post = get_object_or_404(Post, slug=slug, status='published')
+    post = get_published_post_or_404(slug=slug)
     
     # Get all active comments for this post
     comments = Comment.objects.filter(
@@ -206,7 +293,7 @@ def post_detail_with_comments(request, slug):
         'post': post,
         'comments': page_obj,
         'comment_form': comment_form,
-        'total_comments': comments.count(),
+        'total_comments': post.comment_count,
     }
     
     return render(request, 'blog/post_detail.html', context)
@@ -220,7 +307,7 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
     
     def form_valid(self, form):
         # Get the post from URL
-        post = get_object_or_404(Post, slug=self.kwargs['slug'])
+        post = get_published_post_or_404(slug=self.kwargs['slug'])
         form.instance.post = post
         form.instance.author = self.request.user
         
@@ -233,7 +320,7 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['post'] = get_object_or_404(Post, slug=self.kwargs['slug'])
+        context['post'] = get_published_post_or_404(slug=self.kwargs['slug'])
         return context
 
 
@@ -281,11 +368,24 @@ class CommentDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
         return self.object.post.get_absolute_url()
 
 
+def comment_payload(comment):
+    """JSON body returned by both AJAX comment endpoints"""
+    return {
+        'success': True,
+        'comment_id': comment.id,
+        'author': comment.author.username,
+        'content': comment.content,
+        'created_at': comment.created_at.strftime('%B %d, %Y at %I:%M %p'),
+        'html': render_to_string('blog/comment_item.html', {'comment': comment}),
+        'message': 'Comment posted successfully!'
+    }
+
+
 @login_required
 def comment_ajax_create(request, slug):
     """AJAX endpoint for creating comments (optional enhancement)"""
     if request.method == 'POST':
-        post = get_object_or_404(Post, slug=slug, status='published')
+        post = get_published_post_or_404(slug=slug)
         form = CommentForm(request.POST)
         
         if form.is_valid():
@@ -294,14 +394,7 @@ def comment_ajax_create(request, slug):
             comment.author = request.user
             comment.save()
             
-            return JsonResponse({
-                'success': True,
-                'comment_id': comment.id,
-                'author': comment.author.username,
-                'content': comment.content,
-                'created_at': comment.created_at.strftime('%B %d, %Y at %I:%M %p'),
-                'message': 'Comment posted successfully!'
-            })
+            return JsonResponse(comment_payload(comment))
         else:
             return JsonResponse({
                 'success': False,
@@ -312,6 +405,85 @@ def comment_ajax_create(request, slug):
     return JsonResponse({'success': False, 'message': 'Invalid request method.'})
 
 
+# Comment validation sanitizes HTML (blog.sanitizer), which is CPU-bound for
+# markup; the async endpoint runs it here instead of blocking the event loop.
+sanitize_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='comment-sanitize')
+
+
+@login_required
+async def comment_ajax_create_async(request, slug):
+    """
+    Async variant of comment_ajax_create for ASGI deployments. Waiting on the
+    database or the sanitizer pool does not tie up a worker, so a burst of
+    comments on one post is absorbed by the event loop.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Invalid request method.'})
+
+    post = await Post.published.filter(slug=slug).only('pk').afirst()
+    if post is None:
+        raise Http404('No Post matches the given query.')
+    form = CommentForm(request.POST)
+    is_valid = await asyncio.get_running_loop().run_in_executor(sanitize_pool, form.is_valid)
+    if not is_valid:
+        return JsonResponse({
+            'success': False,
+            'errors': form.errors,
+            'message': 'Please correct the errors below.'
+        })
+
+    comment = form.save(commit=False)
+    comment.post = post
+    comment.author = await request.auser()
+    await comment.asave()
+    return JsonResponse(comment_payload(comment))
+
+
+class CommentModerationView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+    """Moderation queue: hidden comments, newest first (?status=active for live ones)"""
+    model = Comment
+    template_name = 'blog/comment_moderation.html'
+    context_object_name = 'comments'
+    paginate_by = 50
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get_queryset(self):
+        # Served by the (is_active, created_at) index.
+        is_active = self.request.GET.get('status') == 'active'
+        return Comment.objects.filter(is_active=is_active).select_related(
+            'author', 'post'
+        ).order_by('-created_at')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['status'] = 'active' if self.request.GET.get('status') == 'active' else 'hidden'
+        context['actions'] = list(ACTIONS)
+        return context
+
+
+@require_POST
+@login_required
+def comment_moderate(request):
+    """Apply a bulk moderation action to the selected comments"""
+    if not request.user.is_staff:
+        raise PermissionDenied
+    action = ACTIONS.get(request.POST.get('action'))
+    comment_ids = [pk for pk in request.POST.getlist('comment_ids') if pk.isdigit()]
+    if action is None or not comment_ids:
+        messages.error(request, 'Select an action and at least one comment.')
+    else:
+        count = action(Comment.objects.filter(pk__in=comment_ids))
+        messages.success(request, f'{request.POST["action"].capitalize()}: {count} comment(s).')
+    next_url = request.POST.get('next')
+    if not url_has_allowed_host_and_scheme(
+        next_url, allowed_hosts={request.get_host()}, require_https=request.is_secure()
+    ):
+        next_url = reverse('comment_moderation')
+    return redirect(next_url)
+
+
 def user_comments(request, username):
     """View to display all comments by a specific user"""
     from django.contrib.auth.models import User
@@ -320,7 +492,7 @@ def user_comments(request, username):
     comments = Comment.objects.filter(
         author=user,
         is_active=True,
-        post__status='published'
+        post__status=Post.PUBLISHED
     ).select_related('post').order_by('-created_at')
     
     # Paginate user comments
@@ -341,7 +513,7 @@ def user_comments(request, username):
 # This view allows users to search for blog posts by title, content, or tags.
 def search_posts(request):
     query = request.GET.get('q')
-    results = Post.objects.filter(
+    results = Post.published.filter(
         Q(title__icontains=query) |
         Q(content__icontains=query) |
         Q(tags__name__icontains=query)
@@ -355,7 +527,7 @@ def search_posts(request):
 # This view allows users to filter posts by specific tags.
 def posts_by_tag(request, tag_slug):
     tag = get_object_or_404(Tag, slug=tag_slug)
-    posts = Post.objects.filter(tags__name__iexact=tag.name)
+    posts = Post.published.filter(tags__name__iexact=tag.name)
     return render(request, 'blog/posts_by_tag.html', {
         'tag': tag,
         'posts': posts
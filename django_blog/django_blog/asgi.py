@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_blog.settings')
 
 application = get_asgi_application()
+
+# Parse every template before the first request instead of during it.
+if settings.PRECOMPILE_TEMPLATES:
+    from django_blog.template_cache import precompile_templates
+
+    precompile_templates()
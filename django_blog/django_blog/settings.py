@@ -44,13 +44,29 @@ INSTALLED_APPS = [
    
 ]
 
+# Workers that never serve /admin/ can boot without the admin, which
+# imports every app's admin module on startup: DJANGO_ADMIN_ENABLED=0.
+ADMIN_ENABLED = os.environ.get('DJANGO_ADMIN_ENABLED', '1') != '0'
+if not ADMIN_ENABLED:
+    INSTALLED_APPS.remove('django.contrib.admin')
 
-# This enables Django project to properly serve static files...
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/5.2/howto/static-files/
+# `collectstatic` writes content-hashed copies, precompressed .gz/.br
+# siblings and the staticfiles.json manifest to STATIC_ROOT, which
+# StaticFilesMiddleware serves with immutable cache headers.
 STATIC_URL = '/static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
 
-STATICFILES_DIRS = [
-    BASE_DIR / "static",
-]
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django_blog.staticfiles.CompressedManifestStaticFilesStorage',
+    },
+}
 
 TEMPLATES = [
     {
@@ -64,12 +80,14 @@ TEMPLATES = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'django_blog.staticfiles.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'django_blog.objectcache.object_cache_middleware',
 ]
 
 
@@ -80,19 +98,43 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Production template mode: every template is read and parsed
+            # once per process, then served from memory by the cached loader.
+            # PRECOMPILE_TEMPLATES below warms it when the server boots.
+            'loaders': [
+                (
+                    'django.template.loaders.cached.Loader',
+                    [
+                        'django.template.loaders.filesystem.Loader',
+                        'django.template.loaders.app_directories.Loader',
+                    ],
+                ),
+            ],
         },
     },
 ]
 
+# Compile every template in wsgi.py/asgi.py before serving requests.
+PRECOMPILE_TEMPLATES = not DEBUG
+
 WSGI_APPLICATION = 'django_blog.wsgi.application'
 
+# Comment spam scoring (see blog/spam.py): the model, and the score at which
+# a new comment is hidden until a moderator approves it.
+BLOG_SPAM_SCORER = 'blog.spam.HeuristicSpamScorer'
+BLOG_SPAM_THRESHOLD = 0.8
+
+# Post popularity (see blog/popularity.py): seconds between flushes of the
+# in-memory view counters, and the half-life of a view in the trending score.
+BLOG_VIEW_FLUSH_INTERVAL = 10
+BLOG_TRENDING_HALF_LIFE = 6 * 60 * 60
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -110,6 +152,32 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/ref/settings/#caches
+#
+# The post cache, version stamps and feed blobs live in the default cache.
+# Deployments that run more than one process must point DJANGO_REDIS_URL
+# at a Redis server, so that a save in one process reaches the others.
+# Without it the cache is local to each process, which suits a single
+# development server, and the system checks warn (objectcache.W001).
+
+if os.environ.get('DJANGO_REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['DJANGO_REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            # The default of 300 would keep culling stamps and cached rows.
+            'OPTIONS': {'MAX_ENTRIES': 100_000},
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -141,11 +209,6 @@ USE_I18N = True
 USE_TZ = True
 
 
-# Static files (CSS, JavaScript, Images)
-# https://docs.djangoproject.com/en/5.2/howto/static-files/
-
-STATIC_URL = 'static/'
-
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -161,4 +224,9 @@ LOGIN_URL = '/login/'
 
 # Media files (uploads)
 MEDIA_URL = '/media/'
-MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
\ No newline at end of file
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Sitemaps, written by `manage.py generate_sitemaps` and served from disk.
+# SITE_URL is the absolute base of the URLs they list.
+SITEMAP_ROOT = BASE_DIR / 'sitemaps'
+SITE_URL = os.environ.get('DJANGO_SITE_URL', 'http://localhost:8000')
@@ -0,0 +1,161 @@
+"""
+Sitemap files, generated ahead of time and served from disk.
+
+A Section lists the URLs of one kind of page from a values_list() query
+ordered by primary key. generate() streams each section into shards by
+primary-key range (SHARD_SIZE keys, so at most 50,000 URLs per file, the
+protocol's limit) and writes SITEMAP_ROOT/sitemap.xml as the index. Rows
+are never loaded as model instances, and only one shard's rows are held in
+memory at a time.
+
+Each shard's rows are hashed as they stream past. When the hash matches
+the one recorded in manifest.json, the shard is left alone, so a run after
+a few edits rewrites only the shards those rows fall in. A rewritten
+shard's lastmod in the index is the time of the run, since its rows' own
+dates cannot say when one of them was removed. Every file is written with
+a .gz sibling, and serve_sitemap() sends the compressed file to clients
+that accept it.
+"""
+import gzip
+import hashlib
+import json
+import os
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils import timezone
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+
+SHARD_SIZE = 50_000
+INDEX = 'sitemap.xml'
+MANIFEST = 'manifest.json'
+
+URLSET_OPEN = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+INDEX_OPEN = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+
+
+class Section:
+    """
+    `rows` returns a values_list() queryset whose first column is the
+    primary key; `entry` maps one of its rows to (path, lastmod or None).
+    """
+
+    def __init__(self, name, rows, entry):
+        self.name = name
+        self.rows = rows
+        self.entry = entry
+
+    def shards(self):
+        """Yield (shard number, rows) in primary-key order."""
+        bucket, rows = None, []
+        for row in self.rows().order_by('pk').iterator(chunk_size=5000):
+            if row[0] // SHARD_SIZE != bucket:
+                if rows:
+                    yield bucket, rows
+                bucket, rows = row[0] // SHARD_SIZE, []
+            rows.append(row)
+        if rows:
+            yield bucket, rows
+
+
+def digest(rows):
+    return hashlib.sha1(repr(rows).encode(), usedforsecurity=False).hexdigest()
+
+
+def write_file(path, chunks):
+    """Write `chunks` to `path` and a .gz sibling, replacing both atomically."""
+    data = ''.join(chunks).encode()
+    for target, content in ((path, data), (path + '.gz', gzip.compress(data, mtime=0))):
+        with open(target + '.tmp', 'wb') as file:
+            file.write(content)
+        os.replace(target + '.tmp', target)
+
+
+def remove_file(path):
+    for target in (path, path + '.gz'):
+        if os.path.exists(target):
+            os.remove(target)
+
+
+def generate(sections, base_url, root=None, force=False):
+    """Bring the files under `root` up to date; returns (written, unchanged, removed)."""
+    root = str(root or settings.SITEMAP_ROOT)
+    os.makedirs(root, exist_ok=True)
+    base_url = base_url.rstrip('/')
+    try:
+        with open(os.path.join(root, MANIFEST)) as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        manifest = {}
+
+    now = timezone.now().replace(microsecond=0)
+    shards = {}
+    written = unchanged = 0
+    for section in sections:
+        for bucket, rows in section.shards():
+            filename = f'{section.name}-{bucket}.xml'
+            path = os.path.join(root, filename)
+            previous = manifest.get(filename)
+            current = digest(rows)
+            if not force and previous and previous['digest'] == current and os.path.exists(path):
+                shards[filename] = previous
+                unchanged += 1
+                continue
+            entries = [section.entry(row) for row in rows]
+            write_file(path, [URLSET_OPEN, *(
+                f'<url><loc>{escape(base_url + location)}</loc>'
+                + (f'<lastmod>{mod.isoformat()}</lastmod>' if mod else '')
+                + '</url>\n'
+                for location, mod in entries
+            ), '</urlset>\n'])
+            shards[filename] = {'digest': current, 'lastmod': now.isoformat()}
+            written += 1
+
+    removed = 0
+    for filename in set(manifest) - set(shards):
+        remove_file(os.path.join(root, filename))
+        removed += 1
+
+    write_file(os.path.join(root, INDEX), [INDEX_OPEN, *(
+        f'<sitemap><loc>{escape(f"{base_url}/sitemaps/{filename}")}</loc>'
+        + (f'<lastmod>{shard["lastmod"]}</lastmod>' if shard['lastmod'] else '')
+        + '</sitemap>\n'
+        for filename, shard in sorted(shards.items())
+    ), '</sitemapindex>\n'])
+    with open(os.path.join(root, MANIFEST + '.tmp'), 'w') as file:
+        json.dump(shards, file, indent=1, sort_keys=True)
+    os.replace(os.path.join(root, MANIFEST + '.tmp'), os.path.join(root, MANIFEST))
+    return written, unchanged, removed
+
+
+def serve_sitemap(request, name=INDEX):
+    if not name.endswith('.xml'):
+        raise Http404('Not a sitemap.')
+    try:
+        path = safe_join(settings.SITEMAP_ROOT, name)
+        stat = os.stat(path)
+    except (OSError, ValueError):
+        raise Http404('Sitemap not found.')
+    encoding = None
+    if 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '') and os.path.exists(path + '.gz'):
+        encoding, path = 'gzip', path + '.gz'
+    etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}{"-gzip" if encoding else ""}"'
+    if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(open(path, 'rb'), content_type='application/xml')
+        response.headers.pop('Content-Disposition', None)
+        if encoding:
+            response['Content-Encoding'] = encoding
+    response['ETag'] = etag
+    response['Cache-Control'] = 'public, max-age=3600'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
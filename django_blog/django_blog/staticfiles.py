@@ -0,0 +1,184 @@
+"""
+Static asset pipeline.
+
+`collectstatic` with CompressedManifestStaticFilesStorage copies every file
+to STATIC_ROOT under a content-hashed name (css/styles.3f2a1c.css), records
+the mapping in the staticfiles.json manifest and writes precompressed .gz
+(and .br, if the `brotli` package is installed) siblings next to each text
+asset.
+
+StaticFilesMiddleware serves STATIC_ROOT from the Django process. Hashed
+files never change, so they are sent with a one-year `immutable` cache
+lifetime; the best precompressed variant the client accepts is chosen per
+request. Responses are FileResponses, which WSGI servers that provide
+`wsgi.file_wrapper` (gunicorn, uWSGI) send with sendfile() without copying
+the file through Python.
+"""
+import gzip
+import json
+import mimetypes
+import os
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available.
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {
+    '.css', '.js', '.mjs', '.map', '.json', '.svg', '.html', '.txt', '.xml',
+    '.ico', '.ttf', '.otf', '.eot',
+}
+
+# Smaller files are not worth a compressed sibling.
+COMPRESSION_MIN_SIZE = 256
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Unhashed names can change on the next deploy.
+MUTABLE_CACHE_CONTROL = 'public, max-age=60'
+
+# Preferred first.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def compress_file(path):
+    """Write .gz/.br siblings of `path` when they are smaller than the original."""
+    with open(path, 'rb') as source:
+        data = source.read()
+    if len(data) < COMPRESSION_MIN_SIZE:
+        return
+    variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress(data, quality=11)))
+    for suffix, compressed in variants:
+        if len(compressed) < len(data) * 0.95:
+            with open(path + suffix, 'wb') as target:
+                target.write(compressed)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in {*paths, *self.hashed_files.values()}:
+            if os.path.splitext(name)[1] in COMPRESSIBLE_EXTENSIONS and self.exists(name):
+                compress_file(self.path(name))
+
+    def stored_name(self, name):
+        # Files that were never collected (development, tests) keep their
+        # plain name instead of failing the page render.
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+
+class StaticAsset:
+    def __init__(self, path, immutable):
+        stat = os.stat(path)
+        self.path = path
+        self.content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self.etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+        self.cache_control = IMMUTABLE_CACHE_CONTROL if immutable else MUTABLE_CACHE_CONTROL
+        self.encodings = [
+            (encoding, path + suffix)
+            for encoding, suffix in ENCODINGS
+            if os.path.exists(path + suffix)
+        ]
+
+    def choose(self, accept_encoding):
+        """Return (encoding, path) of the best variant the client accepts."""
+        accepted = {
+            token.split(';')[0].strip()
+            for token in accept_encoding.split(',')
+            if not token.replace(' ', '').endswith(';q=0')
+        }
+        for encoding, path in self.encodings:
+            if encoding in accepted:
+                return encoding, path
+        return None, self.path
+
+
+class StaticFilesMiddleware:
+    """
+    Serve collected static files. The file index is built once on startup,
+    so files added to STATIC_ROOT later need a restart to be served.
+
+    Runs natively in both modes, so under ASGI requests that are not for
+    static files reach async views without a hop to a sync thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.STATIC_ROOT or not os.path.isdir(settings.STATIC_ROOT):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.prefix = '/' + settings.STATIC_URL.strip('/') + '/'
+        self.files = self.build_index(str(settings.STATIC_ROOT))
+
+    @staticmethod
+    def build_index(root):
+        try:
+            with open(os.path.join(root, 'staticfiles.json')) as manifest:
+                hashed = set(json.load(manifest)['paths'].values())
+        except (OSError, ValueError, KeyError):
+            hashed = set()
+        suffixes = tuple(suffix for _, suffix in ENCODINGS)
+        files = {}
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.endswith(suffixes):
+                    continue
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, root).replace(os.sep, '/')
+                files[name] = StaticAsset(path, immutable=name in hashed)
+        return files
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        asset = self.match(request)
+        if asset is not None:
+            return self.serve(request, asset)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        asset = self.match(request)
+        if asset is not None:
+            # Only opens the file; the response body is streamed by the server.
+            return self.serve(request, asset)
+        return await self.get_response(request)
+
+    def match(self, request):
+        path = request.path_info
+        if path.startswith(self.prefix) and request.method in ('GET', 'HEAD'):
+            return self.files.get(path[len(self.prefix):])
+        return None
+
+    def serve(self, request, asset):
+        encoding, path = asset.choose(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        etag = asset.etag if encoding is None else f'{asset.etag[:-1]}-{encoding}"'
+        if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+            response = HttpResponseNotModified()
+        else:
+            response = FileResponse(open(path, 'rb'), content_type=asset.content_type)
+            response.headers.pop('Content-Disposition', None)
+            if encoding is not None:
+                response['Content-Encoding'] = encoding
+        response['ETag'] = etag
+        response['Cache-Control'] = asset.cache_control
+        if asset.encodings:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        return response
@@ -0,0 +1,47 @@
+"""
+Deploy-time template precompilation.
+
+With the cached loader every template is parsed on its first use in each
+process. precompile_templates() parses all of them up front: wsgi.py calls
+it on boot when PRECOMPILE_TEMPLATES is set, so no request pays for
+compilation, and the precompile_templates command runs it at deploy time to
+fail early on syntax errors.
+"""
+import os
+
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+
+
+def template_names(engine):
+    """Yield the name of every template the engine's loaders can find."""
+    seen = set()
+    for loader in engine.template_loaders:
+        for inner in getattr(loader, 'loaders', [loader]):
+            for directory in inner.get_dirs():
+                for root, _, files in os.walk(directory):
+                    for filename in sorted(files):
+                        path = os.path.join(root, filename)
+                        name = os.path.relpath(path, directory).replace(os.sep, '/')
+                        if name not in seen:
+                            seen.add(name)
+                            yield name
+
+
+def precompile_templates():
+    """
+    Load every template of the Django template engines. Returns the number
+    compiled and a list of (name, error) for templates that failed to parse.
+    """
+    compiled, errors = 0, []
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        for name in template_names(backend.engine):
+            try:
+                backend.engine.get_template(name)
+            except (TemplateSyntaxError, UnicodeDecodeError) as error:
+                errors.append((name, error))
+            else:
+                compiled += 1
+    return compiled, errors
@@ -16,14 +16,13 @@ Including another URLconf
 """
 
 # your_project/urls.py
-from django.contrib import admin
 from django.urls import path, include
 from django.contrib.auth import views as auth_views
 from django.conf import settings
-from django.conf.urls.static import static
+from .media import serve_media
+from .sitemaps import serve_sitemap
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('', include('blog.urls')),  #includes your register view
     # Authentication URLs
     path('login/', auth_views.LoginView.as_view(), name='login'),
@@ -31,6 +30,17 @@ urlpatterns = [
 
 ]
 
-# Serve media files during development
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+if settings.ADMIN_ENABLED:
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path('admin/', admin.site.urls))
+
+# Uploaded media, with byte ranges, conditional requests and sendfile().
+urlpatterns.append(
+    path(f"{settings.MEDIA_URL.strip('/')}/<path:path>", serve_media, name='media'),
+)
+# Pregenerated sitemap index and shards (manage.py generate_sitemaps).
+urlpatterns += [
+    path('sitemap.xml', serve_sitemap, name='sitemap'),
+    path('sitemaps/<str:name>', serve_sitemap, name='sitemap_shard'),
+]
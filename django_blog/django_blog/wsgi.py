@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_blog.settings')
 
 application = get_wsgi_application()
+
+# Parse every template before the first request instead of during it.
+if settings.PRECOMPILE_TEMPLATES:
+    from django_blog.template_cache import precompile_templates
+
+    precompile_templates()
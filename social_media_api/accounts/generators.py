@@ -0,0 +1,44 @@
+# Synthetic users and a power-law follow graph for the generate_fixtures
+# command. How many accounts a user follows is heavy-tailed, and who they
+# follow is Zipf-distributed, so a few accounts collect most followers.
+from functools import partial
+
+from social_media_api.datagen import ZipfSampler, generate as write, heavy_tail, next_pk, text
+
+from .models import CustomUser
+
+
+def generate(options):
+    write_rows = partial(
+        write,
+        seed=options["seed"],
+        workers=options["workers"],
+        batch_size=options["batch_size"],
+    )
+
+    start = next_pk(CustomUser)
+    users = range(start, start + int(1000 * options["scale"]))
+
+    def build_user(pk, rng):
+        yield CustomUser(
+            pk=pk,
+            username=f"user{pk}",
+            email=f"user{pk}@example.com",
+            password="!",
+            bio=text(rng, 12),
+        )
+
+    yield CustomUser, write_rows(CustomUser, users, build_user)
+
+    Follow = CustomUser.followers.through
+    celebrities = ZipfSampler(users)
+
+    def build_follows(pk, rng):
+        count = min(heavy_tail(rng, mean=20), len(users) - 1)
+        followees = set(celebrities.sample(rng, k=count))
+        followees.discard(pk)
+        for followee in followees:
+            # A row (from=A, to=B) puts B in A.followers.
+            yield Follow(from_customuser_id=followee, to_customuser_id=pk)
+
+    yield Follow, write_rows(Follow, users, build_follows)
@@ -1,5 +1,19 @@
+from django.contrib.auth.models import AbstractUser
 from django.db import models
 
-# Create your models here.
+
+# CustomUser adds a profile to Django's user. `followers` is asymmetric:
+# user.followers are the users following them, user.following the reverse.
+class CustomUser(AbstractUser):
+    bio = models.TextField(blank=True)
+    profile_picture = models.ImageField(upload_to="profile_pictures/", blank=True)
+    followers = models.ManyToManyField(
+        "self", symmetrical=False, related_name="following", blank=True
+    )
+
+    def __str__(self):
+        return self.username
+
+
 # "from django.contrib.auth.models import AbstractUser", "bio", "profile_picture", "followers", "models.ManyToManyField", "models.ImageField", "models.TextField"
 # following
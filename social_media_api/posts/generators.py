@@ -0,0 +1,49 @@
+# Synthetic posts, comments and likes for the generate_fixtures command.
+# Authors are Zipf-distributed; comments and likes per post are heavy-tailed.
+from functools import partial
+
+from django.contrib.auth import get_user_model
+
+from social_media_api.datagen import ZipfSampler, generate as write, heavy_tail, next_pk, text
+
+from .models import Comment, Like, Post
+
+
+def generate(options):
+    scale = options["scale"]
+    write_rows = partial(
+        write,
+        seed=options["seed"],
+        workers=options["workers"],
+        batch_size=options["batch_size"],
+    )
+
+    users = list(get_user_model().objects.order_by("pk").values_list("pk", flat=True))
+    if not users:
+        return
+    authors = ZipfSampler(users)
+    readers = ZipfSampler(users, s=0.8)
+
+    start = next_pk(Post)
+    posts = range(start, start + int(10000 * scale))
+
+    def build_post(pk, rng):
+        yield Post(
+            pk=pk,
+            author_id=authors.pick(rng),
+            title=text(rng, 6).capitalize(),
+            content=text(rng, 60),
+        )
+
+    def build_comments(pk, rng):
+        for _ in range(heavy_tail(rng, mean=5, limit=5000)):
+            yield Comment(post_id=pk, author_id=readers.pick(rng), content=text(rng, 20))
+
+    def build_likes(pk, rng):
+        count = min(heavy_tail(rng, mean=15), len(users))
+        for user_id in set(readers.sample(rng, k=count)):
+            yield Like(user_id=user_id, post_id=pk)
+
+    yield Post, write_rows(Post, posts, build_post)
+    yield Comment, write_rows(Comment, posts, build_comments)
+    yield Like, write_rows(Like, posts, build_likes)
@@ -0,0 +1,96 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from social_media_api.throttling import CacheBuckets, LocalBuckets, get_buckets
+
+
+class PingView(APIView):
+    throttle_scope = "ping"
+
+    def get(self, request):
+        return Response({"ok": True})
+
+
+class TokenBucketThrottleTests(TestCase):
+    # No routed view is throttled by scope yet, so the tests use their own.
+    rates = {"user": "600/min", "ip": "300/min", "ping": "3/min"}
+
+    def setUp(self):
+        get_buckets().clear()
+        self.addCleanup(get_buckets().clear)
+        patcher = mock.patch("rest_framework.throttling.SimpleRateThrottle.THROTTLE_RATES", self.rates)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.view = PingView.as_view()
+        self.factory = APIRequestFactory()
+
+    def get(self, address="10.0.0.1"):
+        return self.view(self.factory.get("/ping/", REMOTE_ADDR=address))
+
+    def test_rate_limit_headers(self):
+        response = self.get()
+        self.assertEqual(response["RateLimit-Limit"], "3")
+        self.assertEqual(response["RateLimit-Remaining"], "2")
+        self.assertEqual(response["RateLimit-Reset"], "20")
+
+    def test_exhausted_bucket_returns_429(self):
+        for _ in range(3):
+            self.get()
+        response = self.get()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["RateLimit-Remaining"], "0")
+        self.assertIn("Retry-After", response)
+
+    def test_buckets_are_per_client(self):
+        for _ in range(3):
+            self.get("10.0.0.1")
+        self.assertEqual(self.get("10.0.0.2").status_code, 200)
+
+    def test_bucket_refills_over_time(self):
+        buckets = LocalBuckets()
+        self.assertEqual(buckets.take("key", 2, 1.0, now=0), (True, 1))
+        self.assertEqual(buckets.take("key", 2, 1.0, now=0), (True, 0))
+        self.assertEqual(buckets.take("key", 2, 1.0, now=0.5), (False, 0.5))
+        self.assertEqual(buckets.take("key", 2, 1.0, now=1.5), (True, 0.5))
+
+
+class CacheBucketsTests(TestCase):
+    def setUp(self):
+        self.buckets = CacheBuckets("default")
+        self.buckets.cache.clear()
+        self.addCleanup(self.buckets.cache.clear)
+
+    def test_bucket_refills_over_time(self):
+        self.assertEqual(self.buckets.take("key", 2, 1.0, now=0), (True, 1))
+        self.assertEqual(self.buckets.take("key", 2, 1.0, now=0), (True, 0))
+        self.assertEqual(self.buckets.take("key", 2, 1.0, now=0.5), (False, 0.5))
+        self.assertEqual(self.buckets.take("key", 2, 1.0, now=1.5), (True, 0.5))
+
+    def test_concurrent_takes_spend_each_token_once(self):
+        get = self.buckets.cache.get
+
+        def slow_get(*args, **kwargs):
+            # Widen the window between reading a bucket and writing it back.
+            value = get(*args, **kwargs)
+            time.sleep(0.001)
+            return value
+
+        def take(_):
+            return self.buckets.take("key", 20, 1e-9, now=0)[0]
+
+        with mock.patch.object(self.buckets.cache, "get", slow_get):
+            with ThreadPoolExecutor(8) as pool:
+                allowed = sum(pool.map(take, range(80)))
+        self.assertEqual(allowed, 20)
+
+    def test_held_lock_throttles(self):
+        self.buckets.cache.add("key:lock", 1)
+        self.buckets.lock_attempts = 2
+        self.assertEqual(self.buckets.take("key", 2, 1.0, now=0), (False, 0))
+        self.assertIsNone(self.buckets.cache.get("key"))